@@ -0,0 +1,42 @@
+"""stock_prices: unique (company_id, date)
+
+Revision ID: stock_prices_unique_company_date
+Revises:
+Create Date: 2026-10-17
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'stock_prices_unique_company_date'
+down_revision: Union[str, None] = None
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """同じ企業・日付の重複行を除き、(company_id, date) を一意にする"""
+
+    # 重複している日付は最後に書き込まれた行（idが最大）を残す
+    op.execute(
+        """
+        DELETE sp FROM stock_prices sp
+        JOIN stock_prices newer
+          ON newer.company_id = sp.company_id
+         AND newer.date = sp.date
+         AND newer.id > sp.id
+        """
+    )
+
+    op.drop_index('idx_company_date', table_name='stock_prices')
+    op.create_index('idx_company_date', 'stock_prices', ['company_id', 'date'], unique=True)
+
+
+def downgrade() -> None:
+    """一意制約を外して通常のインデックスに戻す"""
+    op.drop_index('idx_company_date', table_name='stock_prices')
+    op.create_index('idx_company_date', 'stock_prices', ['company_id', 'date'])
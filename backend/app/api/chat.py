@@ -5,14 +5,17 @@ Chat API Endpoints
 
 from fastapi import APIRouter, Depends, HTTPException
 from sqlalchemy.orm import Session
-from typing import Optional
+from typing import List, Optional
 from pydantic import BaseModel
+import asyncio
 
 from app.db.database import get_db
 from app.models.company import Company
 from app.rag.rag_pipeline import rag_pipeline
 from app.rag.data_processor import data_processor
 from app.rag.embedding import embedding_service
+from app.rag.query_cache import query_embedding_cache
+from app.rag.answer_cache import answer_cache
 
 router = APIRouter()
 
@@ -34,6 +37,11 @@ class IndexRequest(BaseModel):
     stock_code: str
 
 
+class BulkIndexRequest(BaseModel):
+    """複数企業のインデックス作成リクエスト"""
+    stock_codes: List[str]
+
+
 @router.post("/chat", response_model=ChatResponse)
 async def chat(
     request: ChatRequest,
@@ -88,8 +96,8 @@ async def create_index(
                 detail=f"銘柄コード {request.stock_code} の企業が見つかりません"
             )
 
-        # 既存データを削除
-        embedding_service.delete_company_data(request.stock_code)
+        # 既存データを削除（ChromaDBへの書き込みはスレッドプールで実行）
+        await asyncio.to_thread(embedding_service.delete_company_data, request.stock_code)
 
         # ドキュメントチャンク作成
         chunks = data_processor.create_document_chunks(db, company)
@@ -100,8 +108,11 @@ async def create_index(
                 detail="インデックス化するデータがありません"
             )
 
-        # ChromaDBに追加
-        embedding_service.add_documents(chunks, request.stock_code)
+        # ChromaDBに追加（ベクトル化はスレッドプールで実行）
+        await asyncio.to_thread(embedding_service.add_documents, chunks, request.stock_code)
+
+        # この企業に関するキャッシュ済みの回答を無効化
+        answer_cache.invalidate(request.stock_code)
 
         return {
             "message": f"{company.name}（{request.stock_code}）のデータをインデックス化しました",
@@ -117,19 +128,71 @@ async def create_index(
         )
 
 
+@router.post("/chat/index/bulk")
+async def create_index_bulk(
+    request: BulkIndexRequest,
+    db: Session = Depends(get_db)
+):
+    """
+    複数企業のデータをまとめてインデックス化
+
+    - 全企業のチャンクを企業をまたいだバッチでベクトル化して投入
+    - 既存データは削除して再投入
+    - 見つからない銘柄コードはスキップ
+    """
+    try:
+        stock_codes = list(dict.fromkeys(request.stock_codes))
+
+        companies = db.query(Company).filter(
+            Company.stock_code.in_(stock_codes)
+        ).all()
+        found = {company.stock_code for company in companies}
+
+        # ドキュメントチャンク作成
+        chunks_by_company = {}
+        for company in companies:
+            chunks = data_processor.create_document_chunks(db, company)
+            if chunks:
+                chunks_by_company[company.stock_code] = chunks
+
+        # 既存データを削除してからChromaDBに追加（削除・ベクトル化ともスレッドプールで実行）
+        await asyncio.to_thread(embedding_service.delete_companies_data, list(chunks_by_company))
+        chunks_count = await asyncio.to_thread(embedding_service.add_documents_bulk, chunks_by_company)
+
+        # 再インデックスした企業に関するキャッシュ済みの回答を無効化
+        for stock_code in chunks_by_company:
+            answer_cache.invalidate(stock_code)
+
+        return {
+            "message": f"{len(chunks_by_company)}社のデータをインデックス化しました",
+            "companies_count": len(chunks_by_company),
+            "chunks_count": chunks_count,
+            "not_found": [code for code in stock_codes if code not in found]
+        }
+
+    except Exception as e:
+        raise HTTPException(
+            status_code=500,
+            detail=f"インデックス作成エラー: {str(e)}"
+        )
+
+
 @router.get("/chat/stats")
 async def get_stats():
     """
     インデックス統計情報取得
 
     - ChromaDB内のドキュメント数を返す
+    - クエリエンベディングキャッシュ・回答キャッシュのヒット率を返す
     """
     try:
         count = embedding_service.get_collection_count()
 
         return {
             "total_documents": count,
-            "collection_name": embedding_service.collection_name
+            "collection_name": embedding_service.collection_name,
+            "query_embedding_cache": query_embedding_cache.get_stats(),
+            "answer_cache": answer_cache.get_stats()
         }
 
     except Exception as e:
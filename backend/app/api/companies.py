@@ -4,23 +4,32 @@ Companies API Endpoints
 """
 
 from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi.responses import Response
 from sqlalchemy.orm import Session
 from sqlalchemy import or_
-from typing import List
+from typing import List, Union
+import asyncio
 
-from app.db.database import get_db
+from app.db.database import get_db, SessionLocal
 from app.models.company import Company
 from app.schemas.company import (
     CompanyResponse,
     CompanySearchResult,
     CompanyCreate
 )
-from app.schemas.stock_price import StockPriceResponse
+from app.schemas.stock_price import StockPriceResponse, StockPriceColumnsResponse
 from app.schemas.financial_data import FinancialDataResponse, FinancialDataWithMetrics, CombinedDataResponse
 from app.services.yfinance_client import yfinance_client
+from app.services.price_store import price_store
 from app.services.financial_calculator import financial_calculator
 from app.models.financial_data import FinancialData
-from app.services.cache_service import cache_service, CACHE_TTL_STOCK_PRICE, CACHE_TTL_FINANCIAL
+from app.services.cache_service import (
+    cache_service,
+    CACHE_TTL_STOCK_PRICE,
+    CACHE_TTL_FINANCIAL,
+    CACHE_STALE_TTL_STOCK_PRICE,
+    CACHE_STALE_TTL_FINANCIAL
+)
 
 router = APIRouter()
 
@@ -101,67 +110,92 @@ async def create_company(
     return db_company
 
 
-@router.get("/{stock_code}/stock-prices", response_model=StockPriceResponse)
+@router.get(
+    "/{stock_code}/stock-prices",
+    response_model=Union[StockPriceResponse, StockPriceColumnsResponse]
+)
 async def get_stock_prices(
     stock_code: str,
-    period: str = Query("1mo", description="期間 (1d, 5d, 1mo, 3mo, 6mo, 1y, 5y)")
+    period: str = Query("1mo", description="期間 (1d, 5d, 1mo, 3mo, 6mo, 1y, 5y)"),
+    format: str = Query("records", pattern="^(records|columns)$", description="データ形式 (records: 行ごと, columns: 列ごと)")
 ):
     """
     株価データ取得（キャッシュ対応）
 
-    - Yahoo Finance から株価データを取得
+    - ローカル株価ストア（stock_prices）から取得し、不足分のみ Yahoo Finance から補完
     - 期間指定可能
-    - 15分間キャッシュ
+    - 15分間キャッシュ（期限切れ後は古い値を返しつつ裏で再取得）
+    - キャッシュにはエンコード済みJSONを保持し、ヒット時はそのまま返却
+    - format=columns で {"date": [...], "close": [...]} の列指向形式を返却（チャート向け）
     """
-    # キャッシュキー生成
+    # キャッシュキー生成（既存の行形式はキーを変えない）
     cache_key = f"stock_prices:{stock_code}:{period}"
+    if format == "columns":
+        cache_key += ":columns"
 
-    # キャッシュチェック
-    cached_data = cache_service.get(cache_key)
-    if cached_data is not None:
-        return cached_data
+    def load_stock_prices() -> bytes:
+        # 株価データ取得（ストア対象外の場合は直接取得）
+        with SessionLocal() as db:
+            series = price_store.get_series(db, stock_code, period)
+        if series is None:
+            series = yfinance_client.get_price_series(stock_code, period)
 
-    # 株価データ取得
-    stock_data = yfinance_client.get_stock_data_dict(stock_code, period)
+        if series is None:
+            raise HTTPException(
+                status_code=404,
+                detail=f"Stock price data for {stock_code} not found"
+            )
 
-    if not stock_data:
-        raise HTTPException(
-            status_code=404,
-            detail=f"Stock price data for {stock_code} not found"
-        )
-
-    response = {
-        "stock_code": stock_code,
-        "period": period,
-        "data": stock_data
-    }
+        return series.to_json_bytes(orient=format, stock_code=stock_code, period=period)
 
-    # キャッシュに保存（15分）
-    cache_service.set(cache_key, response, CACHE_TTL_STOCK_PRICE)
+    # キャッシュ取得（同時ミス時も上流取得は1回、15分キャッシュ）
+    content = await cache_service.get_or_compute(
+        cache_key,
+        load_stock_prices,
+        CACHE_TTL_STOCK_PRICE,
+        CACHE_STALE_TTL_STOCK_PRICE
+    )
 
-    return response
+    return Response(content=content, media_type="application/json")
 
 
 @router.get("/{stock_code}/financials", response_model=List[FinancialDataWithMetrics])
-async def get_financials(
-    stock_code: str,
-    db: Session = Depends(get_db)
-):
+async def get_financials(stock_code: str):
     """
     決算データ取得（キャッシュ対応）
 
     - 企業の過去の決算データを取得
     - 財務指標も自動計算して返却
-    - 1日間キャッシュ
+    - 1日間キャッシュ（期限切れ後は古い値を返しつつ裏で再取得）
     """
     # キャッシュキー生成
     cache_key = f"financials:{stock_code}"
 
-    # キャッシュチェック
-    cached_data = cache_service.get(cache_key)
-    if cached_data is not None:
-        return cached_data
+    def load_financials():
+        # バックグラウンド再取得でも使うため、リクエストとは別のセッションを使う
+        with SessionLocal() as db:
+            return _load_financials(db, stock_code)
+
+    # キャッシュ取得（同時ミス時もDB照会は1回、1日キャッシュ）
+    return await cache_service.get_or_compute(
+        cache_key,
+        load_financials,
+        CACHE_TTL_FINANCIAL,
+        CACHE_STALE_TTL_FINANCIAL
+    )
+
+
+def _load_financials(db: Session, stock_code: str) -> List[dict]:
+    """
+    決算データと財務指標を取得
 
+    Args:
+        db: データベースセッション
+        stock_code: 銘柄コード
+
+    Returns:
+        財務指標付き決算データのリスト
+    """
     # 企業を検索
     company = db.query(Company).filter(
         Company.stock_code == stock_code
@@ -193,14 +227,13 @@ async def get_financials(
             current_liabilities=fd.current_liabilities
         )
 
+        # ORM内部状態（_sa_instance_state）は共有キャッシュに保存できないため除外
+        columns = {k: v for k, v in fd.__dict__.items() if not k.startswith("_")}
         result.append({
-            **fd.__dict__,
+            **columns,
             "metrics": metrics
         })
 
-    # キャッシュに保存（1日）
-    cache_service.set(cache_key, result, CACHE_TTL_FINANCIAL)
-
     return result
 
 
@@ -232,19 +265,24 @@ async def get_combined_data(
         FinancialData.fiscal_quarter.is_(None)
     ).order_by(FinancialData.fiscal_year.desc()).limit(10).all()
 
-    # 株価データ取得（過去5年分）
-    stock_data = yfinance_client.get_stock_data_dict(stock_code, period="5y")
+    def load_series():
+        # 初回は5年分の取り込み（上流取得とDB書き込み）になるため、別セッションでスレッド実行する
+        with SessionLocal() as session:
+            series = price_store.get_series(session, stock_code, "5y")
+        if series is None:
+            series = yfinance_client.get_price_series(stock_code, period="5y")
+        return series
+
+    # 株価データ取得（過去5年分、ストアにない場合は直接取得）
+    series = await asyncio.to_thread(load_series)
 
     # 年度ごとの期末株価を抽出（3月末を想定）
     stock_price_by_year = {}
-    for data in stock_data:
-        # 日付から年度を計算（3月末決算を想定）
-        from datetime import datetime
-        date = datetime.strptime(data["date"], "%Y-%m-%d")
-        # 3月末付近のデータを各年度の代表値とする
-        if date.month == 3:
-            year = date.year
-            stock_price_by_year[year] = data["close"]
+    if series is not None:
+        # 3月末付近のデータを各年度の代表値とする（各年の3月の最終営業日）
+        march = series.months() == 3
+        for year, close in zip(series.years()[march].tolist(), series.close[march].tolist()):
+            stock_price_by_year[year] = close
 
     # 決算データと株価を結合
     result = []
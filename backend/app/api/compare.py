@@ -3,24 +3,52 @@ Compare API
 複数資産比較APIエンドポイント
 """
 
-from fastapi import APIRouter, HTTPException
-from typing import List
-from datetime import datetime, timedelta
+from fastapi import APIRouter, HTTPException, Response
+from typing import Dict, List, Optional, Tuple
+from datetime import date
+from functools import partial
+import asyncio
+import hashlib
+import json
+import logging
+import os
 
 from app.schemas.compare import (
     CompareRequest,
     CompareResponse,
     AssetPerformance,
-    DataPoint
+    AssetSymbol,
+    DataPoint,
+    FailedAsset
 )
+from app.db.database import SessionLocal
 from app.services.yfinance_client import yfinance_client
+from app.services.price_store import price_store
 from app.services.crypto_client import crypto_client
-from app.services.exchange_rate_client import exchange_rate_client
-from app.services.performance_calculator import performance_calculator
+from app.services.pricing_service import fx_pair
+from app.services.performance_calculator import performance_calculator, periods_per_year
+from app.services.series_alignment import AlignedPrices, ALIGNMENT_UNION
+from app.services.cache_service import (
+    cache_service,
+    CACHE_TTL_STOCK_PRICE,
+    CACHE_TTL_EXCHANGE_RATE,
+    CACHE_TTL_CRYPTO
+)
+
 
+logger = logging.getLogger(__name__)
 
 router = APIRouter()
 
+# 1資産あたりのデータ取得タイムアウト（秒）
+COMPARE_ASSET_TIMEOUT = float(os.getenv("COMPARE_ASSET_TIMEOUT", "15"))
+
+# yfinanceの一括ダウンロードで先読みする資産クラス
+BATCH_PREFETCH_ASSET_TYPES = ["us_stock", "fx"]
+
+# 共通の日付軸の作り方（union: 全資産の日付の和集合、intersection: 全資産に共通の日付のみ）
+COMPARE_CALENDAR = os.getenv("COMPARE_CALENDAR", ALIGNMENT_UNION).lower()
+
 
 @router.post("/compare", response_model=CompareResponse)
 async def compare_assets(request: CompareRequest):
@@ -42,66 +70,105 @@ async def compare_assets(request: CompareRequest):
     # 期間設定
     period = request.period or "1y"
 
-    # データ取得
-    assets_data = []
+    # 同じ資産構成・期間・基準日の結果はキャッシュから返す（資産の並び順は問わない）
+    response_key = f"compare_response:{_request_fingerprint(request, period)}"
+    cached = cache_service.get(response_key)
+    if cached is not None:
+        return _json_response(_in_request_order(cached, request.assets))
 
-    for asset in request.assets:
-        try:
-            data = await _get_asset_data(
-                symbol=asset.symbol,
-                asset_type=asset.asset_type,
-                period=period
-            )
+    # 米国株・為替は資産クラスごとに1回の一括ダウンロードで先読み（銘柄ごとの取得はキャッシュから返る）
+    prefetch = asyncio.ensure_future(_prefetch_batches(request.assets, period))
 
-            if not data:
-                continue
-
-            # 価格リスト作成
-            prices = [point["price"] for point in data]
-            dates = [point["date"] for point in data]
-
-            if not prices:
-                continue
-
-            # 正規化
-            normalized_prices = performance_calculator.normalize_prices(prices)
-
-            # メトリクス計算
-            metrics = performance_calculator.calculate_metrics(prices)
-
-            # データポイント作成
-            data_points = []
-            for i, (date, price, norm_price) in enumerate(zip(dates, prices, normalized_prices)):
-                data_points.append(DataPoint(
-                    date=date,
-                    value=price,
-                    normalized_value=norm_price
-                ))
-
-            # 表示名を設定
-            display_name = asset.name or asset.symbol
-
-            assets_data.append(AssetPerformance(
-                symbol=asset.symbol,
-                asset_type=asset.asset_type,
-                name=display_name,
-                data=data_points,
-                total_return=metrics["total_return"],
-                volatility=metrics["volatility"],
-                max_drawdown=metrics["max_drawdown"]
-            ))
+    # 全資産を同時に取得（暗号資産はレート制限付きの非同期取得、タイムアウトした資産は除外）
+    results = await asyncio.gather(*(_fetch_asset(asset, period, prefetch) for asset in request.assets))
 
-        except Exception as e:
-            print(f"Error processing {asset.symbol}: {e}")
+    fetched = []
+    failed_assets = []
+
+    for asset, (data, failure) in zip(request.assets, results):
+        if failure is not None:
+            failed_assets.append(FailedAsset(symbol=asset.symbol, asset_type=asset.asset_type, reason=failure))
             continue
+        fetched.append((asset, data))
+
+    # 全資産を共通の日付軸に揃える（暗号資産の暦日・各市場の取引日の違いを前方補完で吸収し、
+    # 基準日があればその日を起点にする）
+    aligned = AlignedPrices.from_points(
+        [data for _, data in fetched],
+        how=COMPARE_CALENDAR,
+        start_date=request.start_date
+    )
+
+    # 基準日以降に価格がない資産は除外
+    rows = []
+    for i, ((asset, _), has_data) in enumerate(zip(fetched, aligned.has_data().tolist())):
+        if has_data:
+            rows.append(i)
+        else:
+            failed_assets.append(FailedAsset(symbol=asset.symbol, asset_type=asset.asset_type, reason="no_data"))
 
-    if not assets_data:
+    if not rows:
         raise HTTPException(status_code=404, detail="No data found for any assets")
 
-    # 期間情報
-    all_dates = [point.date for asset in assets_data for point in asset.data]
-    start_date = min(all_dates) if all_dates else datetime.now().strftime("%Y-%m-%d")
-    end_date = max(all_dates) if all_dates else datetime.now().strftime("%Y-%m-%d")
+    # メトリクス計算（系列ごとにキャッシュし、未計算の資産だけを1回のベクトル演算で計算）
+    counts = aligned.observation_counts()
+    metrics_keys = [
+        _metrics_cache_key(fetched[i][0], period, request.start_date, int(counts[i]), fetched[i][1][-1])
+        for i in rows
+    ]
+    all_metrics = [cache_service.get(key) for key in metrics_keys]
+
+    missing = [j for j, metrics in enumerate(all_metrics) if metrics is None]
+    if missing:
+        computed = performance_calculator.metrics_to_dicts(
+            performance_calculator.calculate_metrics_matrix(
+                aligned.observed_matrix()[[rows[j] for j in missing]],
+                periods=[periods_per_year(fetched[rows[j]][0].asset_type) for j in missing]
+            )
+        )
+        for j, metrics in zip(missing, computed):
+            all_metrics[j] = metrics
+            cache_service.set(metrics_keys[j], metrics, _series_ttl(fetched[rows[j]][0], period))
+
+    # 正規化（基準日 = 100）
+    dates = aligned.date_strings()
+    normalized = aligned.normalized()
+    first_valid = aligned.first_valid().tolist()
+
+    assets_data = []
+    for i, metrics in zip(rows, all_metrics):
+        asset = fetched[i][0]
+        first = first_valid[i]
+
+        # データポイント作成（その資産の最初の価格以降）
+        data_points = [
+            DataPoint(date=day, value=price, normalized_value=norm_price)
+            for day, price, norm_price in zip(
+                dates[first:],
+                aligned.prices[i, first:].tolist(),
+                normalized[i, first:].tolist()
+            )
+        ]
+
+        # 表示名を設定
+        display_name = asset.name or asset.symbol
+
+        assets_data.append(AssetPerformance(
+            symbol=asset.symbol,
+            asset_type=asset.asset_type,
+            name=display_name,
+            data=data_points,
+            total_return=metrics["total_return"],
+            volatility=metrics["volatility"],
+            max_drawdown=metrics["max_drawdown"],
+            sharpe_ratio=metrics["sharpe_ratio"],
+            sortino_ratio=metrics["sortino_ratio"],
+            calmar_ratio=metrics["calmar_ratio"]
+        ))
+
+    # 期間情報（共通の日付軸の両端）
+    start_date = dates[min(first_valid[i] for i in rows)]
+    end_date = dates[-1]
 
     # ランキング作成
     ranking_data = [
@@ -117,14 +184,225 @@ async def compare_assets(request: CompareRequest):
     ]
     ranking = performance_calculator.create_ranking(ranking_data)
 
-    return CompareResponse(
+    response = CompareResponse(
         assets=assets_data,
         start_date=start_date,
         end_date=end_date,
-        ranking=ranking
+        ranking=ranking,
+        partial=bool(failed_assets),
+        failed_assets=failed_assets
+    )
+
+    # 結果全体は、元になった系列のうち最も早く鮮度が切れるものに合わせて失効させる
+    # （一部の資産を取得できなかった結果はキャッシュしない）
+    encoded = _encode_response(response)
+    if not failed_assets:
+        ttl = min(_series_ttl(asset, period) for asset, _ in fetched)
+        if ttl > 0:
+            cache_service.set(response_key, encoded, ttl)
+
+    return _json_response(_in_request_order(encoded, request.assets))
+
+
+def _asset_cache_key(asset: AssetSymbol, period: str) -> str:
+    """資産ごとの価格系列キャッシュキー"""
+    return f"compare_asset:{asset.asset_type}:{asset.symbol}:{period}"
+
+
+def _metrics_cache_key(
+    asset: AssetSymbol,
+    period: str,
+    start_date: Optional[date],
+    observations: int,
+    last_point: dict
+) -> str:
+    """
+    資産ごとのメトリクスキャッシュキー
+
+    基準日・日付軸の作り方に加え、観測数・最終日・最終値を含め、
+    系列が更新されたら別キーになるようにする。
+    """
+    start = start_date.isoformat() if start_date else "-"
+    return (
+        f"compare_metrics:{asset.asset_type}:{asset.symbol}:{period}:{start}:{COMPARE_CALENDAR}:"
+        f"{observations}:{last_point['date']}:{last_point['price']!r}"
     )
 
 
+def _series_ttl(asset: AssetSymbol, period: str) -> int:
+    """資産の価格系列キャッシュの鮮度が切れるまでの秒数"""
+    remaining = cache_service.ttl_remaining(_asset_cache_key(asset, period))
+    if remaining is None:
+        return _asset_cache_ttl(asset.asset_type)
+    return int(remaining)
+
+
+def _request_fingerprint(request: CompareRequest, period: str) -> str:
+    """
+    比較リクエストの正規化した指紋
+
+    資産（資産クラス・シンボル・表示名）を並べ替え、期間・基準日と合わせてハッシュ化する。
+    """
+    payload = {
+        "assets": sorted((asset.asset_type, asset.symbol, asset.name or "") for asset in request.assets),
+        "period": period,
+        "start_date": request.start_date.isoformat() if request.start_date else None
+    }
+    return hashlib.sha1(json.dumps(payload, sort_keys=True).encode("utf-8")).hexdigest()
+
+
+# エンコード済みの比較結果: ([(資産キー, 資産のJSON), ...], 資産以外のフィールドのJSON)
+EncodedCompare = Tuple[List[Tuple[Tuple[str, str, str], bytes]], bytes]
+
+
+def _asset_key(asset_type: str, symbol: str, name: str) -> Tuple[str, str, str]:
+    """結果の資産とリクエストの資産を対応付けるキー（資産クラス・シンボル・表示名）"""
+    return (asset_type, symbol, name)
+
+
+def _encode_response(response: CompareResponse) -> EncodedCompare:
+    """
+    比較結果をJSONバイト列にエンコード
+
+    キャッシュにはモデルではなくバイト列を保存する（メモリ見積もりが実際のサイズと一致し、
+    ヒット時にシリアライズし直さない）。資産は並べ替えられるよう1件ずつエンコードする。
+    """
+    assets = [
+        (_asset_key(asset.asset_type, asset.symbol, asset.name), asset.model_dump_json().encode("utf-8"))
+        for asset in response.assets
+    ]
+    return assets, response.model_dump_json(exclude={"assets"}).encode("utf-8")
+
+
+def _in_request_order(encoded: EncodedCompare, assets: List[AssetSymbol]) -> bytes:
+    """
+    エンコード済みの結果の資産をリクエストの順序に並べてJSONを組み立てる
+
+    同じ資産が複数回指定された場合も、指定された位置ごとに1件ずつ対応付ける。
+    """
+    entries, envelope = encoded
+
+    queues: Dict[Tuple[str, str, str], List[bytes]] = {}
+    for key, asset_json in entries:
+        queues.setdefault(key, []).append(asset_json)
+
+    ordered = []
+    for asset in assets:
+        queue = queues.get(_asset_key(asset.asset_type, asset.symbol, asset.name or asset.symbol))
+        if queue:
+            ordered.append(queue.pop(0))
+
+    return b'{"assets":[' + b",".join(ordered) + b"]," + envelope[1:]
+
+
+def _json_response(content: bytes) -> Response:
+    """エンコード済みのJSONをそのまま返す"""
+    return Response(content=content, media_type="application/json")
+
+
+async def _prefetch_batches(assets: List[AssetSymbol], period: str) -> None:
+    """
+    資産クラスごとに yfinance の一括ダウンロードで先読み
+
+    Args:
+        assets: 比較する資産リスト
+        period: 期間
+    """
+    tasks = []
+    for asset_type in BATCH_PREFETCH_ASSET_TYPES:
+        symbols = [
+            _yfinance_symbol(asset.symbol, asset.asset_type)
+            for asset in assets if asset.asset_type == asset_type
+        ]
+        if len(symbols) > 1:
+            tasks.append(asyncio.wait_for(
+                asyncio.to_thread(
+                    yfinance_client.get_stock_data_batch,
+                    symbols,
+                    period=period,
+                    interval="1d",
+                    asset_type=asset_type
+                ),
+                timeout=COMPARE_ASSET_TIMEOUT
+            ))
+
+    # 先読みの失敗は無視し、資産ごとの取得に任せる
+    for result in await asyncio.gather(*tasks, return_exceptions=True):
+        if isinstance(result, BaseException):
+            logger.warning(f"Compare batch prefetch failed: {result!r}")
+
+
+async def _fetch_asset(
+    asset: AssetSymbol,
+    period: str,
+    prefetch: "asyncio.Future"
+) -> Tuple[Optional[List[dict]], Optional[str]]:
+    """
+    1資産のデータを取得（タイムアウト付き）
+
+    Args:
+        asset: 資産
+        period: 期間
+        prefetch: 一括ダウンロードの先読み（対象の資産クラスは完了を待ってから取得）
+
+    Returns:
+        (価格データ, 失敗理由) 失敗理由は timeout / no_data / error、成功時はNone
+    """
+    if asset.asset_type in BATCH_PREFETCH_ASSET_TYPES:
+        await prefetch
+
+    try:
+        # 同一資産の同時リクエストは上流取得を1回にまとめる
+        data = await asyncio.wait_for(
+            cache_service.get_or_compute(
+                _asset_cache_key(asset, period),
+                partial(
+                    _get_asset_data,
+                    symbol=asset.symbol,
+                    asset_type=asset.asset_type,
+                    period=period
+                ),
+                _asset_cache_ttl(asset.asset_type)
+            ),
+            timeout=COMPARE_ASSET_TIMEOUT
+        )
+    except asyncio.TimeoutError:
+        logger.warning(f"Compare data fetch timed out for {asset.symbol}")
+        return None, "timeout"
+    except Exception as e:
+        logger.error(f"Error processing {asset.symbol}: {e}")
+        return None, "error"
+
+    if not data:
+        return None, "no_data"
+
+    return data, None
+
+
+def _yfinance_symbol(symbol: str, asset_type: str) -> str:
+    """為替は "USD/JPY" を yfinance の "USDJPY" 形式に変換"""
+    if asset_type == "fx":
+        return "".join(fx_pair(symbol))
+    return symbol
+
+
+def _asset_cache_ttl(asset_type: str) -> int:
+    """
+    資産クラスごとのキャッシュTTL
+
+    Args:
+        asset_type: 資産クラス
+
+    Returns:
+        有効期限（秒）
+    """
+    if asset_type == "crypto":
+        return CACHE_TTL_CRYPTO
+    if asset_type == "fx":
+        return CACHE_TTL_EXCHANGE_RATE
+    return CACHE_TTL_STOCK_PRICE
+
+
 async def _get_asset_data(symbol: str, asset_type: str, period: str) -> List[dict]:
     """
     資産データ取得
@@ -149,16 +427,9 @@ async def _get_asset_data(symbol: str, asset_type: str, period: str) -> List[dic
         days = days_map.get(period, 365)
 
         # CoinGecko ID取得（簡易マッピング）
-        crypto_id_map = {
-            "BTC": "bitcoin",
-            "ETH": "ethereum",
-            "XRP": "ripple",
-            "ADA": "cardano",
-            "SOL": "solana"
-        }
-        crypto_id = crypto_id_map.get(symbol.upper(), symbol.lower())
+        crypto_id = crypto_client.symbol_to_id(symbol)
 
-        historical_data = crypto_client.get_historical_data(
+        historical_data = await crypto_client.get_historical_data(
             crypto_id=crypto_id,
             vs_currency="usd",
             days=days
@@ -166,50 +437,43 @@ async def _get_asset_data(symbol: str, asset_type: str, period: str) -> List[dic
 
         return [{"date": item["date"], "price": item["price"]} for item in historical_data]
 
-    elif asset_type == "fx":
-        # 為替の場合
-        # シンボルからbase/targetを抽出 (例: USD/JPY -> USD, JPY)
-        if "/" in symbol:
-            base, target = symbol.split("/")
-        else:
-            # USDJPY形式の場合
-            base = symbol[:3]
-            target = symbol[3:]
-
-        days_map = {
-            "1mo": 30,
-            "3mo": 90,
-            "6mo": 180,
-            "1y": 365,
-            "5y": 1825
-        }
-        days = days_map.get(period, 365)
-
-        historical_data = exchange_rate_client.get_historical_rates(
-            base_currency=base,
-            target_currency=target,
-            days=days
-        )
+    # 株式・為替の履歴取得はブロッキングI/Oのためスレッドプールで実行
+    return await asyncio.to_thread(_get_history_points, symbol, asset_type, period)
 
-        return [{"date": item["date"], "price": item["rate"]} for item in historical_data]
 
-    else:
-        # 株式（日本株・米国株）の場合
-        df = yfinance_client.get_stock_data(
-            stock_code=symbol,
-            period=period,
-            interval="1d",
-            asset_type=asset_type
-        )
+def _get_history_points(symbol: str, asset_type: str, period: str) -> List[dict]:
+    """
+    株式・為替の価格データ取得（同期）
 
-        if df is None or df.empty:
-            return []
+    Args:
+        symbol: シンボル
+        asset_type: 資産クラス
+        period: 期間
 
-        result = []
-        for index, row in df.iterrows():
-            result.append({
-                "date": index.strftime("%Y-%m-%d"),
-                "price": float(row["Close"])
-            })
+    Returns:
+        価格データ
+    """
+    # 日本株はローカル株価ストアを優先
+    if asset_type == "jp_stock":
+        with SessionLocal() as db:
+            series = price_store.get_series(db, symbol, period)
+        if series is not None:
+            return [
+                {"date": day, "price": price}
+                for day, price in zip(series.date_strings(), series.close.tolist())
+            ]
+
+    # 株式（日本株・米国株）・為替の場合（先読み済みならキャッシュから返る）
+    series = yfinance_client.get_price_series(
+        _yfinance_symbol(symbol, asset_type),
+        period=period,
+        interval="1d",
+        asset_type=asset_type
+    )
+    if series is None:
+        return []
 
-        return result
+    return [
+        {"date": day, "price": price}
+        for day, price in zip(series.date_strings(), series.close.tolist())
+    ]
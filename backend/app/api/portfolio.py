@@ -3,9 +3,9 @@ Portfolio API Endpoints
 ポートフォリオ関連のAPIエンドポイント
 """
 
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Query
 from sqlalchemy.orm import Session, joinedload
-from typing import List
+from typing import List, Optional
 
 from app.db.database import get_db
 from app.models.portfolio import Portfolio
@@ -16,63 +16,66 @@ from app.schemas.portfolio import (
     PortfolioResponse,
     PortfolioWithPerformance
 )
-from app.services.yfinance_client import yfinance_client
 from app.services.portfolio_calculator import portfolio_calculator
+from app.services.pricing_service import pricing_service
 
 router = APIRouter()
 
 
 @router.get("/", response_model=List[PortfolioWithPerformance])
-async def get_portfolio(db: Session = Depends(get_db)):
+async def get_portfolio(
+    base_currency: Optional[str] = Query(None, description="評価額の基準通貨 (デフォルト: JPY)"),
+    db: Session = Depends(get_db)
+):
     """
     ポートフォリオ一覧取得
 
     - 全保有銘柄を取得
-    - 現在価格とパフォーマンスを計算
+    - 現在価格とパフォーマンスを計算（評価額・損益は基準通貨建て）
     """
     portfolio_items = db.query(Portfolio).all()
 
+    # 全保有銘柄の価格スナップショットを取得（サマリーと共有、取得できない銘柄は価格なし）
+    snapshot = await pricing_service.get_snapshot(
+        [(item.asset_type, item.symbol) for item in portfolio_items],
+        base_currency
+    )
+
+    # 日本株の企業名をまとめて取得
+    jp_symbols = [item.symbol for item in portfolio_items if item.asset_type == "jp_stock"]
+    company_names = {
+        company.stock_code: company.name
+        for company in db.query(Company).filter(Company.stock_code.in_(jp_symbols))
+    } if jp_symbols else {}
+
     result = []
     for item in portfolio_items:
-        # 現在価格を取得
-        current_price = None
         company_name = None
 
         if item.asset_type == "jp_stock":
             # 日本株の場合
-            stock_data = yfinance_client.get_stock_data_dict(item.symbol, period="1d")
-            if stock_data:
-                current_price = stock_data[-1]["close"]
-
-            # 企業名取得
-            company = db.query(Company).filter(Company.stock_code == item.symbol).first()
-            if company:
-                company_name = company.name
+            company_name = company_names.get(item.symbol)
 
         elif item.asset_type == "us_stock":
             # 米国株の場合
-            stock_data = yfinance_client.get_stock_data_dict(item.symbol, period="1d")
-            if stock_data:
-                current_price = stock_data[-1]["close"]
             company_name = item.symbol
 
         # パフォーマンス計算
-        current_value = None
-        profit_loss = None
-        profit_loss_percentage = None
-
-        if current_price:
-            current_value = current_price * item.quantity
-            purchase_value = item.purchase_price * item.quantity
-            profit_loss = current_value - purchase_value
-            profit_loss_percentage = (profit_loss / purchase_value) * 100
+        valuation = snapshot.value_holding(
+            item.asset_type,
+            item.symbol,
+            float(item.purchase_price),
+            float(item.quantity)
+        )
 
         result.append({
             **item.__dict__,
-            "current_price": current_price,
-            "current_value": current_value,
-            "profit_loss": profit_loss,
-            "profit_loss_percentage": profit_loss_percentage,
+            "current_price": valuation["current_price"],
+            "current_value": valuation["current_value"],
+            "profit_loss": valuation["profit_loss"],
+            "profit_loss_percentage": valuation["profit_loss_percentage"],
+            "currency": valuation["currency"],
+            "base_currency": snapshot.base_currency,
             "company_name": company_name
         })
 
@@ -147,13 +150,16 @@ async def delete_portfolio(
 
 
 @router.get("/performance")
-async def get_portfolio_performance(db: Session = Depends(get_db)):
+async def get_portfolio_performance(
+    base_currency: Optional[str] = Query(None, description="評価額の基準通貨 (デフォルト: JPY)"),
+    db: Session = Depends(get_db)
+):
     """
     ポートフォリオ全体のパフォーマンス取得
 
-    - 総投資額、総評価額、総損益を計算
+    - 総投資額、総評価額、総損益を基準通貨建てで計算
     - 資産クラス別アロケーション情報を返却
     """
-    summary = portfolio_calculator.calculate_portfolio_summary(db)
+    summary = await portfolio_calculator.calculate_portfolio_summary(db, base_currency)
 
     return summary
@@ -7,10 +7,14 @@ from fastapi import FastAPI, Request, status
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.responses import JSONResponse
 from contextlib import asynccontextmanager
+import asyncio
 import logging
 
 # スケジューラーのインポート
 from app.services.scheduler import scheduler_service
+from app.services.http_client import http_client_pool
+from app.services.rate_limiter import get_rate_limit_stats
+from app.rag.model_registry import embedding_model_registry, EMBEDDING_WARMUP
 from app.exceptions import A1ProException
 
 # ロガー設定
@@ -26,9 +30,16 @@ async def lifespan(app: FastAPI):
     """アプリケーションのライフサイクル管理"""
     # 起動時: スケジューラー開始
     scheduler_service.start()
+
+    # 埋め込みモデルはバックグラウンドでロード（チャット以外のエンドポイントは待たずに応答できる）
+    warmup = asyncio.create_task(asyncio.to_thread(embedding_model_registry.warmup)) if EMBEDDING_WARMUP else None
+
     yield
-    # 終了時: スケジューラー停止
+    # 終了時: スケジューラー停止、外部API接続のクローズ
     scheduler_service.stop()
+    await http_client_pool.aclose()
+    if warmup is not None and not warmup.done():
+        await asyncio.wait([warmup], timeout=5)
 
 
 app = FastAPI(
@@ -70,6 +81,12 @@ async def health_check():
     }
 
 
+@app.get("/health/rate-limits")
+async def rate_limit_status():
+    """上流APIのレート制限の残り枠"""
+    return get_rate_limit_stats()
+
+
 # ルーター登録
 from app.api import companies, chat, portfolio, favorites, compare
 
@@ -23,9 +23,9 @@ class StockPrice(Base):
     # Relationship
     company = relationship("Company", backref="stock_prices")
 
-    # Composite index for efficient querying
+    # Composite index for efficient querying (1企業1日1行、UPSERTの衝突キー)
     __table_args__ = (
-        Index('idx_company_date', 'company_id', 'date'),
+        Index('idx_company_date', 'company_id', 'date', unique=True),
     )
 
     def __repr__(self):
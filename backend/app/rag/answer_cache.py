@@ -0,0 +1,214 @@
+"""
+Semantic Answer Cache
+意味的に同じ質問への回答を再利用するキャッシュ
+"""
+
+from typing import Any, Dict, List, Optional, Tuple
+import os
+import threading
+import time
+
+import numpy as np
+
+from app.services.cache_service import cache_service
+
+
+# 同じ質問とみなすコサイン類似度の下限
+ANSWER_CACHE_SIMILARITY = float(os.getenv("ANSWER_CACHE_SIMILARITY", "0.95"))
+
+# 回答を再利用する時間（秒）
+ANSWER_CACHE_TTL = int(os.getenv("ANSWER_CACHE_TTL", "3600"))
+
+# 銘柄コード（絞り込み条件）ごとに保持する回答数の上限
+ANSWER_CACHE_MAX_ENTRIES = int(os.getenv("ANSWER_CACHE_MAX_ENTRIES", "256"))
+
+# 銘柄コードを指定しない質問のスコープ
+ALL_COMPANIES = "*"
+
+# インデックス更新の世代を保持する時間（秒）
+INDEX_VERSION_TTL = 30 * 86400
+
+
+def _index_version_key(scope: str) -> str:
+    """インデックス更新の世代を記録するキャッシュキー"""
+    return f"rag_index_version:{scope}"
+
+
+def _current_version(scope: str) -> float:
+    """
+    スコープの現在のインデックス世代を取得
+
+    世代が失効・追い出しで消えていた場合は、新しい世代を記録して返す
+    （消えた世代を「無効化なし」と読むと、無効化済みの古い回答が有効に戻るため）。
+    """
+    key = _index_version_key(scope)
+    version = cache_service.get(key)
+    if version is None:
+        version = time.time()
+        cache_service.set(key, version, INDEX_VERSION_TTL)
+    return version
+
+
+class _Scope:
+    """1つの絞り込み条件の回答（エンベディング行列と回答のリスト）"""
+
+    def __init__(self):
+        self.embeddings: Optional[np.ndarray] = None
+        self.entries: List[Tuple[Dict[str, Any], float, Any]] = []  # (回答, 有効期限, インデックス世代)
+
+
+class SemanticAnswerCache:
+    """
+    (銘柄コード, 質問エンベディング) -> 回答 のキャッシュ
+
+    質問エンベディングは正規化済みのため、内積がそのままコサイン類似度になる。
+    最も近い過去の質問の類似度が ANSWER_CACHE_SIMILARITY 以上なら、その回答を返す。
+
+    企業の再インデックス時は cache_service に記録した世代を更新して無効化する
+    （共有キャッシュバックエンドを使っていれば他のワーカーの回答も無効になる）。
+    """
+
+    def __init__(
+        self,
+        threshold: float = ANSWER_CACHE_SIMILARITY,
+        ttl: int = ANSWER_CACHE_TTL,
+        max_entries: int = ANSWER_CACHE_MAX_ENTRIES
+    ):
+        """
+        Args:
+            threshold: 同じ質問とみなすコサイン類似度の下限
+            ttl: 回答を再利用する時間（秒）
+            max_entries: 絞り込み条件ごとの回答数の上限
+        """
+        self.threshold = threshold
+        self.ttl = ttl
+        self.max_entries = max_entries
+
+        self._scopes: Dict[Tuple[str, int], _Scope] = {}
+        self._lock = threading.Lock()
+        self._hits = 0
+        self._misses = 0
+
+    def lookup(
+        self,
+        stock_code: Optional[str],
+        n_results: int,
+        embedding: np.ndarray
+    ) -> Tuple[Optional[Dict[str, Any]], float]:
+        """
+        意味的に同じ質問の回答を取得
+
+        Args:
+            stock_code: 銘柄コード（Noneの場合は全企業）
+            n_results: 検索件数
+            embedding: 質問の正規化済みエンベディング
+
+        Returns:
+            (回答（answer, sources）、ない場合はNone, 参照したインデックス世代)
+            ミスした場合、世代は回答を生成した後に store へ渡す
+        """
+        scope_name = stock_code or ALL_COMPANIES
+        version = _current_version(scope_name)
+        now = time.time()
+
+        with self._lock:
+            scope = self._scopes.get((scope_name, n_results))
+            if scope is not None and scope.embeddings is not None:
+                # 期限切れ・古い世代の回答を除いてから最も近い質問を選ぶ
+                usable = np.array([
+                    expires_at > now and entry_version == version
+                    for _, expires_at, entry_version in scope.entries
+                ])
+                similarities = np.where(usable, scope.embeddings @ embedding, -np.inf)
+                best = int(np.argmax(similarities))
+
+                if similarities[best] >= self.threshold:
+                    self._hits += 1
+                    return scope.entries[best][0], version
+
+            self._misses += 1
+            return None, version
+
+    def store(
+        self,
+        stock_code: Optional[str],
+        n_results: int,
+        embedding: np.ndarray,
+        result: Dict[str, Any],
+        version: float
+    ) -> None:
+        """
+        回答を保存
+
+        回答の生成中に再インデックスされた場合（lookup 時の世代が現在の世代と異なる場合）は、
+        古いチャンクから作った回答のため保存しない。
+
+        Args:
+            stock_code: 銘柄コード（Noneの場合は全企業）
+            n_results: 検索件数
+            embedding: 質問の正規化済みエンベディング
+            result: 回答（answer, sources）
+            version: lookup が返したインデックス世代
+        """
+        scope_name = stock_code or ALL_COMPANIES
+        if version != _current_version(scope_name):
+            return
+        now = time.time()
+
+        with self._lock:
+            scope = self._scopes.setdefault((scope_name, n_results), _Scope())
+
+            # 期限切れ・古い世代の回答を除き、上限を超えたら古いものから捨てる
+            keep = [
+                i for i, (_, expires_at, entry_version) in enumerate(scope.entries)
+                if expires_at > now and entry_version == version
+            ][-(self.max_entries - 1):] if self.max_entries > 1 else []
+
+            vectors = [scope.embeddings[i] for i in keep] + [np.asarray(embedding, dtype=np.float32)]
+            scope.entries = [scope.entries[i] for i in keep] + [(result, now + self.ttl, version)]
+            scope.embeddings = np.stack(vectors)
+
+    def invalidate(self, stock_code: str) -> None:
+        """
+        企業の再インデックス時に回答を無効化
+
+        その企業に絞った回答と、全企業を対象にした回答の両方が対象。
+
+        Args:
+            stock_code: 銘柄コード
+        """
+        version = time.time()
+        for scope_name in (stock_code, ALL_COMPANIES):
+            cache_service.set(_index_version_key(scope_name), version, INDEX_VERSION_TTL)
+
+        with self._lock:
+            for key in [key for key in self._scopes if key[0] in (stock_code, ALL_COMPANIES)]:
+                del self._scopes[key]
+
+    def clear(self) -> None:
+        """キャッシュと統計をクリア"""
+        with self._lock:
+            self._scopes.clear()
+            self._hits = 0
+            self._misses = 0
+
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        キャッシュ統計情報を取得
+
+        Returns:
+            回答数・類似度の下限・ヒット数・ミス数・ヒット率
+        """
+        with self._lock:
+            lookups = self._hits + self._misses
+            return {
+                "entries": sum(len(scope.entries) for scope in self._scopes.values()),
+                "threshold": self.threshold,
+                "hits": self._hits,
+                "misses": self._misses,
+                "hit_rate": self._hits / lookups if lookups else 0.0
+            }
+
+
+# Singleton instance
+answer_cache = SemanticAnswerCache()
@@ -3,46 +3,73 @@ Embedding Service for RAG
 テキストのベクトル化とChromaDBへの保存
 """
 
-from typing import List, Dict
-import chromadb
-from chromadb.config import Settings
-from sentence_transformers import SentenceTransformer
+from typing import Dict, Iterator, List, Tuple
+import numpy as np
 import os
+import threading
+
+from app.rag.model_registry import embedding_model_registry
+from app.rag.query_cache import query_embedding_cache
+
+
+# 1回の encode に渡すチャンク数
+EMBEDDING_BATCH_SIZE = int(os.getenv("EMBEDDING_BATCH_SIZE", "64"))
 
 
 class EmbeddingService:
     """エンベディングサービス"""
 
     def __init__(self):
-        """初期化"""
-        # Sentence Transformerモデルのロード
-        self.model = SentenceTransformer('all-MiniLM-L6-v2')
-
+        """初期化（ChromaDBへの接続は初回アクセス時）"""
         # ChromaDB設定
-        persist_directory = os.getenv(
+        self.persist_directory = os.getenv(
             "CHROMA_PERSIST_DIRECTORY",
             "./data/chromadb"
         )
-
-        # ChromaDBクライアント作成
-        self.client = chromadb.Client(Settings(
-            persist_directory=persist_directory,
-            anonymized_telemetry=False
-        ))
-
-        # コレクション取得または作成
         self.collection_name = "financial_data"
-        try:
-            self.collection = self.client.get_collection(self.collection_name)
-        except Exception:
-            self.collection = self.client.create_collection(
-                name=self.collection_name,
-                metadata={"description": "日本株の企業情報・決算データ"}
-            )
+
+        self._client = None
+        self._collection = None
+        self._lock = threading.Lock()
+
+    @property
+    def collection(self):
+        """ChromaDBコレクション（初回アクセス時に接続して取得または作成）"""
+        if self._collection is None:
+            with self._lock:
+                if self._collection is None:
+                    import chromadb
+                    from chromadb.config import Settings
+
+                    # ChromaDBクライアント作成
+                    client = chromadb.Client(Settings(
+                        persist_directory=self.persist_directory,
+                        anonymized_telemetry=False
+                    ))
+
+                    # コレクション取得または作成
+                    try:
+                        collection = client.get_collection(self.collection_name)
+                    except Exception:
+                        collection = client.create_collection(
+                            name=self.collection_name,
+                            metadata={"description": "日本株の企業情報・決算データ"}
+                        )
+
+                    self._client = client
+                    self._collection = collection
+        return self._collection
+
+    @property
+    def model(self):
+        """埋め込みモデル（初回アクセス時にロード、VectorStore と共有）"""
+        return embedding_model_registry.get()
 
     def embed_text(self, text: str) -> List[float]:
         """
-        テキストをベクトル化
+        テキスト（検索クエリ）をベクトル化
+
+        同じクエリの再計算を避けるため、クエリエンベディングのLRUキャッシュを通す。
 
         Args:
             text: 入力テキスト
@@ -50,8 +77,20 @@ class EmbeddingService:
         Returns:
             エンベディングベクトル
         """
-        embedding = self.model.encode(text)
-        return embedding.tolist()
+        return query_embedding_cache.get(text).tolist()
+
+    def embed_texts(self, texts: List[str], batch_size: int = EMBEDDING_BATCH_SIZE) -> np.ndarray:
+        """
+        複数テキストをまとめてベクトル化
+
+        Args:
+            texts: 入力テキストリスト
+            batch_size: モデルの1回の順伝播で処理する件数
+
+        Returns:
+            正規化済みエンベディング行列（件数 × 次元、float32）
+        """
+        return embedding_model_registry.encode(texts, batch_size=batch_size)
 
     def add_documents(
         self,
@@ -65,36 +104,65 @@ class EmbeddingService:
             chunks: チャンクリスト（text, metadataを含む）
             stock_code: 銘柄コード
         """
-        if not chunks:
-            return
+        self.add_documents_bulk({stock_code: chunks})
 
-        documents = []
-        embeddings = []
-        ids = []
-        metadatas = []
+    def add_documents_bulk(
+        self,
+        chunks_by_company: Dict[str, List[Dict[str, str]]],
+        batch_size: int = EMBEDDING_BATCH_SIZE
+    ) -> int:
+        """
+        複数企業のドキュメントをまとめてChromaDBに追加
 
-        for i, chunk in enumerate(chunks):
-            text = chunk["text"]
-            metadata = chunk["metadata"]
+        企業をまたいで batch_size 件ずつ1回の encode でベクトル化し、
+        そのまま同じ単位でChromaDBに追加する。
 
-            # エンベディング生成
-            embedding = self.embed_text(text)
+        Args:
+            chunks_by_company: 銘柄コード -> チャンクリスト（text, metadataを含む）
+            batch_size: 1回の encode / 追加で処理するチャンク数
 
-            # ID生成
-            chunk_id = f"{stock_code}_{metadata['type']}_{i}"
+        Returns:
+            追加したチャンク数
+        """
+        added = 0
+
+        for batch in self._iter_batches(chunks_by_company, batch_size):
+            ids = [chunk_id for chunk_id, _ in batch]
+            documents = [chunk["text"] for _, chunk in batch]
+            metadatas = [chunk["metadata"] for _, chunk in batch]
+
+            # エンベディング生成（バッチ単位で1回）
+            embeddings = self.embed_texts(documents, batch_size=batch_size)
+
+            # ChromaDBに追加
+            self.collection.add(
+                documents=documents,
+                embeddings=embeddings.tolist(),
+                ids=ids,
+                metadatas=metadatas
+            )
+            added += len(batch)
 
-            documents.append(text)
-            embeddings.append(embedding)
-            ids.append(chunk_id)
-            metadatas.append(metadata)
+        return added
 
-        # ChromaDBに追加
-        self.collection.add(
-            documents=documents,
-            embeddings=embeddings,
-            ids=ids,
-            metadatas=metadatas
-        )
+    @staticmethod
+    def _iter_batches(
+        chunks_by_company: Dict[str, List[Dict[str, str]]],
+        batch_size: int
+    ) -> Iterator[List[Tuple[str, Dict[str, str]]]]:
+        """(チャンクID, チャンク) を企業をまたいで batch_size 件ずつ返す"""
+        batch: List[Tuple[str, Dict[str, str]]] = []
+
+        for stock_code, chunks in chunks_by_company.items():
+            for i, chunk in enumerate(chunks):
+                # ID生成
+                batch.append((f"{stock_code}_{chunk['metadata']['type']}_{i}", chunk))
+                if len(batch) >= batch_size:
+                    yield batch
+                    batch = []
+
+        if batch:
+            yield batch
 
     def search_similar(
         self,
@@ -152,6 +220,20 @@ class EmbeddingService:
             where={"stock_code": stock_code}
         )
 
+    def delete_companies_data(self, stock_codes: List[str]) -> None:
+        """
+        複数企業のデータをまとめて削除
+
+        Args:
+            stock_codes: 銘柄コードリスト
+        """
+        if not stock_codes:
+            return
+
+        self.collection.delete(
+            where={"stock_code": {"$in": list(stock_codes)}}
+        )
+
     def get_collection_count(self) -> int:
         """
         コレクション内のドキュメント数を取得
@@ -5,7 +5,6 @@ Handles connection and interaction with Ollama (Llama 3.1)
 
 import os
 from typing import Optional
-from langchain_community.llms import Ollama
 from dotenv import load_dotenv
 
 load_dotenv()
@@ -29,11 +28,21 @@ class OllamaClient:
         self.base_url = base_url or os.getenv("OLLAMA_BASE_URL", "http://localhost:11434")
         self.model = model or os.getenv("OLLAMA_MODEL", "llama3.1:8b")
 
-        self.llm = Ollama(
-            base_url=self.base_url,
-            model=self.model,
-            temperature=0.7,
-        )
+        # Created on first use (langchain is slow to import)
+        self._llm = None
+
+    @property
+    def llm(self):
+        """LangChain Ollama LLM (created on first use)"""
+        if self._llm is None:
+            from langchain_community.llms import Ollama
+
+            self._llm = Ollama(
+                base_url=self.base_url,
+                model=self.model,
+                temperature=0.7,
+            )
+        return self._llm
 
     def generate(self, prompt: str) -> str:
         """
@@ -0,0 +1,106 @@
+"""
+Embedding Model Registry
+埋め込みモデルをプロセス内で1回だけロードして共有する
+"""
+
+from typing import Dict, List
+import logging
+import os
+import threading
+import time
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+# 使用する埋め込みモデル
+EMBEDDING_MODEL_NAME = os.getenv("EMBEDDING_MODEL_NAME", "all-MiniLM-L6-v2")
+
+# 起動時にバックグラウンドでモデルをロードしておくか
+EMBEDDING_WARMUP = os.getenv("EMBEDDING_WARMUP", "true").lower() not in ("0", "false", "no")
+
+
+class EmbeddingModelRegistry:
+    """
+    埋め込みモデルのレジストリ
+
+    モデルは最初に使われた時点でロードし、EmbeddingService と VectorStore で
+    同じインスタンスを共有する（ワーカーごとに1回だけロード）。
+    """
+
+    def __init__(self):
+        self._models: Dict[str, object] = {}
+        self._lock = threading.Lock()
+
+    def get(self, model_name: str = EMBEDDING_MODEL_NAME):
+        """
+        モデルを取得（未ロードならロード）
+
+        Args:
+            model_name: モデル名
+
+        Returns:
+            SentenceTransformer
+        """
+        model = self._models.get(model_name)
+        if model is not None:
+            return model
+
+        with self._lock:
+            # 同時に呼ばれた場合もロードは1回だけ
+            model = self._models.get(model_name)
+            if model is None:
+                # sentence_transformers（torch）の読み込み自体が重いため、ここで初めてインポートする
+                from sentence_transformers import SentenceTransformer
+
+                started = time.perf_counter()
+                model = SentenceTransformer(model_name)
+                self._models[model_name] = model
+                logger.info(f"Loaded embedding model {model_name} in {time.perf_counter() - started:.1f}s")
+            return model
+
+    def encode(
+        self,
+        texts: List[str],
+        batch_size: int = 32,
+        model_name: str = EMBEDDING_MODEL_NAME
+    ) -> np.ndarray:
+        """
+        テキストをベクトル化（ドキュメント・クエリ共通）
+
+        Args:
+            texts: 入力テキストリスト
+            batch_size: モデルの1回の順伝播で処理する件数
+            model_name: モデル名
+
+        Returns:
+            正規化済みエンベディング行列（件数 × 次元、float32）
+        """
+        embeddings = self.get(model_name).encode(
+            texts,
+            batch_size=batch_size,
+            normalize_embeddings=True,
+            convert_to_numpy=True,
+            show_progress_bar=False
+        )
+        return np.asarray(embeddings, dtype=np.float32)
+
+    def is_loaded(self, model_name: str = EMBEDDING_MODEL_NAME) -> bool:
+        """モデルがロード済みか"""
+        return model_name in self._models
+
+    def warmup(self, model_name: str = EMBEDDING_MODEL_NAME) -> None:
+        """
+        モデルをロードし、1回推論して初回呼び出しの遅延をなくす
+
+        Args:
+            model_name: モデル名
+        """
+        try:
+            self.get(model_name).encode(["warmup"], show_progress_bar=False)
+        except Exception as e:
+            logger.error(f"Embedding model warmup failed: {e}")
+
+
+# Singleton instance
+embedding_model_registry = EmbeddingModelRegistry()
@@ -0,0 +1,116 @@
+"""
+Query Embedding Cache
+検索クエリのエンベディングのLRUキャッシュ
+"""
+
+from collections import OrderedDict
+from typing import Any, Dict
+import os
+import re
+import threading
+import unicodedata
+
+import numpy as np
+
+from app.rag.model_registry import embedding_model_registry
+
+
+# キャッシュするクエリ数の上限
+QUERY_EMBEDDING_CACHE_SIZE = int(os.getenv("QUERY_EMBEDDING_CACHE_SIZE", "1024"))
+
+_WHITESPACE = re.compile(r"\s+")
+
+
+def normalize_query(text: str) -> str:
+    """
+    キャッシュキー用にクエリを正規化
+
+    全角/半角（NFKC）・大文字/小文字・前後と連続する空白の違いを吸収する。
+
+    Args:
+        text: 検索クエリ
+
+    Returns:
+        正規化したクエリ
+    """
+    return _WHITESPACE.sub(" ", unicodedata.normalize("NFKC", text)).strip().lower()
+
+
+class QueryEmbeddingCache:
+    """
+    正規化したクエリ -> エンベディングのLRUキャッシュ
+
+    同じ質問が繰り返される場合にモデルの推論を省く。
+    EmbeddingService・VectorStore・RAGパイプラインで共有する。
+    """
+
+    def __init__(self, maxsize: int = QUERY_EMBEDDING_CACHE_SIZE):
+        """
+        Args:
+            maxsize: キャッシュするクエリ数の上限
+        """
+        self.maxsize = maxsize
+        self._entries: "OrderedDict[str, np.ndarray]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._hits = 0
+        self._misses = 0
+
+    def get(self, text: str) -> np.ndarray:
+        """
+        クエリのエンベディングを取得（キャッシュになければ計算して保存）
+
+        Args:
+            text: 検索クエリ
+
+        Returns:
+            正規化済みエンベディング（float32、読み取り専用）
+        """
+        key = normalize_query(text)
+
+        with self._lock:
+            embedding = self._entries.get(key)
+            if embedding is not None:
+                self._entries.move_to_end(key)
+                self._hits += 1
+                return embedding
+            self._misses += 1
+
+        # 推論はロックの外で行う（同じクエリが同時に来た場合は両方計算し、後者で上書き）
+        embedding = embedding_model_registry.encode([key])[0]
+        embedding.setflags(write=False)
+
+        with self._lock:
+            self._entries[key] = embedding
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+        return embedding
+
+    def clear(self) -> None:
+        """キャッシュと統計をクリア"""
+        with self._lock:
+            self._entries.clear()
+            self._hits = 0
+            self._misses = 0
+
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        キャッシュ統計情報を取得
+
+        Returns:
+            件数・上限・ヒット数・ミス数・ヒット率
+        """
+        with self._lock:
+            lookups = self._hits + self._misses
+            return {
+                "entries": len(self._entries),
+                "maxsize": self.maxsize,
+                "hits": self._hits,
+                "misses": self._misses,
+                "hit_rate": self._hits / lookups if lookups else 0.0
+            }
+
+
+# Singleton instance
+query_embedding_cache = QueryEmbeddingCache()
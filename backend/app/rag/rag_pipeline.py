@@ -4,8 +4,12 @@ Retrieval-Augmented Generation pipeline for question answering
 """
 
 from typing import Dict, Optional, List
+import asyncio
+
 from app.rag.llm_client import ollama_client
 from app.rag.embedding import embedding_service
+from app.rag.query_cache import query_embedding_cache
+from app.rag.answer_cache import answer_cache
 
 
 class RAGPipeline:
@@ -14,6 +18,7 @@ class RAGPipeline:
     def __init__(self):
         self.llm = ollama_client
         self.embedding_service = embedding_service
+        self.answer_cache = answer_cache
 
     def _create_prompt(self, question: str, context: str) -> str:
         """
@@ -61,6 +66,12 @@ class RAGPipeline:
         Returns:
             Dict with answer and sources
         """
+        # Reuse the answer to a semantically equivalent question
+        query_embedding = query_embedding_cache.get(question)
+        cached, index_version = self.answer_cache.lookup(stock_code, n_results, query_embedding)
+        if cached is not None:
+            return cached
+
         # Search for relevant documents using embedding service
         search_results = self.embedding_service.search_similar(
             query=question,
@@ -97,10 +108,13 @@ class RAGPipeline:
             for result in search_results
         ]
 
-        return {
+        result = {
             "answer": answer,
             "sources": sources
         }
+        self.answer_cache.store(stock_code, n_results, query_embedding, result, index_version)
+
+        return result
 
     async def aanswer_question(
         self,
@@ -119,8 +133,16 @@ class RAGPipeline:
         Returns:
             Dict with answer and sources
         """
+        # Reuse the answer to a semantically equivalent question
+        # (embedding inference and the vector search are blocking, so run them in a worker thread)
+        query_embedding = await asyncio.to_thread(query_embedding_cache.get, question)
+        cached, index_version = self.answer_cache.lookup(stock_code, n_results, query_embedding)
+        if cached is not None:
+            return cached
+
         # Search for relevant documents
-        search_results = self.embedding_service.search_similar(
+        search_results = await asyncio.to_thread(
+            self.embedding_service.search_similar,
             query=question,
             n_results=n_results,
             stock_code=stock_code
@@ -155,10 +177,13 @@ class RAGPipeline:
             for result in search_results
         ]
 
-        return {
+        result = {
             "answer": answer,
             "sources": sources
         }
+        self.answer_cache.store(stock_code, n_results, query_embedding, result, index_version)
+
+        return result
 
 
 # Singleton instance
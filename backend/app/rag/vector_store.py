@@ -4,12 +4,13 @@ Handles vector database operations for RAG
 """
 
 import os
+import threading
 from typing import List, Dict, Optional
-import chromadb
-from chromadb.config import Settings
-from sentence_transformers import SentenceTransformer
 from dotenv import load_dotenv
 
+from app.rag.model_registry import embedding_model_registry
+from app.rag.query_cache import query_embedding_cache
+
 load_dotenv()
 
 
@@ -33,25 +34,47 @@ class VectorStore:
             "./data/chromadb"
         )
 
-        # Ensure directory exists
-        os.makedirs(self.persist_directory, exist_ok=True)
-
-        # Initialize ChromaDB client
-        self.client = chromadb.PersistentClient(
-            path=self.persist_directory,
-            settings=Settings(
-                anonymized_telemetry=False
+        self.collection_name = collection_name
+
+        # ChromaDB is opened on first use
+        self._client = None
+        self._collection = None
+        self._lock = threading.Lock()
+
+    @property
+    def client(self):
+        """ChromaDB client (opened on first use)"""
+        if self._client is None:
+            with self._lock:
+                if self._client is None:
+                    import chromadb
+                    from chromadb.config import Settings
+
+                    # Ensure directory exists
+                    os.makedirs(self.persist_directory, exist_ok=True)
+
+                    self._client = chromadb.PersistentClient(
+                        path=self.persist_directory,
+                        settings=Settings(
+                            anonymized_telemetry=False
+                        )
+                    )
+        return self._client
+
+    @property
+    def collection(self):
+        """Collection (created on first use if missing)"""
+        if self._collection is None:
+            self._collection = self.client.get_or_create_collection(
+                name=self.collection_name,
+                metadata={"description": "A1-PRO financial documents"}
             )
-        )
-
-        # Get or create collection
-        self.collection = self.client.get_or_create_collection(
-            name=collection_name,
-            metadata={"description": "A1-PRO financial documents"}
-        )
+        return self._collection
 
-        # Initialize embedding model
-        self.embedding_model = SentenceTransformer('all-MiniLM-L6-v2')
+    @property
+    def embedding_model(self):
+        """Embedding model (loaded on first use, shared with EmbeddingService)"""
+        return embedding_model_registry.get()
 
     def add_documents(
         self,
@@ -68,7 +91,7 @@ class VectorStore:
             ids: Optional list of document IDs
         """
         # Generate embeddings
-        embeddings = self.embedding_model.encode(documents).tolist()
+        embeddings = embedding_model_registry.encode(documents).tolist()
 
         # Generate IDs if not provided
         if ids is None:
@@ -97,8 +120,8 @@ class VectorStore:
         Returns:
             Search results with documents and metadata
         """
-        # Generate query embedding
-        query_embedding = self.embedding_model.encode([query])[0].tolist()
+        # Generate query embedding (shared LRU cache with EmbeddingService)
+        query_embedding = query_embedding_cache.get(query).tolist()
 
         # Search
         results = self.collection.query(
@@ -111,6 +134,7 @@ class VectorStore:
     def delete_collection(self):
         """Delete the entire collection"""
         self.client.delete_collection(self.collection.name)
+        self._collection = None
 
     def get_collection_count(self) -> int:
         """Get number of documents in collection"""
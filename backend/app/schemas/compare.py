@@ -38,6 +38,16 @@ class AssetPerformance(BaseModel):
     total_return: float = Field(..., description="総リターン（%）")
     volatility: Optional[float] = Field(None, description="ボラティリティ")
     max_drawdown: Optional[float] = Field(None, description="最大ドローダウン（%）")
+    sharpe_ratio: Optional[float] = Field(None, description="シャープレシオ")
+    sortino_ratio: Optional[float] = Field(None, description="ソルティノレシオ")
+    calmar_ratio: Optional[float] = Field(None, description="カルマーレシオ")
+
+
+class FailedAsset(BaseModel):
+    """取得できなかった資産"""
+    symbol: str
+    asset_type: str
+    reason: str = Field(..., description="失敗理由 (timeout, no_data, error)")
 
 
 class CompareResponse(BaseModel):
@@ -46,3 +56,5 @@ class CompareResponse(BaseModel):
     start_date: str
     end_date: str
     ranking: List[Dict[str, Any]] = Field(..., description="パフォーマンスランキング")
+    partial: bool = Field(False, description="一部の資産を取得できなかった場合True")
+    failed_assets: List[FailedAsset] = Field(default_factory=list, description="取得できなかった資産")
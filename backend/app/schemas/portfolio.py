@@ -44,4 +44,6 @@ class PortfolioWithPerformance(PortfolioResponse):
     current_value: Optional[float] = None
     profit_loss: Optional[float] = None
     profit_loss_percentage: Optional[float] = None
+    currency: Optional[str] = None
+    base_currency: Optional[str] = None
     company_name: Optional[str] = None
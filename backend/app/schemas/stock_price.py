@@ -5,15 +5,16 @@ Stock Price Schemas
 
 from pydantic import BaseModel
 from datetime import date
+from typing import Optional
 
 
 class StockPriceData(BaseModel):
     """株価データスキーマ"""
     date: str
-    open: float
-    high: float
-    low: float
-    close: float
+    open: Optional[float]
+    high: Optional[float]
+    low: Optional[float]
+    close: Optional[float]
     volume: int
 
 
@@ -22,3 +23,20 @@ class StockPriceResponse(BaseModel):
     stock_code: str
     period: str
     data: list[StockPriceData]
+
+
+class StockPriceColumns(BaseModel):
+    """株価データスキーマ（列指向）"""
+    date: list[str]
+    open: list[Optional[float]]
+    high: list[Optional[float]]
+    low: list[Optional[float]]
+    close: list[Optional[float]]
+    volume: list[int]
+
+
+class StockPriceColumnsResponse(BaseModel):
+    """株価レスポンススキーマ（列指向、チャート向け）"""
+    stock_code: str
+    period: str
+    data: StockPriceColumns
@@ -3,13 +3,20 @@ Buffett Code API Client
 バフェット・コードAPIとの通信クライアント
 """
 
+import asyncio
 import os
 import httpx
 from typing import Dict, List, Optional
 from dotenv import load_dotenv
 
+from app.services.http_client import http_client_pool
+from app.services.rate_limiter import buffett_code_limiter, buffett_code_pace_limiter
+
 load_dotenv()
 
+# 一括取得時の同時リクエスト数の上限
+BUFFETT_CODE_CONCURRENCY = int(os.getenv("BUFFETT_CODE_CONCURRENCY", "4"))
+
 
 class BuffettCodeClient:
     """バフェット・コードAPIクライアント"""
@@ -27,6 +34,23 @@ class BuffettCodeClient:
             "x-api-key": self.api_key
         } if self.api_key else {}
 
+    async def _rate_limit(self) -> bool:
+        """
+        レート制限対応
+
+        月間の予算が残っていれば送信間隔の枠が空くまで待つ。
+        予算を使い切っている場合は待たずにFalseを返す。
+
+        Returns:
+            リクエストしてよい場合True
+        """
+        if await buffett_code_limiter.atry_acquire() > 0:
+            print("Buffett Code API monthly budget exhausted")
+            return False
+
+        await buffett_code_pace_limiter.acquire()
+        return True
+
     async def get_company_info(self, stock_code: str) -> Optional[Dict]:
         """
         企業情報を取得
@@ -43,20 +67,23 @@ class BuffettCodeClient:
         url = f"{self.base_url}/company"
         params = {"ticker": stock_code}
 
-        async with httpx.AsyncClient() as client:
-            try:
-                response = await client.get(
-                    url,
-                    headers=self.headers,
-                    params=params,
-                    timeout=30.0
-                )
-                response.raise_for_status()
-                data = response.json()
-                return data
-            except httpx.HTTPError as e:
-                print(f"Buffett Code API error: {e}")
-                return None
+        if not await self._rate_limit():
+            return None
+
+        try:
+            # アプリ全体で共有する接続プールを使う（リクエストごとのハンドシェイクなし）
+            response = await http_client_pool.get(
+                url,
+                headers=self.headers,
+                params=params,
+                timeout=30.0
+            )
+            response.raise_for_status()
+            data = response.json()
+            return data
+        except httpx.HTTPError as e:
+            print(f"Buffett Code API error: {e}")
+            return None
 
     async def get_financial_data(
         self,
@@ -81,20 +108,60 @@ class BuffettCodeClient:
         if fiscal_year:
             params["fy"] = fiscal_year
 
-        async with httpx.AsyncClient() as client:
-            try:
-                response = await client.get(
-                    url,
-                    headers=self.headers,
-                    params=params,
-                    timeout=30.0
-                )
-                response.raise_for_status()
-                data = response.json()
-                return data
-            except httpx.HTTPError as e:
-                print(f"Buffett Code API error: {e}")
-                return None
+        if not await self._rate_limit():
+            return None
+
+        try:
+            # アプリ全体で共有する接続プールを使う（リクエストごとのハンドシェイクなし）
+            response = await http_client_pool.get(
+                url,
+                headers=self.headers,
+                params=params,
+                timeout=30.0
+            )
+            response.raise_for_status()
+            data = response.json()
+            return data
+        except httpx.HTTPError as e:
+            print(f"Buffett Code API error: {e}")
+            return None
+
+    async def get_financial_data_many(
+        self,
+        stock_codes: List[str],
+        fiscal_year: Optional[int] = None,
+        concurrency: Optional[int] = None
+    ) -> Dict[str, Optional[Dict]]:
+        """
+        複数銘柄の決算データを同時に取得
+
+        Args:
+            stock_codes: 銘柄コードのリスト
+            fiscal_year: 会計年度（オプション）
+            concurrency: 同時リクエスト数の上限（デフォルト: BUFFETT_CODE_CONCURRENCY）
+
+        Returns:
+            銘柄コード -> 決算データ（エラー時はNone）の辞書
+        """
+        semaphore = asyncio.Semaphore(concurrency or BUFFETT_CODE_CONCURRENCY)
+
+        async def fetch(stock_code: str) -> Optional[Dict]:
+            async with semaphore:
+                return await self.get_financial_data(stock_code, fiscal_year)
+
+        codes = list(dict.fromkeys(stock_codes))
+        results = await asyncio.gather(*[fetch(code) for code in codes])
+
+        return dict(zip(codes, results))
+
+    def get_financial_data_many_sync(
+        self,
+        stock_codes: List[str],
+        fiscal_year: Optional[int] = None,
+        concurrency: Optional[int] = None
+    ) -> Dict[str, Optional[Dict]]:
+        """get_financial_data_many の同期版（スクリプト用）"""
+        return http_client_pool.run_sync(self.get_financial_data_many, stock_codes, fiscal_year, concurrency)
 
     async def search_companies(self, query: str) -> List[Dict]:
         """
@@ -0,0 +1,648 @@
+"""
+Cache Backends
+キャッシュの保存先（プロセス内メモリ / SQLite共有ファイル / Redis）
+"""
+
+from typing import Any, Optional, Dict, List, Tuple
+from collections import OrderedDict
+import heapq
+import itertools
+import logging
+import os
+import pickle
+import sqlite3
+import sys
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+# SQLite: 最終参照時刻をまとめて反映する件数・間隔（秒）
+SQLITE_TOUCH_BATCH_SIZE = int(os.getenv("CACHE_SQLITE_TOUCH_BATCH_SIZE", "64"))
+SQLITE_TOUCH_INTERVAL = float(os.getenv("CACHE_SQLITE_TOUCH_INTERVAL", "5"))
+
+# SQLite: 期限切れ削除・追い出しを行う書き込み回数・間隔（秒）
+SQLITE_MAINTENANCE_WRITES = int(os.getenv("CACHE_SQLITE_MAINTENANCE_WRITES", "100"))
+SQLITE_MAINTENANCE_INTERVAL = float(os.getenv("CACHE_SQLITE_MAINTENANCE_INTERVAL", "30"))
+
+
+def estimate_size(value: Any, _depth: int = 0) -> int:
+    """
+    値のおおよそのメモリサイズを見積もる
+
+    Args:
+        value: 対象の値
+
+    Returns:
+        推定バイト数
+    """
+    size = sys.getsizeof(value)
+
+    # 深いネストは打ち切る（見積もりなので厳密さより速度を優先）
+    if _depth >= 3:
+        return size
+
+    if isinstance(value, dict):
+        size += sum(
+            estimate_size(k, _depth + 1) + estimate_size(v, _depth + 1)
+            for k, v in value.items()
+        )
+    elif isinstance(value, (list, tuple, set, frozenset)):
+        size += sum(estimate_size(item, _depth + 1) for item in value)
+
+    return size
+
+
+class CacheEntry:
+    """キャッシュエントリ"""
+
+    __slots__ = ("value", "stale_at", "expires_at", "size", "version")
+
+    def __init__(
+        self,
+        value: Any,
+        stale_at: float,
+        expires_at: float,
+        size: int = 0,
+        version: int = 0
+    ):
+        self.value = value
+        # stale_at 以降は古い値として返しつつ再取得する（expires_at で完全に失効）
+        self.stale_at = stale_at
+        self.expires_at = expires_at
+        self.size = size
+        self.version = version
+
+    @classmethod
+    def create(cls, value: Any, ttl_seconds: int, stale_ttl_seconds: int = 0) -> "CacheEntry":
+        """
+        TTLからエントリを作成
+
+        Args:
+            value: キャッシュする値
+            ttl_seconds: 有効期限（秒）
+            stale_ttl_seconds: 有効期限後も古い値を返してよい猶予（秒）
+
+        Returns:
+            キャッシュエントリ
+        """
+        stale_at = time.time() + ttl_seconds
+        return cls(value, stale_at, stale_at + stale_ttl_seconds)
+
+    def is_expired(self, now: Optional[float] = None) -> bool:
+        """有効期限切れかチェック"""
+        return (now if now is not None else time.time()) > self.expires_at
+
+    def is_stale(self, now: Optional[float] = None) -> bool:
+        """鮮度切れ（再取得が必要）かチェック"""
+        return (now if now is not None else time.time()) > self.stale_at
+
+
+class CacheBackend:
+    """キャッシュ保存先の基底クラス"""
+
+    name = "base"
+
+    def get(self, key: str) -> Optional[CacheEntry]:
+        """有効なエントリを取得（期限切れならNone）"""
+        raise NotImplementedError
+
+    def set(self, key: str, entry: CacheEntry) -> None:
+        """エントリを保存"""
+        raise NotImplementedError
+
+    def delete(self, key: str) -> None:
+        """エントリを削除"""
+        raise NotImplementedError
+
+    def clear(self) -> None:
+        """全エントリを削除"""
+        raise NotImplementedError
+
+    def clear_pattern(self, pattern: str) -> None:
+        """キーに pattern を含むエントリを削除"""
+        raise NotImplementedError
+
+    def cleanup_expired(self) -> None:
+        """期限切れエントリを回収"""
+        raise NotImplementedError
+
+    def contains(self, key: str) -> bool:
+        """有効なエントリが存在するか（LRU順は更新しない）"""
+        raise NotImplementedError
+
+    def get_stats(self) -> Dict[str, Any]:
+        """保存先の統計情報"""
+        raise NotImplementedError
+
+
+class MemoryCacheBackend(CacheBackend):
+    """
+    プロセス内メモリ
+
+    - エントリ数・推定メモリ量の上限を超えるとLRUで追い出す
+    - 有効期限は最小ヒープで管理し、期限切れはO(log n)で回収する
+    """
+
+    name = "memory"
+
+    def __init__(self, max_entries: int, max_bytes: int):
+        """
+        Args:
+            max_entries: 最大エントリ数
+            max_bytes: 最大推定メモリ量
+        """
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+
+        # 挿入/参照順を保持（末尾が最近使用）
+        self._cache: "OrderedDict[str, CacheEntry]" = OrderedDict()
+        # (expires_at, version, key) の最小ヒープ
+        self._expiry_heap: List[Tuple[float, int, str]] = []
+        self._version = itertools.count()
+        self._current_bytes = 0
+        self._lock = threading.Lock()
+
+        self._evictions = 0
+        self._expirations = 0
+
+    def _remove(self, key: str) -> None:
+        """エントリを削除（ロック取得済みで呼ぶこと）"""
+        entry = self._cache.pop(key, None)
+        if entry is not None:
+            self._current_bytes -= entry.size
+
+    def _purge_expired(self, now: float) -> None:
+        """期限切れエントリをヒープ先頭から回収（ロック取得済みで呼ぶこと）"""
+        heap = self._expiry_heap
+        while heap and heap[0][0] <= now:
+            _, version, key = heapq.heappop(heap)
+            entry = self._cache.get(key)
+            # 上書き済みのヒープ要素は無視
+            if entry is not None and entry.version == version:
+                self._remove(key)
+                self._expirations += 1
+
+        # 上書きで残った古いヒープ要素が溜まりすぎたら再構築
+        if len(heap) > 2 * len(self._cache) + 64:
+            self._expiry_heap = [
+                (entry.expires_at, entry.version, key) for key, entry in self._cache.items()
+            ]
+            heapq.heapify(self._expiry_heap)
+
+    def _evict_if_needed(self) -> None:
+        """上限を超えている間、最も古く使われたエントリを追い出す（ロック取得済みで呼ぶこと）"""
+        while self._cache and (
+            len(self._cache) > self.max_entries or self._current_bytes > self.max_bytes
+        ):
+            key = next(iter(self._cache))
+            self._remove(key)
+            self._evictions += 1
+
+    def get(self, key: str) -> Optional[CacheEntry]:
+        with self._lock:
+            entry = self._cache.get(key)
+
+            if entry is None:
+                return None
+
+            if entry.is_expired():
+                self._remove(key)
+                self._expirations += 1
+                return None
+
+            self._cache.move_to_end(key)
+            return entry
+
+    def set(self, key: str, entry: CacheEntry) -> None:
+        entry.size = estimate_size(entry.value)
+
+        with self._lock:
+            self._remove(key)
+
+            # 単体で上限を超える値はキャッシュしない
+            if entry.size > self.max_bytes:
+                return
+
+            entry.version = next(self._version)
+            self._cache[key] = entry
+            self._current_bytes += entry.size
+            heapq.heappush(self._expiry_heap, (entry.expires_at, entry.version, key))
+
+            self._purge_expired(time.time())
+            self._evict_if_needed()
+
+    def delete(self, key: str) -> None:
+        with self._lock:
+            self._remove(key)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._cache.clear()
+            self._expiry_heap.clear()
+            self._current_bytes = 0
+
+    def clear_pattern(self, pattern: str) -> None:
+        with self._lock:
+            keys_to_delete = [
+                key for key in self._cache.keys() if pattern in key
+            ]
+            for key in keys_to_delete:
+                self._remove(key)
+
+    def cleanup_expired(self) -> None:
+        with self._lock:
+            self._purge_expired(time.time())
+
+    def contains(self, key: str) -> bool:
+        with self._lock:
+            entry = self._cache.get(key)
+            return entry is not None and not entry.is_expired()
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            self._purge_expired(time.time())
+
+            return {
+                "backend": self.name,
+                "total_entries": len(self._cache),
+                "current_bytes": self._current_bytes,
+                "max_entries": self.max_entries,
+                "max_bytes": self.max_bytes,
+                "evictions": self._evictions,
+                "expirations": self._expirations
+            }
+
+
+class SQLiteCacheBackend(CacheBackend):
+    """
+    SQLiteファイル（同一ホストの全ワーカーで共有）
+
+    - 値はpickleで保存し、WALモードで複数プロセスからの同時読み書きに対応
+    - エントリ数の上限を超えると最終参照時刻の古い順に追い出す
+    - 読み込みを書き込みにしないよう、最終参照時刻の更新はプロセス内にためてまとめて反映する
+    - 期限切れの削除と上限の確認は書き込みごとではなく SQLITE_MAINTENANCE_WRITES 回
+      または SQLITE_MAINTENANCE_INTERVAL 秒ごとに行う（その間は上限を一時的に超えうる）
+    - SQLiteのエラー（ロック待ちのタイムアウト・I/Oエラーなど）はログに残してキャッシュなしとして扱う
+    """
+
+    name = "sqlite"
+
+    def __init__(
+        self,
+        path: str,
+        max_entries: int,
+        touch_batch_size: int = SQLITE_TOUCH_BATCH_SIZE,
+        touch_interval: float = SQLITE_TOUCH_INTERVAL,
+        maintenance_writes: int = SQLITE_MAINTENANCE_WRITES,
+        maintenance_interval: float = SQLITE_MAINTENANCE_INTERVAL
+    ):
+        """
+        Args:
+            path: SQLiteファイルのパス
+            max_entries: 最大エントリ数
+            touch_batch_size: 最終参照時刻をまとめて反映する件数
+            touch_interval: 最終参照時刻を反映する間隔（秒）
+            maintenance_writes: 期限切れ削除・追い出しを行う書き込み回数
+            maintenance_interval: 期限切れ削除・追い出しを行う間隔（秒）
+        """
+        self.path = path
+        self.max_entries = max_entries
+        self.touch_batch_size = touch_batch_size
+        self.touch_interval = touch_interval
+        self.maintenance_writes = maintenance_writes
+        self.maintenance_interval = maintenance_interval
+        self._local = threading.local()
+
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+
+        conn = self._connection()
+        conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS cache_entries (
+                key TEXT PRIMARY KEY,
+                value BLOB NOT NULL,
+                stale_at REAL NOT NULL,
+                expires_at REAL NOT NULL,
+                accessed_at REAL NOT NULL
+            )
+            """
+        )
+        conn.execute("CREATE INDEX IF NOT EXISTS idx_cache_expires_at ON cache_entries (expires_at)")
+        conn.execute("CREATE INDEX IF NOT EXISTS idx_cache_accessed_at ON cache_entries (accessed_at)")
+
+        self._lock = threading.Lock()
+        self._touches: Dict[str, float] = {}
+        self._last_touch_flush = time.time()
+        self._writes = 0
+        self._last_maintenance = time.time()
+
+        self._evictions = 0
+        self._expirations = 0
+
+    def _connection(self) -> sqlite3.Connection:
+        """スレッドごとのコネクションを取得"""
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=5.0, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def _touch(self, key: str, now: float) -> None:
+        """最終参照時刻の更新をためる（件数か時間が閾値を超えたらまとめて反映）"""
+        with self._lock:
+            self._touches[key] = now
+            if len(self._touches) < self.touch_batch_size and now - self._last_touch_flush < self.touch_interval:
+                return
+            touches, self._touches = self._touches, {}
+            self._last_touch_flush = now
+
+        self._flush_touches(touches)
+
+    def _flush_touches(self, touches: Dict[str, float]) -> None:
+        """ためた最終参照時刻を1回のトランザクションで反映"""
+        if not touches:
+            return
+        conn = self._connection()
+        conn.execute("BEGIN")
+        try:
+            conn.executemany(
+                "UPDATE cache_entries SET accessed_at = MAX(accessed_at, ?) WHERE key = ?",
+                [(accessed_at, key) for key, accessed_at in touches.items()]
+            )
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+
+    def _maintain(self, now: float) -> None:
+        """期限切れの削除と上限を超えた分の追い出し"""
+        with self._lock:
+            touches, self._touches = self._touches, {}
+            self._last_touch_flush = now
+            self._writes = 0
+            self._last_maintenance = now
+
+        # 追い出しの順序に直近の参照を反映してから判定する
+        self._flush_touches(touches)
+
+        conn = self._connection()
+        self._expirations += conn.execute(
+            "DELETE FROM cache_entries WHERE expires_at <= ?", (now,)
+        ).rowcount
+
+        (count,) = conn.execute("SELECT COUNT(*) FROM cache_entries").fetchone()
+        if count > self.max_entries:
+            self._evictions += conn.execute(
+                "DELETE FROM cache_entries WHERE key IN ("
+                "SELECT key FROM cache_entries ORDER BY accessed_at LIMIT ?)",
+                (count - self.max_entries,)
+            ).rowcount
+
+    def get(self, key: str) -> Optional[CacheEntry]:
+        try:
+            conn = self._connection()
+            row = conn.execute(
+                "SELECT value, stale_at, expires_at FROM cache_entries WHERE key = ?",
+                (key,)
+            ).fetchone()
+
+            if row is None:
+                return None
+
+            value, stale_at, expires_at = row
+            now = time.time()
+
+            if now > expires_at:
+                conn.execute("DELETE FROM cache_entries WHERE key = ? AND expires_at = ?", (key, expires_at))
+                self._expirations += 1
+                return None
+
+            self._touch(key, now)
+        except Exception as e:
+            logger.warning(f"SQLite cache get error ({key}): {e}")
+            return None
+
+        try:
+            return CacheEntry(pickle.loads(value), stale_at, expires_at)
+        except Exception as e:
+            logger.warning(f"Failed to load cache entry {key}: {e}")
+            return None
+
+    def set(self, key: str, entry: CacheEntry) -> None:
+        try:
+            payload = pickle.dumps(entry.value, protocol=pickle.HIGHEST_PROTOCOL)
+        except Exception as e:
+            logger.warning(f"Value for {key} is not cacheable: {e}")
+            return
+
+        try:
+            now = time.time()
+            self._connection().execute(
+                "INSERT OR REPLACE INTO cache_entries (key, value, stale_at, expires_at, accessed_at) "
+                "VALUES (?, ?, ?, ?, ?)",
+                (key, sqlite3.Binary(payload), entry.stale_at, entry.expires_at, now)
+            )
+
+            with self._lock:
+                self._writes += 1
+                due = (
+                    self._writes >= self.maintenance_writes
+                    or now - self._last_maintenance >= self.maintenance_interval
+                )
+            if due:
+                self._maintain(now)
+        except Exception as e:
+            logger.warning(f"SQLite cache set error ({key}): {e}")
+
+    def delete(self, key: str) -> None:
+        try:
+            self._connection().execute("DELETE FROM cache_entries WHERE key = ?", (key,))
+        except Exception as e:
+            logger.warning(f"SQLite cache delete error ({key}): {e}")
+
+    def clear(self) -> None:
+        try:
+            self._connection().execute("DELETE FROM cache_entries")
+        except Exception as e:
+            logger.warning(f"SQLite cache clear error: {e}")
+
+    def clear_pattern(self, pattern: str) -> None:
+        try:
+            self._connection().execute(
+                "DELETE FROM cache_entries WHERE instr(key, ?) > 0", (pattern,)
+            )
+        except Exception as e:
+            logger.warning(f"SQLite cache delete error ({pattern}): {e}")
+
+    def cleanup_expired(self) -> None:
+        try:
+            self._maintain(time.time())
+        except Exception as e:
+            logger.warning(f"SQLite cache cleanup error: {e}")
+
+    def contains(self, key: str) -> bool:
+        try:
+            row = self._connection().execute(
+                "SELECT 1 FROM cache_entries WHERE key = ? AND expires_at > ?",
+                (key, time.time())
+            ).fetchone()
+        except Exception as e:
+            logger.warning(f"SQLite cache exists error ({key}): {e}")
+            return False
+        return row is not None
+
+    def get_stats(self) -> Dict[str, Any]:
+        self.cleanup_expired()
+        try:
+            (count, total_bytes) = self._connection().execute(
+                "SELECT COUNT(*), COALESCE(SUM(LENGTH(value)), 0) FROM cache_entries"
+            ).fetchone()
+        except Exception as e:
+            logger.warning(f"SQLite cache stats error: {e}")
+            return {"backend": self.name, "total_entries": None, "error": str(e)}
+
+        return {
+            "backend": self.name,
+            "path": self.path,
+            "total_entries": count,
+            "current_bytes": total_bytes,
+            "max_entries": self.max_entries,
+            "evictions": self._evictions,
+            "expirations": self._expirations
+        }
+
+
+class RedisCacheBackend(CacheBackend):
+    """
+    Redis（複数ホストのワーカーで共有）
+
+    - 値は (value, stale_at, expires_at) をpickleで保存し、失効はRedisのTTLに任せる
+    - 容量上限と追い出しはRedis側の maxmemory / maxmemory-policy で設定する
+    - Redisプロトコル互換のサーバー（ローカルの代替実装を含む）で動作する
+    """
+
+    name = "redis"
+
+    def __init__(self, url: str, prefix: str = "a1pro:cache:"):
+        """
+        Args:
+            url: 接続URL (例: redis://localhost:6379/0)
+            prefix: キーの接頭辞
+        """
+        import redis
+
+        self.url = url
+        self.prefix = prefix
+        self.client = redis.Redis.from_url(url, socket_timeout=2.0)
+
+    def _key(self, key: str) -> str:
+        return f"{self.prefix}{key}"
+
+    def get(self, key: str) -> Optional[CacheEntry]:
+        try:
+            payload = self.client.get(self._key(key))
+            if payload is None:
+                return None
+
+            value, stale_at, expires_at = pickle.loads(payload)
+            return CacheEntry(value, stale_at, expires_at)
+        except Exception as e:
+            logger.warning(f"Redis cache get error ({key}): {e}")
+            return None
+
+    def set(self, key: str, entry: CacheEntry) -> None:
+        ttl_ms = int((entry.expires_at - time.time()) * 1000)
+        if ttl_ms <= 0:
+            return
+
+        try:
+            payload = pickle.dumps(
+                (entry.value, entry.stale_at, entry.expires_at),
+                protocol=pickle.HIGHEST_PROTOCOL
+            )
+            self.client.set(self._key(key), payload, px=ttl_ms)
+        except Exception as e:
+            logger.warning(f"Redis cache set error ({key}): {e}")
+
+    def delete(self, key: str) -> None:
+        try:
+            self.client.delete(self._key(key))
+        except Exception as e:
+            logger.warning(f"Redis cache delete error ({key}): {e}")
+
+    def _delete_matching(self, match: str) -> None:
+        try:
+            keys = list(self.client.scan_iter(match=match, count=500))
+            for i in range(0, len(keys), 500):
+                self.client.delete(*keys[i:i + 500])
+        except Exception as e:
+            logger.warning(f"Redis cache delete error ({match}): {e}")
+
+    def clear(self) -> None:
+        self._delete_matching(f"{self.prefix}*")
+
+    def clear_pattern(self, pattern: str) -> None:
+        self._delete_matching(f"{self.prefix}*{pattern}*")
+
+    def cleanup_expired(self) -> None:
+        # 失効はRedisが行う
+        return None
+
+    def contains(self, key: str) -> bool:
+        try:
+            return bool(self.client.exists(self._key(key)))
+        except Exception as e:
+            logger.warning(f"Redis cache exists error ({key}): {e}")
+            return False
+
+    def get_stats(self) -> Dict[str, Any]:
+        try:
+            total_entries = sum(1 for _ in self.client.scan_iter(match=f"{self.prefix}*", count=500))
+            info = self.client.info("memory")
+        except Exception as e:
+            logger.warning(f"Redis cache stats error: {e}")
+            return {"backend": self.name, "total_entries": None, "error": str(e)}
+
+        return {
+            "backend": self.name,
+            "total_entries": total_entries,
+            "current_bytes": info.get("used_memory"),
+            "max_bytes": info.get("maxmemory"),
+            "eviction_policy": info.get("maxmemory_policy")
+        }
+
+
+def create_cache_backend() -> CacheBackend:
+    """
+    環境変数 CACHE_BACKEND に応じた保存先を作成
+
+    - memory: プロセス内メモリ（デフォルト）
+    - sqlite: CACHE_SQLITE_PATH のファイルを同一ホストの全ワーカーで共有
+    - redis: REDIS_URL のRedisを共有
+
+    Returns:
+        キャッシュ保存先
+    """
+    backend = os.getenv("CACHE_BACKEND", "memory").lower()
+    max_entries = int(os.getenv("CACHE_MAX_ENTRIES", "2048"))
+    max_bytes = int(os.getenv("CACHE_MAX_BYTES", str(256 * 1024 * 1024)))
+
+    try:
+        if backend == "sqlite":
+            return SQLiteCacheBackend(
+                os.getenv("CACHE_SQLITE_PATH", "./data/cache.sqlite3"),
+                max_entries
+            )
+        if backend == "redis":
+            return RedisCacheBackend(
+                os.getenv("REDIS_URL", "redis://localhost:6379/0"),
+                os.getenv("CACHE_REDIS_PREFIX", "a1pro:cache:")
+            )
+    except Exception as e:
+        logger.error(f"Failed to initialize {backend} cache backend, falling back to memory: {e}")
+
+    return MemoryCacheBackend(max_entries, max_bytes)
@@ -1,32 +1,87 @@
 """
 Cache Service
-In-memoryキャッシュサービス
+キャッシュサービス（LRU + TTL、サイズ上限付き、保存先切り替え可能）
 """
 
-from typing import Any, Optional, Dict
-from datetime import datetime, timedelta
+from typing import Any, Awaitable, Callable, Optional, Dict, Tuple, Union
+import asyncio
+import inspect
+import logging
+import os
 import threading
+import time
 
+from app.services.cache_backends import (
+    CacheBackend,
+    CacheEntry,
+    MemoryCacheBackend,
+    create_cache_backend
+)
 
-class CacheEntry:
-    """キャッシュエントリ"""
+logger = logging.getLogger(__name__)
 
-    def __init__(self, value: Any, ttl_seconds: int):
-        self.value = value
-        self.expires_at = datetime.now() + timedelta(seconds=ttl_seconds)
 
-    def is_expired(self) -> bool:
-        """有効期限切れかチェック"""
-        return datetime.now() > self.expires_at
+class CacheService:
+    """
+    キャッシュサービス
 
+    - 保存先は CacheBackend で差し替え可能（メモリ / SQLite共有ファイル / Redis）
+    - get_or_compute で同一キーの上流取得を1本にまとめる（single-flight）
+    - 鮮度切れ後も失効までは古い値を返し、裏で再取得する（stale-while-revalidate）
+    - よく読まれるキーは refresh_hot_keys で鮮度切れ前に先回りして再取得する
+    """
 
-class CacheService:
-    """In-memoryキャッシュサービス"""
+    def __init__(
+        self,
+        max_entries: Optional[int] = None,
+        max_bytes: Optional[int] = None,
+        backend: Optional[CacheBackend] = None
+    ):
+        """
+        Args:
+            max_entries: 最大エントリ数（指定時はメモリ保存先を使用）
+            max_bytes: 最大推定メモリ量（指定時はメモリ保存先を使用）
+            backend: 保存先（デフォルト: 環境変数 CACHE_BACKEND で選択）
+        """
+        if backend is None:
+            if max_entries or max_bytes:
+                backend = MemoryCacheBackend(
+                    max_entries or int(os.getenv("CACHE_MAX_ENTRIES", "2048")),
+                    max_bytes or int(os.getenv("CACHE_MAX_BYTES", str(256 * 1024 * 1024)))
+                )
+            else:
+                backend = create_cache_backend()
 
-    def __init__(self):
-        self._cache: Dict[str, CacheEntry] = {}
+        self.backend = backend
         self._lock = threading.Lock()
 
+        # 実行中のローダー（キー -> Task）
+        self._inflight: Dict[str, "asyncio.Task"] = {}
+        # 先回り更新用のローダー（キー -> (loader, ttl, stale_ttl)）と期間内の参照回数
+        self._refreshers: Dict[str, Tuple[Callable, int, int]] = {}
+        self._access_counts: Dict[str, int] = {}
+
+        # 統計カウンタ
+        self._hits = 0
+        self._misses = 0
+        self._coalesced = 0
+        self._stale_hits = 0
+        self._refreshes = 0
+
+    def _lookup(self, key: str) -> Optional[CacheEntry]:
+        """有効なエントリを取得し、統計とLRU順を更新"""
+        entry = self.backend.get(key)
+
+        with self._lock:
+            if entry is None:
+                self._misses += 1
+                return None
+
+            self._hits += 1
+            if key in self._refreshers:
+                self._access_counts[key] = self._access_counts.get(key, 0) + 1
+            return entry
+
     def get(self, key: str) -> Optional[Any]:
         """
         キャッシュから値を取得
@@ -35,21 +90,32 @@ class CacheService:
             key: キャッシュキー
 
         Returns:
-            キャッシュされた値、存在しないまたは期限切れの場合はNone
+            キャッシュされた値（鮮度切れの猶予期間中の値を含む）、
+            存在しないまたは期限切れの場合はNone
         """
-        with self._lock:
-            if key not in self._cache:
-                return None
+        entry = self._lookup(key)
+        return entry.value if entry is not None else None
 
-            entry = self._cache[key]
+    def ttl_remaining(self, key: str) -> Optional[float]:
+        """
+        鮮度切れまでの残り秒数
 
-            if entry.is_expired():
-                del self._cache[key]
-                return None
+        Args:
+            key: キャッシュキー
 
-            return entry.value
+        Returns:
+            残り秒数（鮮度切れの場合は0以下）、存在しない場合はNone
+        """
+        entry = self.backend.get(key)
+        return entry.stale_at - time.time() if entry is not None else None
 
-    def set(self, key: str, value: Any, ttl_seconds: int = 900):
+    def set(
+        self,
+        key: str,
+        value: Any,
+        ttl_seconds: int = 900,
+        stale_ttl_seconds: int = 0
+    ):
         """
         キャッシュに値を設定
 
@@ -57,9 +123,9 @@ class CacheService:
             key: キャッシュキー
             value: キャッシュする値
             ttl_seconds: 有効期限（秒）、デフォルト15分
+            stale_ttl_seconds: 有効期限後も古い値を返してよい猶予（秒）
         """
-        with self._lock:
-            self._cache[key] = CacheEntry(value, ttl_seconds)
+        self.backend.set(key, CacheEntry.create(value, ttl_seconds, stale_ttl_seconds))
 
     def delete(self, key: str):
         """
@@ -68,14 +134,14 @@ class CacheService:
         Args:
             key: キャッシュキー
         """
-        with self._lock:
-            if key in self._cache:
-                del self._cache[key]
+        self.backend.delete(key)
 
     def clear(self):
         """全キャッシュをクリア"""
+        self.backend.clear()
         with self._lock:
-            self._cache.clear()
+            self._refreshers.clear()
+            self._access_counts.clear()
 
     def clear_pattern(self, pattern: str):
         """
@@ -84,41 +150,176 @@ class CacheService:
         Args:
             pattern: パターン文字列（部分一致）
         """
-        with self._lock:
-            keys_to_delete = [
-                key for key in self._cache.keys() if pattern in key
-            ]
-            for key in keys_to_delete:
-                del self._cache[key]
+        self.backend.clear_pattern(pattern)
 
-    def get_stats(self) -> Dict[str, int]:
+    def get_stats(self) -> Dict[str, Any]:
         """
         キャッシュ統計情報を取得
 
         Returns:
             統計情報
         """
+        stats = self.backend.get_stats()
+
         with self._lock:
-            total_entries = len(self._cache)
-            expired_entries = sum(
-                1 for entry in self._cache.values() if entry.is_expired()
-            )
-            active_entries = total_entries - expired_entries
+            lookups = self._hits + self._misses
 
             return {
-                "total_entries": total_entries,
-                "active_entries": active_entries,
-                "expired_entries": expired_entries
+                **stats,
+                "active_entries": stats.get("total_entries"),
+                "expired_entries": 0,
+                "hits": self._hits,
+                "misses": self._misses,
+                "hit_rate": self._hits / lookups if lookups else 0.0,
+                "coalesced": self._coalesced,
+                "stale_hits": self._stale_hits,
+                "refreshes": self._refreshes,
+                "refreshable_keys": len(self._refreshers),
+                "inflight": len(self._inflight)
             }
 
+    async def get_or_compute(
+        self,
+        key: str,
+        loader: Callable[[], Union[Any, Awaitable[Any]]],
+        ttl_seconds: int = 900,
+        stale_ttl_seconds: int = 0
+    ) -> Any:
+        """
+        キャッシュから値を取得し、なければローダーで計算して保存
+
+        同一キーに対して同時に呼ばれた場合、ローダーは1回だけ実行され、
+        他の呼び出しはその結果（または例外）を共有する。
+        stale_ttl_seconds を指定すると、鮮度切れ後の猶予期間中は古い値を即座に返し、
+        裏で再取得する。ローダーは refresh_hot_keys による先回り更新にも使われる。
+
+        Args:
+            key: キャッシュキー
+            loader: 値を計算する関数（同期関数はスレッドプールで実行）
+            ttl_seconds: 有効期限（秒）
+            stale_ttl_seconds: 有効期限後も古い値を返してよい猶予（秒）
+
+        Returns:
+            キャッシュされた値、またはローダーの戻り値
+        """
+        if stale_ttl_seconds > 0:
+            self._refreshers[key] = (loader, ttl_seconds, stale_ttl_seconds)
+
+        entry = self._lookup(key)
+        if entry is not None:
+            if stale_ttl_seconds > 0 and entry.is_stale():
+                self._stale_hits += 1
+                self._start_refresh(key, loader, ttl_seconds, stale_ttl_seconds)
+            return entry.value
+
+        task = self._inflight.get(key)
+        if task is None:
+            task = self._start_load(key, loader, ttl_seconds, stale_ttl_seconds)
+        else:
+            self._coalesced += 1
+
+        # 呼び出し元がキャンセルされても共有中のローダーは止めない
+        return await asyncio.shield(task)
+
+    def _start_load(
+        self,
+        key: str,
+        loader: Callable[[], Union[Any, Awaitable[Any]]],
+        ttl_seconds: int,
+        stale_ttl_seconds: int
+    ) -> "asyncio.Task":
+        """ローダーをタスクとして起動し、実行中として登録"""
+        task = asyncio.ensure_future(self._load(key, loader, ttl_seconds, stale_ttl_seconds))
+        self._inflight[key] = task
+        return task
+
+    def _start_refresh(
+        self,
+        key: str,
+        loader: Callable[[], Union[Any, Awaitable[Any]]],
+        ttl_seconds: int,
+        stale_ttl_seconds: int
+    ) -> None:
+        """バックグラウンド再取得を起動（実行中なら何もしない）"""
+        if key in self._inflight:
+            return
+
+        self._refreshes += 1
+        task = self._start_load(key, loader, ttl_seconds, stale_ttl_seconds)
+        task.add_done_callback(self._log_refresh_error)
+
+    @staticmethod
+    def _log_refresh_error(task: "asyncio.Task") -> None:
+        """バックグラウンド再取得の失敗をログに残す（古い値はそのまま残る）"""
+        if not task.cancelled() and task.exception() is not None:
+            logger.warning(f"Cache refresh failed: {task.exception()}")
+
+    async def _load(
+        self,
+        key: str,
+        loader: Callable[[], Union[Any, Awaitable[Any]]],
+        ttl_seconds: int,
+        stale_ttl_seconds: int = 0
+    ) -> Any:
+        """ローダーを実行して結果をキャッシュ"""
+        try:
+            if inspect.iscoroutinefunction(loader):
+                value = await loader()
+            else:
+                value = await asyncio.to_thread(loader)
+
+            if value is not None:
+                self.set(key, value, ttl_seconds, stale_ttl_seconds)
+
+            return value
+        finally:
+            self._inflight.pop(key, None)
+
+    async def refresh_hot_keys(self, min_hits: int = 3, ahead_seconds: int = 120) -> int:
+        """
+        よく読まれているキーを鮮度切れ前に再取得
+
+        直近の期間で min_hits 回以上読まれ、ahead_seconds 以内に鮮度切れになるキーを
+        バックグラウンドで再取得する。呼び出しごとに参照回数はリセットされる。
+
+        Args:
+            min_hits: 対象とする最小参照回数
+            ahead_seconds: 鮮度切れまでの残り時間の閾値（秒）
+
+        Returns:
+            再取得を開始したキー数
+        """
+        deadline = time.time() + ahead_seconds
+
+        with self._lock:
+            access_counts = self._access_counts
+            self._access_counts = {}
+            refresh_keys = list(self._refreshers)
+
+        # 追い出し・失効済みのキーのローダーは破棄
+        for key in refresh_keys:
+            if not self.backend.contains(key):
+                self._refreshers.pop(key, None)
+
+        started = 0
+        for key, count in access_counts.items():
+            refresher = self._refreshers.get(key)
+            if count < min_hits or refresher is None or key in self._inflight:
+                continue
+
+            entry = self.backend.get(key)
+            if entry is None or entry.stale_at > deadline:
+                continue
+
+            loader, ttl_seconds, stale_ttl_seconds = refresher
+            self._start_refresh(key, loader, ttl_seconds, stale_ttl_seconds)
+            started += 1
+
+        return started
+
     def cleanup_expired(self):
         """期限切れキャッシュを削除"""
-        with self._lock:
-            expired_keys = [
-                key for key, entry in self._cache.items() if entry.is_expired()
-            ]
-            for key in expired_keys:
-                del self._cache[key]
+        self.backend.cleanup_expired()
 
 
 # Singleton instance
@@ -131,3 +332,7 @@ CACHE_TTL_FINANCIAL = 86400  # 1日 (決算データ)
 CACHE_TTL_COMPANY_INFO = 3600  # 1時間 (企業情報)
 CACHE_TTL_EXCHANGE_RATE = 1800  # 30分 (為替)
 CACHE_TTL_CRYPTO = 300  # 5分 (暗号資産)
+
+# 鮮度切れ後に古い値を返してよい猶予（裏で再取得）
+CACHE_STALE_TTL_STOCK_PRICE = 2700  # 45分
+CACHE_STALE_TTL_FINANCIAL = 86400  # 1日
@@ -3,10 +3,26 @@ Crypto Client
 暗号資産データ取得クライアント
 """
 
-import requests
 from typing import Dict, Optional, List
-from datetime import datetime, timedelta
-import time
+from datetime import datetime
+import asyncio
+
+from app.services.cache_service import cache_service, CACHE_TTL_CRYPTO
+from app.services.http_client import http_client_pool
+from app.services.rate_limiter import coingecko_limiter, yahoo_limiter
+
+
+# /simple/price の1リクエストでまとめて問い合わせるIDの最大数（URL長の上限を考慮）
+COINGECKO_PRICE_BATCH_SIZE = 250
+
+# ティッカーシンボル -> CoinGecko ID
+SYMBOL_TO_ID = {
+    "BTC": "bitcoin",
+    "ETH": "ethereum",
+    "XRP": "ripple",
+    "ADA": "cardano",
+    "SOL": "solana"
+}
 
 
 class CryptoClient:
@@ -14,20 +30,27 @@ class CryptoClient:
 
     def __init__(self):
         self.base_url = "https://api.coingecko.com/api/v3"
-        self.last_request_time = 0
-        self.rate_limit_delay = 1.2  # 50 requests/minute = 1.2 seconds between requests
+        # 50 requests/minute（全ワーカーで共有するトークンバケット）
+        self.rate_limiter = coingecko_limiter
 
-    def _rate_limit(self):
-        """レート制限対応"""
-        current_time = time.time()
-        time_since_last_request = current_time - self.last_request_time
+    async def _rate_limit(self):
+        """レート制限対応（枠が空くまでイベントループを止めずに待機）"""
+        await self.rate_limiter.acquire()
 
-        if time_since_last_request < self.rate_limit_delay:
-            time.sleep(self.rate_limit_delay - time_since_last_request)
+    @staticmethod
+    def symbol_to_id(symbol: str) -> str:
+        """
+        ティッカーシンボルをCoinGecko IDに変換（簡易マッピング）
 
-        self.last_request_time = time.time()
+        Args:
+            symbol: シンボル (例: BTC, ETH)
 
-    def get_crypto_price(
+        Returns:
+            CoinGecko ID (例: bitcoin)、マッピングにない場合は小文字のシンボル
+        """
+        return SYMBOL_TO_ID.get(symbol.upper(), symbol.lower())
+
+    async def get_crypto_price(
         self,
         crypto_id: str,
         vs_currency: str = "usd"
@@ -42,27 +65,94 @@ class CryptoClient:
         Returns:
             現在価格
         """
-        try:
-            self._rate_limit()
+        prices = await self.get_crypto_prices([crypto_id], [vs_currency])
+        # get_crypto_prices は通貨を小文字に揃えて返す
+        return prices.get(crypto_id, {}).get(vs_currency.lower())
 
-            url = f"{self.base_url}/simple/price"
-            params = {
-                "ids": crypto_id,
-                "vs_currencies": vs_currency
-            }
+    async def get_crypto_prices(
+        self,
+        crypto_ids: List[str],
+        vs_currencies: Optional[List[str]] = None
+    ) -> Dict[str, Dict[str, Optional[float]]]:
+        """
+        複数の暗号資産の現在価格を一括取得
 
-            response = requests.get(url, params=params, timeout=10)
-            response.raise_for_status()
+        キャッシュにない (ID, 通貨) の組だけを、COINGECKO_PRICE_BATCH_SIZE 件ずつ
+        1回の /simple/price リクエストにまとめて取得し、組ごとにキャッシュする。
 
-            data = response.json()
-            if crypto_id in data and vs_currency in data[crypto_id]:
-                return float(data[crypto_id][vs_currency])
+        Args:
+            crypto_ids: 暗号資産IDのリスト
+            vs_currencies: 基準通貨のリスト（デフォルト: ["usd"]）
 
-            return None
-        except Exception as e:
-            print(f"CoinGecko price error: {e}")
-            # フォールバック: yfinanceを使用
-            return self._get_price_from_yfinance(crypto_id)
+        Returns:
+            ID -> {通貨 -> 現在価格（取得できない場合はNone）}
+        """
+        if vs_currencies is None:
+            vs_currencies = ["usd"]
+
+        ids = list(dict.fromkeys(crypto_ids))
+        currencies = list(dict.fromkeys(currency.lower() for currency in vs_currencies))
+
+        prices: Dict[str, Dict[str, Optional[float]]] = {crypto_id: {} for crypto_id in ids}
+        missing_ids = []
+        for crypto_id in ids:
+            for currency in currencies:
+                cached = cache_service.get(self._price_cache_key(crypto_id, currency))
+                prices[crypto_id][currency] = cached
+                if cached is None and crypto_id not in missing_ids:
+                    missing_ids.append(crypto_id)
+
+        for i in range(0, len(missing_ids), COINGECKO_PRICE_BATCH_SIZE):
+            chunk = missing_ids[i:i + COINGECKO_PRICE_BATCH_SIZE]
+
+            try:
+                await self._rate_limit()
+
+                url = f"{self.base_url}/simple/price"
+                params = {
+                    "ids": ",".join(chunk),
+                    "vs_currencies": ",".join(currencies)
+                }
+
+                response = await http_client_pool.get(url, params=params)
+                response.raise_for_status()
+
+                data = response.json()
+            except Exception as e:
+                print(f"CoinGecko price error: {e}")
+                data = {}
+
+            for crypto_id in chunk:
+                quotes = data.get(crypto_id, {})
+                for currency in currencies:
+                    # 未取得の銘柄・通貨と同じく、値がnullの相場も飛ばす
+                    if prices[crypto_id][currency] is not None or quotes.get(currency) is None:
+                        continue
+                    price = float(quotes[currency])
+                    prices[crypto_id][currency] = price
+                    cache_service.set(self._price_cache_key(crypto_id, currency), price, CACHE_TTL_CRYPTO)
+
+        # フォールバック: 取得できなかったUSD価格はyfinanceを使用
+        fallback_ids = [
+            crypto_id for crypto_id in missing_ids
+            if "usd" in currencies and prices[crypto_id]["usd"] is None
+        ]
+        if fallback_ids:
+            fallback_prices = await asyncio.gather(*[
+                asyncio.to_thread(self._get_price_from_yfinance, crypto_id)
+                for crypto_id in fallback_ids
+            ])
+            for crypto_id, price in zip(fallback_ids, fallback_prices):
+                prices[crypto_id]["usd"] = price
+                if price is not None:
+                    cache_service.set(self._price_cache_key(crypto_id, "usd"), price, CACHE_TTL_CRYPTO)
+
+        return prices
+
+    @staticmethod
+    def _price_cache_key(crypto_id: str, vs_currency: str) -> str:
+        """(ID, 通貨) 単位の現在価格キャッシュキー"""
+        return f"crypto_price:{crypto_id}:{vs_currency}"
 
     def _get_price_from_yfinance(self, crypto_id: str) -> Optional[float]:
         """
@@ -90,6 +180,7 @@ class CryptoClient:
             if not symbol:
                 return None
 
+            yahoo_limiter.acquire_sync()
             ticker = yf.Ticker(symbol)
             hist = ticker.history(period="1d")
 
@@ -101,7 +192,7 @@ class CryptoClient:
             print(f"yfinance crypto error: {e}")
             return None
 
-    def get_crypto_market_data(
+    async def get_crypto_market_data(
         self,
         crypto_id: str,
         vs_currency: str = "usd"
@@ -117,7 +208,7 @@ class CryptoClient:
             市場データ
         """
         try:
-            self._rate_limit()
+            await self._rate_limit()
 
             url = f"{self.base_url}/coins/{crypto_id}"
             params = {
@@ -127,7 +218,7 @@ class CryptoClient:
                 "developer_data": "false"
             }
 
-            response = requests.get(url, params=params, timeout=10)
+            response = await http_client_pool.get(url, params=params)
             response.raise_for_status()
 
             data = response.json()
@@ -152,7 +243,7 @@ class CryptoClient:
             print(f"CoinGecko market data error: {e}")
             return None
 
-    def get_historical_data(
+    async def get_historical_data(
         self,
         crypto_id: str,
         vs_currency: str = "usd",
@@ -170,7 +261,7 @@ class CryptoClient:
             価格履歴
         """
         try:
-            self._rate_limit()
+            await self._rate_limit()
 
             url = f"{self.base_url}/coins/{crypto_id}/market_chart"
             params = {
@@ -179,7 +270,7 @@ class CryptoClient:
                 "interval": "daily"
             }
 
-            response = requests.get(url, params=params, timeout=10)
+            response = await http_client_pool.get(url, params=params)
             response.raise_for_status()
 
             data = response.json()
@@ -199,7 +290,7 @@ class CryptoClient:
             print(f"CoinGecko historical data error: {e}")
             return []
 
-    def search_crypto(self, query: str) -> List[Dict]:
+    async def search_crypto(self, query: str) -> List[Dict]:
         """
         暗号資産検索
 
@@ -210,12 +301,12 @@ class CryptoClient:
             検索結果
         """
         try:
-            self._rate_limit()
+            await self._rate_limit()
 
             url = f"{self.base_url}/search"
             params = {"query": query}
 
-            response = requests.get(url, params=params, timeout=10)
+            response = await http_client_pool.get(url, params=params)
             response.raise_for_status()
 
             data = response.json()
@@ -234,6 +325,30 @@ class CryptoClient:
             print(f"CoinGecko search error: {e}")
             return []
 
+    def get_crypto_price_sync(self, crypto_id: str, vs_currency: str = "usd") -> Optional[float]:
+        """get_crypto_price の同期版（スクリプト用）"""
+        return http_client_pool.run_sync(self.get_crypto_price, crypto_id, vs_currency)
+
+    def get_crypto_prices_sync(
+        self,
+        crypto_ids: List[str],
+        vs_currencies: Optional[List[str]] = None
+    ) -> Dict[str, Dict[str, Optional[float]]]:
+        """get_crypto_prices の同期版（スクリプト用）"""
+        return http_client_pool.run_sync(self.get_crypto_prices, crypto_ids, vs_currencies)
+
+    def get_crypto_market_data_sync(self, crypto_id: str, vs_currency: str = "usd") -> Optional[Dict]:
+        """get_crypto_market_data の同期版（スクリプト用）"""
+        return http_client_pool.run_sync(self.get_crypto_market_data, crypto_id, vs_currency)
+
+    def get_historical_data_sync(self, crypto_id: str, vs_currency: str = "usd", days: int = 30) -> List[Dict]:
+        """get_historical_data の同期版（スクリプト用）"""
+        return http_client_pool.run_sync(self.get_historical_data, crypto_id, vs_currency, days)
+
+    def search_crypto_sync(self, query: str) -> List[Dict]:
+        """search_crypto の同期版（スクリプト用）"""
+        return http_client_pool.run_sync(self.search_crypto, query)
+
     @staticmethod
     def get_popular_cryptos() -> List[str]:
         """人気の暗号資産IDリスト"""
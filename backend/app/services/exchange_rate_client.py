@@ -3,11 +3,28 @@ Exchange Rate Client
 為替レート取得クライアント
 """
 
-import requests
 from typing import Dict, Optional, List
 from datetime import datetime, timedelta
+from functools import partial
+import asyncio
 import os
 
+from app.services.cache_service import cache_service, CACHE_TTL_EXCHANGE_RATE
+from app.services.http_client import http_client_pool
+from app.services.price_series import frame_to_points
+from app.services.rate_limiter import yahoo_limiter
+from app.services.rate_matrix import RateMatrix
+from app.services.yfinance_client import yfinance_client
+
+
+# レート行列の基準通貨と、yfinanceで取得する場合の対象通貨
+FX_MATRIX_PIVOT = "USD"
+FX_MATRIX_CURRENCIES = [
+    currency.strip().upper()
+    for currency in os.getenv("FX_MATRIX_CURRENCIES", "USD,JPY,EUR,GBP,CNY,AUD,CAD,CHF,HKD,KRW,SGD").split(",")
+    if currency.strip()
+]
+
 
 class ExchangeRateClient:
     """為替レートAPIクライアント"""
@@ -16,7 +33,7 @@ class ExchangeRateClient:
         self.api_key = os.getenv("EXCHANGE_RATE_API_KEY", "")
         self.base_url = "https://v6.exchangerate-api.com/v6"
 
-    def get_exchange_rate(
+    async def get_exchange_rate(
         self,
         base_currency: str = "USD",
         target_currency: str = "JPY"
@@ -34,10 +51,10 @@ class ExchangeRateClient:
         try:
             if not self.api_key:
                 # APIキーがない場合はyfinanceを使用
-                return self._get_rate_from_yfinance(base_currency, target_currency)
+                return await asyncio.to_thread(self._get_rate_from_yfinance, base_currency, target_currency)
 
             url = f"{self.base_url}/{self.api_key}/pair/{base_currency}/{target_currency}"
-            response = requests.get(url, timeout=10)
+            response = await http_client_pool.get(url)
             response.raise_for_status()
 
             data = response.json()
@@ -48,7 +65,110 @@ class ExchangeRateClient:
         except Exception as e:
             print(f"Exchange rate API error: {e}")
             # フォールバック: yfinanceを使用
-            return self._get_rate_from_yfinance(base_currency, target_currency)
+            return await asyncio.to_thread(self._get_rate_from_yfinance, base_currency, target_currency)
+
+    async def get_exchange_rate_cached(
+        self,
+        base_currency: str,
+        target_currency: str
+    ) -> Optional[float]:
+        """
+        為替レート取得（キャッシュ対応）
+
+        キャッシュ済みのレート行列からクロスレートを求める。行列にない通貨ペアのみ個別に取得する。
+
+        Args:
+            base_currency: 基準通貨
+            target_currency: 対象通貨
+
+        Returns:
+            為替レート（1 base = rate target）
+        """
+        base_currency = base_currency.upper()
+        target_currency = target_currency.upper()
+
+        if base_currency == target_currency:
+            return 1.0
+
+        matrix = await self.get_rate_matrix([base_currency, target_currency])
+        rate = matrix.rate(base_currency, target_currency) if matrix is not None else None
+        if rate is not None:
+            return rate
+
+        return await cache_service.get_or_compute(
+            f"fx_rate:{base_currency}:{target_currency}",
+            partial(self.get_exchange_rate, base_currency, target_currency),
+            CACHE_TTL_EXCHANGE_RATE
+        )
+
+    async def get_rate_matrix(self, currencies: Optional[List[str]] = None) -> Optional[RateMatrix]:
+        """
+        為替レート行列を取得（キャッシュ対応）
+
+        FX_MATRIX_PIVOT 建てのレート表を1回の取得でまとめて取り、行列全体を
+        CACHE_TTL_EXCHANGE_RATE の間キャッシュする。任意の通貨ペアは行列から導出する。
+
+        Args:
+            currencies: 必要な通貨（キャッシュ済みの行列にない場合は追加して取り直す）
+
+        Returns:
+            RateMatrix、取得できない場合はNone
+        """
+        wanted = sorted({currency.upper() for currency in currencies or []})
+        cache_key = f"fx_matrix:{FX_MATRIX_PIVOT}"
+
+        matrix = await cache_service.get_or_compute(
+            cache_key,
+            partial(self._load_rate_matrix, wanted),
+            CACHE_TTL_EXCHANGE_RATE
+        )
+
+        if matrix is None or all(currency in matrix for currency in wanted) or self.api_key:
+            # APIの全通貨表にない通貨は取り直しても得られない
+            return matrix
+
+        # yfinance経由の行列に足りない通貨を加えて取り直す
+        extended = await self._load_rate_matrix(sorted(set(wanted) | set(matrix.currencies)))
+        if extended is None:
+            return matrix
+
+        cache_service.set(cache_key, extended, CACHE_TTL_EXCHANGE_RATE)
+        return extended
+
+    async def _load_rate_matrix(self, currencies: List[str]) -> Optional[RateMatrix]:
+        """
+        レート行列を上流から取得
+
+        APIキーがある場合は /latest/{pivot} の1リクエストで全通貨を取得し、
+        ない場合（または失敗時）は yfinance の一括ダウンロードで取得する。
+        """
+        if self.api_key:
+            try:
+                url = f"{self.base_url}/{self.api_key}/latest/{FX_MATRIX_PIVOT}"
+                response = await http_client_pool.get(url)
+                response.raise_for_status()
+
+                data = response.json()
+                if data.get("result") == "success":
+                    return RateMatrix(FX_MATRIX_PIVOT, data.get("conversion_rates", {}))
+            except Exception as e:
+                print(f"Exchange rate API error: {e}")
+
+        targets = [
+            currency for currency in dict.fromkeys(FX_MATRIX_CURRENCIES + currencies)
+            if currency != FX_MATRIX_PIVOT
+        ]
+        quotes = await asyncio.to_thread(
+            yfinance_client.get_current_prices,
+            [f"{FX_MATRIX_PIVOT}{currency}" for currency in targets],
+            "fx"
+        )
+
+        rates = {currency: quotes.get(f"{FX_MATRIX_PIVOT}{currency}") for currency in targets}
+        if not any(rates.values()):
+            return None
+
+        return RateMatrix(FX_MATRIX_PIVOT, rates)
 
     def _get_rate_from_yfinance(
         self,
@@ -70,6 +190,7 @@ class ExchangeRateClient:
 
             # 通貨ペアのシンボル作成 (例: USDJPY=X)
             symbol = f"{base_currency}{target_currency}=X"
+            yahoo_limiter.acquire_sync()
             ticker = yf.Ticker(symbol)
 
             hist = ticker.history(period="1d")
@@ -81,7 +202,7 @@ class ExchangeRateClient:
             print(f"yfinance exchange rate error: {e}")
             return None
 
-    def get_multiple_rates(
+    async def get_multiple_rates(
         self,
         base_currency: str = "USD",
         target_currencies: List[str] = None
@@ -99,15 +220,32 @@ class ExchangeRateClient:
         if target_currencies is None:
             target_currencies = ["JPY", "EUR", "GBP", "CNY"]
 
+        # レート行列から全通貨ペアを導出（通貨ペアごとの取得なし）
+        matrix = await self.get_rate_matrix([base_currency] + target_currencies)
+        if matrix is not None and base_currency.upper() in matrix:
+            return {
+                f"{base_currency}/{currency}": rate
+                for currency, rate in zip(
+                    target_currencies,
+                    (matrix.rate(base_currency, currency) for currency in target_currencies)
+                )
+                if rate
+            }
+
+        # フォールバック: 各通貨ペアを同時に取得（接続はプールで共有）
+        results = await asyncio.gather(*[
+            self.get_exchange_rate(base_currency, currency)
+            for currency in target_currencies
+        ])
+
         rates = {}
-        for currency in target_currencies:
-            rate = self.get_exchange_rate(base_currency, currency)
+        for currency, rate in zip(target_currencies, results):
             if rate:
                 rates[f"{base_currency}/{currency}"] = rate
 
         return rates
 
-    def get_historical_rates(
+    async def get_historical_rates(
         self,
         base_currency: str,
         target_currency: str,
@@ -124,10 +262,20 @@ class ExchangeRateClient:
         Returns:
             為替レートの履歴
         """
+        return await asyncio.to_thread(self._get_historical_rates_from_yfinance, base_currency, target_currency, days)
+
+    def _get_historical_rates_from_yfinance(
+        self,
+        base_currency: str,
+        target_currency: str,
+        days: int
+    ) -> List[Dict]:
+        """yfinanceから為替レートの履歴を取得"""
         try:
             import yfinance as yf
 
             symbol = f"{base_currency}{target_currency}=X"
+            yahoo_limiter.acquire_sync()
             ticker = yf.Ticker(symbol)
 
             # 期間指定でデータ取得
@@ -136,21 +284,23 @@ class ExchangeRateClient:
 
             hist = ticker.history(start=start_date, end=end_date)
 
-            if hist.empty:
-                return []
-
-            result = []
-            for index, row in hist.iterrows():
-                result.append({
-                    "date": index.strftime("%Y-%m-%d"),
-                    "rate": float(row["Close"])
-                })
-
-            return result
+            return frame_to_points(hist, key="rate")
         except Exception as e:
             print(f"Historical rates error: {e}")
             return []
 
+    def get_exchange_rate_sync(self, base_currency: str = "USD", target_currency: str = "JPY") -> Optional[float]:
+        """get_exchange_rate の同期版（スクリプト用）"""
+        return http_client_pool.run_sync(self.get_exchange_rate, base_currency, target_currency)
+
+    def get_multiple_rates_sync(self, base_currency: str = "USD", target_currencies: List[str] = None) -> Dict[str, float]:
+        """get_multiple_rates の同期版（スクリプト用）"""
+        return http_client_pool.run_sync(self.get_multiple_rates, base_currency, target_currencies)
+
+    def get_historical_rates_sync(self, base_currency: str, target_currency: str, days: int = 30) -> List[Dict]:
+        """get_historical_rates の同期版（スクリプト用）"""
+        return http_client_pool.run_sync(self.get_historical_rates, base_currency, target_currency, days)
+
 
 # Singleton instance
 exchange_rate_client = ExchangeRateClient()
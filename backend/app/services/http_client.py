@@ -0,0 +1,140 @@
+"""
+HTTP Client Pool
+外部API呼び出し用の共有 httpx.AsyncClient（コネクションプール・keep-alive）
+"""
+
+from typing import Any, Awaitable, Callable, Dict, Optional
+import asyncio
+import importlib.util
+import os
+import threading
+
+import httpx
+
+
+def _http2_available() -> bool:
+    """HTTP/2 を使えるか（h2 パッケージが入っている場合のみ）"""
+    if os.getenv("HTTP_CLIENT_HTTP2", "true").lower() in ("0", "false", "no"):
+        return False
+    return importlib.util.find_spec("h2") is not None
+
+
+class HTTPClientPool:
+    """
+    httpx.AsyncClient のプール
+
+    AsyncClient はイベントループに紐づくため、ループごとに1つのクライアントを保持する。
+    同期コード（スクリプト）からは run_sync で専用のバックグラウンドループ上で実行し、
+    呼び出しをまたいで接続を再利用する。
+    """
+
+    def __init__(self):
+        self.limits = httpx.Limits(
+            max_connections=int(os.getenv("HTTP_CLIENT_MAX_CONNECTIONS", "20")),
+            max_keepalive_connections=int(os.getenv("HTTP_CLIENT_MAX_KEEPALIVE", "10")),
+            keepalive_expiry=float(os.getenv("HTTP_CLIENT_KEEPALIVE_EXPIRY", "30"))
+        )
+        self.timeout = httpx.Timeout(
+            float(os.getenv("HTTP_CLIENT_TIMEOUT", "10")),
+            connect=float(os.getenv("HTTP_CLIENT_CONNECT_TIMEOUT", "5"))
+        )
+        self.http2 = _http2_available()
+
+        self._clients: Dict[asyncio.AbstractEventLoop, httpx.AsyncClient] = {}
+        self._lock = threading.Lock()
+
+        # 同期呼び出し用のバックグラウンドループ
+        self._sync_loop: Optional[asyncio.AbstractEventLoop] = None
+        self._sync_thread: Optional[threading.Thread] = None
+
+    def get_client(self) -> httpx.AsyncClient:
+        """
+        実行中のイベントループ用のクライアントを取得（なければ作成）
+
+        Returns:
+            httpx.AsyncClient
+        """
+        loop = asyncio.get_running_loop()
+
+        with self._lock:
+            client = self._clients.get(loop)
+            if client is None or client.is_closed:
+                # 終了済みループのクライアントは使えないので破棄
+                for closed_loop in [other for other in self._clients if other.is_closed()]:
+                    del self._clients[closed_loop]
+
+                client = httpx.AsyncClient(
+                    limits=self.limits,
+                    timeout=self.timeout,
+                    http2=self.http2,
+                    follow_redirects=True
+                )
+                self._clients[loop] = client
+            return client
+
+    async def get(self, url: str, **kwargs: Any) -> httpx.Response:
+        """
+        プールされた接続でGETリクエスト
+
+        Args:
+            url: リクエストURL
+            kwargs: httpx.AsyncClient.get に渡す引数（params, headers, timeout など）
+
+        Returns:
+            レスポンス
+        """
+        return await self.get_client().get(url, **kwargs)
+
+    def run_sync(self, func: Callable[..., Awaitable[Any]], *args: Any, **kwargs: Any) -> Any:
+        """
+        非同期関数を同期的に実行（スクリプト用）
+
+        Args:
+            func: 非同期関数
+            args: 位置引数
+            kwargs: キーワード引数
+
+        Returns:
+            関数の戻り値
+        """
+        future = asyncio.run_coroutine_threadsafe(func(*args, **kwargs), self._get_sync_loop())
+        return future.result()
+
+    def _get_sync_loop(self) -> asyncio.AbstractEventLoop:
+        """バックグラウンドループを取得（初回のみ起動）"""
+        with self._lock:
+            if self._sync_loop is None:
+                loop = asyncio.new_event_loop()
+                thread = threading.Thread(target=loop.run_forever, name="http-client-pool", daemon=True)
+                thread.start()
+                self._sync_loop = loop
+                self._sync_thread = thread
+            return self._sync_loop
+
+    async def aclose(self):
+        """全クライアントを閉じる（アプリ終了時）"""
+        current_loop = asyncio.get_running_loop()
+
+        with self._lock:
+            clients = self._clients
+            self._clients = {}
+            sync_loop = self._sync_loop
+            sync_thread = self._sync_thread
+            self._sync_loop = None
+            self._sync_thread = None
+
+        for loop, client in clients.items():
+            if loop is current_loop:
+                await client.aclose()
+            elif loop.is_running():
+                # 他のループで作られたクライアントはそのループ上で閉じる
+                await asyncio.wrap_future(asyncio.run_coroutine_threadsafe(client.aclose(), loop))
+
+        if sync_loop is not None:
+            sync_loop.call_soon_threadsafe(sync_loop.stop)
+            sync_thread.join(timeout=5)
+            sync_loop.close()
+
+
+# Singleton instance
+http_client_pool = HTTPClientPool()
@@ -4,9 +4,21 @@ Performance Calculator
 """
 
 import numpy as np
-from typing import List, Dict, Optional
+from typing import List, Dict, Optional, Sequence, Union
 from datetime import datetime, timedelta
-import pandas as pd
+import warnings
+
+
+# 年率換算に使う年間営業日数
+TRADING_DAYS = 252
+
+# 暗号資産は毎日取引されるため暦日数で年率換算する
+CRYPTO_TRADING_DAYS = 365
+
+
+def periods_per_year(asset_type: str) -> int:
+    """資産クラスの年間の価格数（年率換算の係数）"""
+    return CRYPTO_TRADING_DAYS if asset_type == "crypto" else TRADING_DAYS
 
 
 class PerformanceCalculator:
@@ -31,7 +43,155 @@ class PerformanceCalculator:
         return [(price / base_price) * base_value for price in prices]
 
     @staticmethod
-    def calculate_total_return(prices: List[float]) -> float:
+    def calculate_metrics_matrix(
+        prices: np.ndarray,
+        risk_free_rate: float = 0.0,
+        periods: Union[int, Sequence[int], None] = None
+    ) -> Dict[str, np.ndarray]:
+        """
+        複数資産のメトリクスを一括計算（ベクトル化）
+
+        日次リターンは1回だけ計算し、全資産・全指標をNumPy演算で求める。
+        長さの異なる資産はNaNで埋めて渡す（NaNは欠損として扱う）。
+
+        Args:
+            prices: 価格行列（資産 × 日付）
+            risk_free_rate: リスクフリーレート（年率%）
+            periods: 年率換算に使う年間の価格数（資産ごとの配列も可、デフォルト: TRADING_DAYS）
+
+        Returns:
+            指標名 -> 資産ごとの値の配列（計算できない場合はNaN）
+            total_return, volatility, max_drawdown は%、
+            sharpe_ratio, sortino_ratio, calmar_ratio は倍率
+        """
+        prices = np.atleast_2d(np.asarray(prices, dtype=np.float64))
+        n_assets = prices.shape[0]
+        valid = ~np.isnan(prices)
+        n_valid = valid.sum(axis=1)
+        rows = np.arange(n_assets)
+        # 資産ごとの年間の価格数（ボラティリティ・シャープ・ソルティノ・CAGRで共通）
+        per_year = np.broadcast_to(
+            np.asarray(TRADING_DAYS if periods is None else periods, dtype=np.float64), (n_assets,)
+        )
+
+        with np.errstate(divide="ignore", invalid="ignore"), warnings.catch_warnings():
+            warnings.simplefilter("ignore", RuntimeWarning)
+
+            # 各資産の最初と最後の有効な価格
+            first_idx = valid.argmax(axis=1)
+            last_idx = prices.shape[1] - 1 - valid[:, ::-1].argmax(axis=1)
+            first = prices[rows, first_idx]
+            last = prices[rows, last_idx]
+
+            # 日次リターン（前日が0または欠損の場合は除外）
+            prev = prices[:, :-1]
+            returns = np.where(prev != 0, prices[:, 1:] / prev - 1, np.nan)
+            n_returns = (~np.isnan(returns)).sum(axis=1)
+
+            # 総リターン
+            total_return = np.where(
+                (n_valid >= 2) & (first != 0),
+                (last - first) / first * 100,
+                0.0
+            )
+
+            # 年率ボラティリティ・シャープレシオ
+            mean_return = np.nanmean(returns, axis=1)
+            std_return = np.nanstd(returns, axis=1)
+            volatility = std_return * np.sqrt(per_year) * 100
+
+            daily_rf = risk_free_rate / 100 / per_year
+            annual_excess = (mean_return - daily_rf) * per_year
+            sharpe = np.where(std_return > 0, annual_excess / (std_return * np.sqrt(per_year)), np.nan)
+
+            # ソルティノレシオ（下方偏差のみでリスクを評価）
+            downside = np.where(np.isnan(returns), np.nan, np.minimum(returns, 0.0))
+            downside_dev = np.sqrt(np.nanmean(downside ** 2, axis=1)) * np.sqrt(per_year)
+            sortino = np.where(downside_dev > 0, annual_excess / downside_dev, np.nan)
+
+            # 最大ドローダウン（累積最大値からの下落率の最小値）
+            running_max = np.fmax.accumulate(prices, axis=1)
+            max_drawdown = np.nanmin((prices - running_max) / running_max, axis=1) * 100
+
+            # カルマーレシオ（年率複利リターン / 最大ドローダウン）
+            # 期間は有効なリターン数ではなく最初と最後の価格の間隔（欠損で短く数えて年率が発散しないように）
+            span = last_idx - first_idx
+            cagr = np.where(
+                (span > 0) & (first > 0),
+                (last / first) ** (per_year / np.maximum(span, 1)) - 1,
+                np.nan
+            ) * 100
+            calmar = np.where(max_drawdown < 0, cagr / np.abs(max_drawdown), np.nan)
+
+        insufficient = n_valid < 2
+        no_returns = n_returns == 0
+        volatility[insufficient | no_returns] = np.nan
+        sharpe[insufficient | no_returns] = np.nan
+        sortino[insufficient | no_returns] = np.nan
+        max_drawdown[insufficient] = np.nan
+        calmar[insufficient] = np.nan
+
+        return {
+            "total_return": total_return,
+            "volatility": volatility,
+            "max_drawdown": max_drawdown,
+            "sharpe_ratio": sharpe,
+            "sortino_ratio": sortino,
+            "calmar_ratio": calmar
+        }
+
+    @classmethod
+    def calculate_metrics_batch(
+        cls,
+        price_lists: List[List[float]],
+        risk_free_rate: float = 0.0,
+        periods: Union[int, Sequence[int], None] = None
+    ) -> List[Dict]:
+        """
+        複数資産のメトリクスを一括計算
+
+        Args:
+            price_lists: 資産ごとの価格リスト（長さは異なってよい）
+            risk_free_rate: リスクフリーレート（年率%）
+            periods: 年率換算に使う年間の価格数（資産ごとの配列も可、デフォルト: TRADING_DAYS）
+
+        Returns:
+            資産ごとのメトリクス辞書（計算できない指標はNone）
+        """
+        if not price_lists:
+            return []
+
+        length = max(len(prices) for prices in price_lists)
+        matrix = np.full((len(price_lists), max(length, 1)), np.nan)
+        for i, prices in enumerate(price_lists):
+            matrix[i, :len(prices)] = prices
+
+        return cls.metrics_to_dicts(cls.calculate_metrics_matrix(matrix, risk_free_rate, periods))
+
+    @staticmethod
+    def metrics_to_dicts(metrics: Dict[str, np.ndarray]) -> List[Dict]:
+        """
+        指標配列を資産ごとの辞書に変換（NaNはNone）
+
+        Args:
+            metrics: calculate_metrics_matrix の結果
+
+        Returns:
+            資産ごとのメトリクス辞書
+        """
+        names = list(metrics)
+        columns = [metrics[name].tolist() for name in names]
+
+        return [
+            {
+                name: (None if value != value else float(value))
+                for name, value in zip(names, values)
+            }
+            for values in zip(*columns)
+        ]
+
+    @classmethod
+    def calculate_total_return(cls, prices: List[float]) -> float:
         """
         総リターン計算
 
@@ -46,8 +206,8 @@ class PerformanceCalculator:
 
         return ((prices[-1] - prices[0]) / prices[0]) * 100
 
-    @staticmethod
-    def calculate_volatility(prices: List[float]) -> Optional[float]:
+    @classmethod
+    def calculate_volatility(cls, prices: List[float]) -> Optional[float]:
         """
         ボラティリティ計算（年率換算）
 
@@ -60,24 +220,10 @@ class PerformanceCalculator:
         if not prices or len(prices) < 2:
             return None
 
-        # 日次リターン計算
-        returns = []
-        for i in range(1, len(prices)):
-            if prices[i-1] != 0:
-                daily_return = (prices[i] - prices[i-1]) / prices[i-1]
-                returns.append(daily_return)
-
-        if not returns:
-            return None
-
-        # 標準偏差を計算し、年率換算（√252）
-        std_dev = np.std(returns)
-        annual_volatility = std_dev * np.sqrt(252) * 100
-
-        return float(annual_volatility)
+        return cls.calculate_metrics_batch([prices])[0]["volatility"]
 
-    @staticmethod
-    def calculate_max_drawdown(prices: List[float]) -> Optional[float]:
+    @classmethod
+    def calculate_max_drawdown(cls, prices: List[float]) -> Optional[float]:
         """
         最大ドローダウン計算
 
@@ -90,21 +236,11 @@ class PerformanceCalculator:
         if not prices or len(prices) < 2:
             return None
 
-        max_price = prices[0]
-        max_dd = 0.0
+        return cls.calculate_metrics_batch([prices])[0]["max_drawdown"]
 
-        for price in prices:
-            if price > max_price:
-                max_price = price
-
-            drawdown = ((price - max_price) / max_price) * 100
-            if drawdown < max_dd:
-                max_dd = drawdown
-
-        return float(max_dd)
-
-    @staticmethod
+    @classmethod
     def calculate_sharpe_ratio(
+        cls,
         prices: List[float],
         risk_free_rate: float = 0.0
     ) -> Optional[float]:
@@ -121,34 +257,7 @@ class PerformanceCalculator:
         if not prices or len(prices) < 2:
             return None
 
-        # 日次リターン計算
-        returns = []
-        for i in range(1, len(prices)):
-            if prices[i-1] != 0:
-                daily_return = (prices[i] - prices[i-1]) / prices[i-1]
-                returns.append(daily_return)
-
-        if not returns:
-            return None
-
-        # 平均リターンと標準偏差
-        mean_return = np.mean(returns)
-        std_return = np.std(returns)
-
-        if std_return == 0:
-            return None
-
-        # 年率換算
-        annual_return = mean_return * 252
-        annual_std = std_return * np.sqrt(252)
-
-        # リスクフリーレートを日割り換算
-        daily_rf = risk_free_rate / 100 / 252
-
-        # シャープレシオ
-        sharpe = (annual_return - daily_rf * 252) / annual_std
-
-        return float(sharpe)
+        return cls.calculate_metrics_batch([prices], risk_free_rate)[0]["sharpe_ratio"]
 
     @classmethod
     def calculate_metrics(cls, prices: List[float]) -> Dict:
@@ -161,12 +270,17 @@ class PerformanceCalculator:
         Returns:
             メトリクス辞書
         """
-        return {
-            "total_return": cls.calculate_total_return(prices),
-            "volatility": cls.calculate_volatility(prices),
-            "max_drawdown": cls.calculate_max_drawdown(prices),
-            "sharpe_ratio": cls.calculate_sharpe_ratio(prices)
-        }
+        if not prices:
+            return {
+                "total_return": 0.0,
+                "volatility": None,
+                "max_drawdown": None,
+                "sharpe_ratio": None,
+                "sortino_ratio": None,
+                "calmar_ratio": None
+            }
+
+        return cls.calculate_metrics_batch([prices])[0]
 
     @staticmethod
     def create_ranking(assets_performance: List[Dict]) -> List[Dict]:
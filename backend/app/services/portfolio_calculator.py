@@ -3,11 +3,10 @@ Portfolio Calculator Service
 ポートフォリオのパフォーマンス計算サービス
 """
 
-from typing import List, Dict, Optional
+from typing import Dict, Optional
 from sqlalchemy.orm import Session
 from app.models.portfolio import Portfolio
-from app.models.company import Company
-from app.services.yfinance_client import yfinance_client
+from app.services.pricing_service import pricing_service
 
 
 class PortfolioCalculator:
@@ -52,54 +51,45 @@ class PortfolioCalculator:
         }
 
     @staticmethod
-    def get_current_price(asset_type: str, symbol: str) -> Optional[float]:
-        """
-        現在価格を取得
-
-        Args:
-            asset_type: 資産クラス
-            symbol: シンボル/銘柄コード
-
-        Returns:
-            現在価格
-        """
-        if asset_type in ["jp_stock", "us_stock"]:
-            stock_data = yfinance_client.get_stock_data_dict(symbol, period="1d")
-            if stock_data and len(stock_data) > 0:
-                return stock_data[-1]["close"]
-
-        # 他の資産クラス（暗号資産、為替など）は将来実装
-        return None
-
-    @classmethod
-    def calculate_portfolio_summary(
-        cls,
-        db: Session
+    async def calculate_portfolio_summary(
+        db: Session,
+        base_currency: Optional[str] = None
     ) -> Dict:
         """
         ポートフォリオ全体のサマリー計算
 
         Args:
             db: データベースセッション
+            base_currency: 評価額を揃える基準通貨（デフォルト: PORTFOLIO_BASE_CURRENCY）
 
         Returns:
-            サマリー情報
+            サマリー情報（金額は基準通貨建て、価格・換算レートを取得できなかったものは
+            missing_prices / missing_rates に列挙）
         """
         portfolio_items = db.query(Portfolio).all()
 
+        # 一覧と共有する価格スナップショットを取得
+        snapshot = await pricing_service.get_snapshot(
+            [(item.asset_type, item.symbol) for item in portfolio_items],
+            base_currency
+        )
+
         total_purchase_value = 0
         total_current_value = 0
         asset_allocation = {}
 
         for item in portfolio_items:
-            purchase_value = item.purchase_price * item.quantity
-            total_purchase_value += purchase_value
-
-            # 現在価格取得
-            current_price = cls.get_current_price(item.asset_type, item.symbol)
+            valuation = snapshot.value_holding(
+                item.asset_type,
+                item.symbol,
+                float(item.purchase_price),
+                float(item.quantity)
+            )
+            purchase_value = valuation["purchase_value"] or 0
+            current_value = valuation["current_value"]
 
-            if current_price:
-                current_value = current_price * item.quantity
+            total_purchase_value += purchase_value
+            if current_value:
                 total_current_value += current_value
 
             # 資産クラス別集計
@@ -111,8 +101,8 @@ class PortfolioCalculator:
                 }
 
             asset_allocation[item.asset_type]["purchase_value"] += purchase_value
-            if current_price:
-                asset_allocation[item.asset_type]["current_value"] += current_price * item.quantity
+            if current_value:
+                asset_allocation[item.asset_type]["current_value"] += current_value
             asset_allocation[item.asset_type]["count"] += 1
 
         # 総損益計算
@@ -130,12 +120,15 @@ class PortfolioCalculator:
             )
 
         return {
+            "base_currency": snapshot.base_currency,
             "total_purchase_value": total_purchase_value,
             "total_current_value": total_current_value,
             "total_profit_loss": total_profit_loss,
             "total_profit_loss_percentage": total_profit_loss_percentage,
             "asset_allocation": asset_allocation,
-            "total_items": len(portfolio_items)
+            "total_items": len(portfolio_items),
+            "missing_prices": snapshot.missing_prices(),
+            "missing_rates": snapshot.missing_rates()
         }
 
 
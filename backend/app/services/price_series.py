@@ -0,0 +1,298 @@
+"""
+Price Series
+OHLCV時系列の列指向（NumPy配列）表現
+"""
+
+from typing import TYPE_CHECKING, Any, Dict, List, Optional, Sequence, Tuple
+from datetime import date
+import json
+
+import numpy as np
+
+if TYPE_CHECKING:
+    import pandas as pd
+
+
+# レスポンスで使う列名（日付以外）
+PRICE_FIELDS = ("open", "high", "low", "close", "volume")
+
+
+def index_date_strings(index: "pd.Index") -> List[str]:
+    """
+    DatetimeIndexを "YYYY-MM-DD" 文字列のリストに一括変換
+
+    Args:
+        index: DataFrameのインデックス
+
+    Returns:
+        日付文字列リスト
+    """
+    if getattr(index, "tz", None) is not None:
+        index = index.tz_localize(None)
+    return index.strftime("%Y-%m-%d").tolist()
+
+
+def frame_to_points(df: "pd.DataFrame", column: str = "Close", key: str = "price") -> List[Dict[str, Any]]:
+    """
+    DataFrameの1列を [{"date": ..., key: ...}] 形式に変換（行ごとのSeries生成なし）
+
+    Args:
+        df: DatetimeIndexを持つDataFrame
+        column: 値として使う列名
+        key: 出力dictでの値のキー名
+
+    Returns:
+        日付と値のリスト
+    """
+    if df is None or df.empty:
+        return []
+
+    return [
+        {"date": day, key: value}
+        for day, value in zip(index_date_strings(df.index), df[column].to_numpy(dtype=np.float64).tolist())
+    ]
+
+
+def json_values(values: np.ndarray) -> List[Any]:
+    """
+    配列をJSON出力用のリストに変換（NaN・無限大はNone）
+
+    yfinanceは始値・高値・安値が欠損した行を返すことがあり、
+    NaNのまま json.dumps すると不正なJSON（NaN）になるため。
+
+    Args:
+        values: 数値配列
+
+    Returns:
+        値のリスト
+    """
+    if values.dtype.kind == "f":
+        finite = np.isfinite(values)
+        if not finite.all():
+            return np.where(finite, values, None).tolist()
+    return values.tolist()
+
+
+class PriceSeries:
+    """
+    OHLCV時系列
+
+    1行ごとのdictではなく列ごとのNumPy配列で保持する。
+    日付は1970-01-01からの日数（int32）、価格はfloat64、出来高はint64。
+    """
+
+    __slots__ = ("dates", "open", "high", "low", "close", "volume")
+
+    def __init__(
+        self,
+        dates: np.ndarray,
+        open: np.ndarray,
+        high: np.ndarray,
+        low: np.ndarray,
+        close: np.ndarray,
+        volume: np.ndarray
+    ):
+        self.dates = dates
+        self.open = open
+        self.high = high
+        self.low = low
+        self.close = close
+        self.volume = volume
+
+    @classmethod
+    def from_dataframe(cls, df: "pd.DataFrame") -> "PriceSeries":
+        """
+        yfinanceのDataFrameから作成
+
+        Args:
+            df: DatetimeIndexとOpen/High/Low/Close/Volume列を持つDataFrame
+
+        Returns:
+            PriceSeries
+        """
+        index = df.index
+        if getattr(index, "tz", None) is not None:
+            # 取引所現地の日付を保ったままタイムゾーン情報を外す
+            index = index.tz_localize(None)
+
+        dates = index.values.astype("datetime64[D]").astype(np.int32)
+
+        return cls(
+            dates=dates,
+            open=df["Open"].to_numpy(dtype=np.float64),
+            high=df["High"].to_numpy(dtype=np.float64),
+            low=df["Low"].to_numpy(dtype=np.float64),
+            close=df["Close"].to_numpy(dtype=np.float64),
+            volume=df["Volume"].fillna(0).to_numpy(dtype=np.int64)
+        )
+
+    @classmethod
+    def from_rows(cls, rows: List[Tuple]) -> "PriceSeries":
+        """
+        (date, open, high, low, close, volume) の行リストから作成
+
+        Args:
+            rows: DBから取得した行（日付昇順）
+
+        Returns:
+            PriceSeries
+        """
+        if not rows:
+            return cls.empty()
+
+        dates, opens, highs, lows, closes, volumes = zip(*rows)
+
+        return cls(
+            dates=np.array(dates, dtype="datetime64[D]").astype(np.int32),
+            open=np.array(opens, dtype=np.float64),
+            high=np.array(highs, dtype=np.float64),
+            low=np.array(lows, dtype=np.float64),
+            close=np.array(closes, dtype=np.float64),
+            volume=np.array([v or 0 for v in volumes], dtype=np.int64)
+        )
+
+    @classmethod
+    def empty(cls) -> "PriceSeries":
+        """空の系列"""
+        return cls(
+            dates=np.empty(0, dtype=np.int32),
+            open=np.empty(0, dtype=np.float64),
+            high=np.empty(0, dtype=np.float64),
+            low=np.empty(0, dtype=np.float64),
+            close=np.empty(0, dtype=np.float64),
+            volume=np.empty(0, dtype=np.int64)
+        )
+
+    def __len__(self) -> int:
+        return len(self.dates)
+
+    def __sizeof__(self) -> int:
+        # キャッシュのメモリ見積もりで配列本体のサイズを数えるため
+        return object.__sizeof__(self) + self.nbytes
+
+    @property
+    def nbytes(self) -> int:
+        """配列本体の合計バイト数"""
+        return sum(getattr(self, name).nbytes for name in self.__slots__)
+
+    def date_strings(self) -> List[str]:
+        """
+        日付を "YYYY-MM-DD" 文字列のリストで取得
+
+        Returns:
+            日付文字列リスト
+        """
+        return np.datetime_as_string(self.dates.astype("datetime64[D]"), unit="D").tolist()
+
+    def months(self) -> np.ndarray:
+        """各行の月（1-12）"""
+        days = self.dates.astype("datetime64[D]")
+        return (days.astype("datetime64[M]").astype(np.int64) % 12 + 1).astype(np.int32)
+
+    def years(self) -> np.ndarray:
+        """各行の年"""
+        days = self.dates.astype("datetime64[D]")
+        return (days.astype("datetime64[Y]").astype(np.int64) + 1970).astype(np.int32)
+
+    def to_records(self) -> List[Dict[str, Any]]:
+        """
+        行ごとのdictリストに変換（既存のレスポンス形式）
+
+        Returns:
+            [{"date", "open", "high", "low", "close", "volume"}, ...]
+        """
+        return [
+            {
+                "date": day,
+                "open": open_,
+                "high": high,
+                "low": low,
+                "close": close,
+                "volume": volume
+            }
+            for day, open_, high, low, close, volume in zip(
+                self.date_strings(),
+                json_values(self.open),
+                json_values(self.high),
+                json_values(self.low),
+                json_values(self.close),
+                self.volume.tolist()
+            )
+        ]
+
+    def to_columns(self, fields: Sequence[str] = PRICE_FIELDS) -> Dict[str, List[Any]]:
+        """
+        列ごとのリストに変換（チャート向けの列指向形式）
+
+        Args:
+            fields: 出力する列（日付は常に含む）
+
+        Returns:
+            {"date": [...], "close": [...], ...}
+        """
+        columns: Dict[str, List[Any]] = {"date": self.date_strings()}
+        for name in fields:
+            columns[name] = json_values(getattr(self, name))
+        return columns
+
+    def to_json_bytes(self, orient: str = "records", **fields: Any) -> bytes:
+        """
+        レスポンス用JSONバイト列にエンコード
+
+        Args:
+            orient: "records"（行ごとのdictリスト）または "columns"（列ごとのリスト）
+            fields: "data" と並べて出力する追加フィールド（stock_code, period など）
+
+        Returns:
+            {**fields, "data": ...} のJSONバイト列
+        """
+        data = self.to_columns() if orient == "columns" else self.to_records()
+
+        return json.dumps(
+            {**fields, "data": data},
+            ensure_ascii=False,
+            allow_nan=False,
+            separators=(",", ":")
+        ).encode("utf-8")
+
+    def to_dataframe(self) -> "pd.DataFrame":
+        """
+        yfinance と同じ列名のDataFrameに変換（配列はコピーする）
+
+        Returns:
+            DatetimeIndexとOpen/High/Low/Close/Volume列を持つDataFrame
+        """
+        import pandas as pd
+
+        return pd.DataFrame(
+            {
+                "Open": self.open.copy(),
+                "High": self.high.copy(),
+                "Low": self.low.copy(),
+                "Close": self.close.copy(),
+                "Volume": self.volume.copy()
+            },
+            index=pd.DatetimeIndex(self.dates.astype("datetime64[D]"), name="Date")
+        )
+
+    def readonly(self) -> "PriceSeries":
+        """
+        配列を読み取り専用にする（キャッシュで共有する系列用）
+
+        Returns:
+            self
+        """
+        for name in self.__slots__:
+            getattr(self, name).setflags(write=False)
+        return self
+
+    def to_dates(self) -> List[date]:
+        """日付を datetime.date のリストで取得"""
+        return self.dates.astype("datetime64[D]").tolist()
+
+    def last_close(self) -> Optional[float]:
+        """最新の終値（欠損は除く）"""
+        closes = self.close[np.isfinite(self.close)]
+        if len(closes) == 0:
+            return None
+        return float(closes[-1])
@@ -0,0 +1,322 @@
+"""
+Price Store
+stock_prices テーブルを使ったローカル株価ストア
+"""
+
+from typing import Any, Dict, List, Optional
+from datetime import date, timedelta
+import logging
+
+import numpy as np
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+
+from app.models.company import Company
+from app.models.stock_price import StockPrice
+from app.services.price_series import PriceSeries
+from app.services.yfinance_client import yfinance_client
+from app.services.cache_service import cache_service, CACHE_TTL_STOCK_PRICE
+
+logger = logging.getLogger(__name__)
+
+
+# 初回取り込み時に取得する期間（これより長い期間はストアを使わずに直接取得）
+BACKFILL_PERIOD = "5y"
+
+# 1文のUPSERTで書き込む行数
+UPSERT_CHUNK_SIZE = 1000
+
+# UPSERTで上書きする列
+PRICE_COLUMNS = ("open", "high", "low", "close", "volume")
+
+# 期間 -> 遡る日数
+PERIOD_DAYS: Dict[str, int] = {
+    "1d": 1,
+    "5d": 7,
+    "1mo": 31,
+    "3mo": 92,
+    "6mo": 183,
+    "1y": 366,
+    "2y": 731,
+    "5y": 1827,
+}
+
+
+def _rounded(values: np.ndarray) -> list:
+    """小数2桁に丸めたリスト（欠損はNone）"""
+    rounded = np.round(values, 2)
+    return np.where(np.isfinite(rounded), rounded, None).tolist()
+
+
+def _has_corporate_action(df, after: Optional[date] = None) -> bool:
+    """
+    取得した期間に配当・株式分割があるか（調整後価格の基準が変わる）
+
+    Args:
+        df: yfinanceの日足
+        after: この日より後の足だけを見る（保存済みの最新日の配当・分割は調整済みのため）
+    """
+    if after is not None:
+        df = df[np.array([day > after for day in df.index.date], dtype=bool)]
+    for column in ("Dividends", "Stock Splits"):
+        if column in df.columns and (df[column].fillna(0) != 0).any():
+            return True
+    return False
+
+
+class PriceStore:
+    """ローカル株価ストア"""
+
+    @staticmethod
+    def get_latest_date(db: Session, company_id: int) -> Optional[date]:
+        """
+        保存済みの最新日付を取得
+
+        Args:
+            db: データベースセッション
+            company_id: 企業ID
+
+        Returns:
+            最新日付、未保存の場合はNone
+        """
+        return db.query(func.max(StockPrice.date)).filter(
+            StockPrice.company_id == company_id
+        ).scalar()
+
+    @staticmethod
+    def upsert_series(db: Session, company_id: int, series: PriceSeries) -> int:
+        """
+        日足をまとめて保存（既存日付は更新、新規日付は挿入）
+
+        (company_id, date) の一意インデックスに対する1文のUPSERTで書き込むため、
+        同じ企業の取り込みが同時に走っても行が重複しない。
+
+        Args:
+            db: データベースセッション
+            company_id: 企業ID
+            series: 保存する日足
+
+        Returns:
+            保存（挿入＋更新）した行数
+        """
+        if len(series) == 0:
+            return 0
+
+        rows = [
+            {
+                "company_id": company_id,
+                "date": day,
+                "open": open_,
+                "high": high,
+                "low": low,
+                "close": close,
+                "volume": volume
+            }
+            for day, open_, high, low, close, volume in zip(
+                series.to_dates(),
+                _rounded(series.open),
+                _rounded(series.high),
+                _rounded(series.low),
+                _rounded(series.close),
+                series.volume.tolist()
+            )
+        ]
+
+        dialect = db.get_bind().dialect.name
+        if dialect not in ("mysql", "sqlite", "postgresql"):
+            return PriceStore._upsert_rows_generic(db, company_id, rows)
+
+        if dialect == "mysql":
+            from sqlalchemy.dialects.mysql import insert
+
+            stmt = insert(StockPrice)
+            # 取引時間中に取り込んだ当日分などを確定値で上書き
+            stmt = stmt.on_duplicate_key_update(
+                **{name: stmt.inserted[name] for name in PRICE_COLUMNS}
+            )
+        else:
+            if dialect == "sqlite":
+                from sqlalchemy.dialects.sqlite import insert
+            else:
+                from sqlalchemy.dialects.postgresql import insert
+
+            stmt = insert(StockPrice)
+            stmt = stmt.on_conflict_do_update(
+                index_elements=["company_id", "date"],
+                set_={name: stmt.excluded[name] for name in PRICE_COLUMNS}
+            )
+
+        for i in range(0, len(rows), UPSERT_CHUNK_SIZE):
+            db.execute(stmt, rows[i:i + UPSERT_CHUNK_SIZE])
+
+        db.commit()
+        return len(rows)
+
+    @staticmethod
+    def _upsert_rows_generic(db: Session, company_id: int, rows: List[Dict[str, Any]]) -> int:
+        """
+        UPSERT構文のないデータベース向けの保存（既存日付を照会してから更新・挿入）
+
+        同じ企業の取り込みが同時に走った場合は一意インデックス違反になり、呼び出し側で失敗として扱う。
+
+        Args:
+            db: データベースセッション
+            company_id: 企業ID
+            rows: 保存する行
+
+        Returns:
+            保存（挿入＋更新）した行数
+        """
+        existing = dict(
+            db.query(StockPrice.date, StockPrice.id).filter(
+                StockPrice.company_id == company_id,
+                StockPrice.date >= rows[0]["date"],
+                StockPrice.date <= rows[-1]["date"]
+            ).all()
+        )
+
+        updates = [{"id": existing[row["date"]], **row} for row in rows if row["date"] in existing]
+        inserts = [row for row in rows if row["date"] not in existing]
+
+        if updates:
+            db.bulk_update_mappings(StockPrice, updates)
+        if inserts:
+            db.bulk_insert_mappings(StockPrice, inserts)
+
+        db.commit()
+        return len(rows)
+
+    @staticmethod
+    def load_series(
+        db: Session,
+        company_id: int,
+        start: Optional[date] = None
+    ) -> PriceSeries:
+        """
+        保存済みの日足を1回のインデックス範囲スキャンで取得
+
+        Args:
+            db: データベースセッション
+            company_id: 企業ID
+            start: 開始日（この日を含む）、Noneの場合は全期間
+
+        Returns:
+            PriceSeries（日付昇順）
+        """
+        query = db.query(
+            StockPrice.date,
+            StockPrice.open,
+            StockPrice.high,
+            StockPrice.low,
+            StockPrice.close,
+            StockPrice.volume
+        ).filter(StockPrice.company_id == company_id)
+
+        if start is not None:
+            query = query.filter(StockPrice.date >= start)
+
+        return PriceSeries.from_rows(query.order_by(StockPrice.date).all())
+
+    @classmethod
+    def sync_company(cls, db: Session, company: Company) -> int:
+        """
+        企業の日足を最新化（未保存なら初回取り込み、保存済みなら最新日以降のみ取得）
+
+        Args:
+            db: データベースセッション
+            company: 企業モデル
+
+        Returns:
+            保存した行数
+        """
+        latest = cls.get_latest_date(db, company.id)
+
+        if latest is None:
+            return cls.backfill_company(db, company)
+        if latest >= date.today():
+            return 0
+
+        # 最新日も取り直して確定値で上書きする
+        df = yfinance_client.get_stock_data_since(company.stock_code, latest)
+        if df is None or df.empty:
+            return 0
+
+        # 最新日の配当・分割は保存済みの値に反映済みのため、それより後の足だけを見る
+        # （最新日が権利落ち日だと、次の足が出るまで毎回全期間を取り直してしまう）
+        if _has_corporate_action(df, after=latest):
+            # yfinanceの価格は配当・分割調整済みのため、保存済みの過去分も基準が変わる
+            logger.info(f"Corporate action detected for {company.stock_code}, re-backfilling prices")
+            return cls.backfill_company(db, company, replace=True)
+
+        return cls.upsert_series(db, company.id, PriceSeries.from_dataframe(df))
+
+    @classmethod
+    def backfill_company(cls, db: Session, company: Company, replace: bool = False) -> int:
+        """
+        企業の日足を BACKFILL_PERIOD 分まとめて取り込み
+
+        Args:
+            db: データベースセッション
+            company: 企業モデル
+            replace: Trueの場合は保存済みの日足を全て置き換える（配当・分割後の再調整）
+
+        Returns:
+            保存した行数
+        """
+        series = yfinance_client.get_price_series(company.stock_code, period=BACKFILL_PERIOD)
+        if series is None or len(series) == 0:
+            return 0
+
+        if replace:
+            # 削除と再挿入は同じトランザクションで行う（upsert_series がコミット）
+            db.query(StockPrice).filter(StockPrice.company_id == company.id).delete(synchronize_session=False)
+
+        return cls.upsert_series(db, company.id, series)
+
+    @classmethod
+    def get_series(cls, db: Session, stock_code: str, period: str) -> Optional[PriceSeries]:
+        """
+        ストアから期間分の日足を取得（不足している末尾のみ上流から補完）
+
+        Args:
+            db: データベースセッション
+            stock_code: 銘柄コード
+            period: 期間
+
+        Returns:
+            PriceSeries、ストア対象外（未登録企業・長期間）や取得失敗時はNone
+        """
+        if period not in PERIOD_DAYS:
+            return None
+
+        try:
+            company = db.query(Company).filter(Company.stock_code == stock_code).first()
+            if company is None:
+                return None
+
+            # 差分取得は株価キャッシュと同じ間隔でのみ行う
+            sync_key = f"price_store_synced:{company.id}"
+            if cache_service.get(sync_key) is None:
+                cls.sync_company(db, company)
+                cache_service.set(sync_key, True, CACHE_TTL_STOCK_PRICE)
+
+            if period in ("1d", "5d"):
+                # 日数ではなく直近の営業日数で切り出す
+                series = cls.load_series(db, company.id, date.today() - timedelta(days=PERIOD_DAYS["1mo"]))
+                count = 1 if period == "1d" else 5
+                series = PriceSeries(
+                    *(getattr(series, name)[-count:] for name in PriceSeries.__slots__)
+                )
+            else:
+                start = date.today() - timedelta(days=PERIOD_DAYS[period])
+                series = cls.load_series(db, company.id, start)
+
+            return series if len(series) > 0 else None
+        except Exception as e:
+            db.rollback()
+            logger.error(f"Price store error for {stock_code}: {e}")
+            return None
+
+
+# Singleton instance
+price_store = PriceStore()
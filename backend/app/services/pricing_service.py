@@ -0,0 +1,327 @@
+"""
+Pricing Service
+保有資産の現在価格を資産クラスごとに一括取得し、基準通貨に換算するサービス
+"""
+
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+from functools import partial
+import asyncio
+import hashlib
+import logging
+import os
+
+from app.services.yfinance_client import yfinance_client
+from app.services.crypto_client import crypto_client
+from app.services.exchange_rate_client import exchange_rate_client
+from app.services.cache_service import cache_service
+
+logger = logging.getLogger(__name__)
+
+# 評価額を揃える基準通貨
+PORTFOLIO_BASE_CURRENCY = os.getenv("PORTFOLIO_BASE_CURRENCY", "JPY").upper()
+
+# 価格取得の並列数・1リクエストの銘柄数・タイムアウト（秒）
+QUOTE_FETCH_CONCURRENCY = int(os.getenv("QUOTE_FETCH_CONCURRENCY", "8"))
+QUOTE_FETCH_CHUNK_SIZE = int(os.getenv("QUOTE_FETCH_CHUNK_SIZE", "20"))
+QUOTE_FETCH_TIMEOUT = float(os.getenv("QUOTE_FETCH_TIMEOUT", "10"))
+
+# 価格スナップショットを一覧・サマリーで共有する時間（秒）
+PRICE_SNAPSHOT_TTL = int(os.getenv("PRICE_SNAPSHOT_TTL", "60"))
+
+# yfinanceの一括取得で扱う資産クラス
+YFINANCE_ASSET_TYPES = ["jp_stock", "us_stock", "fx"]
+
+
+def fx_pair(symbol: str) -> Tuple[str, str]:
+    """
+    為替シンボルを (基準通貨, 対象通貨) に分解
+
+    Args:
+        symbol: "USD/JPY" または "USDJPY" 形式
+
+    Returns:
+        (基準通貨, 対象通貨)
+    """
+    if "/" in symbol:
+        base, target = symbol.split("/", 1)
+    else:
+        base, target = symbol[:3], symbol[3:6]
+    return base.upper(), target.upper()
+
+
+def native_currency(asset_type: str, symbol: str) -> str:
+    """
+    価格の通貨（購入価格も同じ通貨で記録されている前提）
+
+    Args:
+        asset_type: 資産クラス
+        symbol: シンボル/銘柄コード
+
+    Returns:
+        通貨コード
+    """
+    if asset_type == "jp_stock":
+        return "JPY"
+    if asset_type == "fx":
+        # 為替の保有は基準通貨の数量、価格は対象通貨建てのレート
+        return fx_pair(symbol)[1]
+    # 米国株・暗号資産（CoinGecko USD建て）
+    return "USD"
+
+
+class PriceSnapshot:
+    """
+    ある時点の保有資産の価格と換算レート
+
+    価格は各資産の通貨建て、rates は各通貨 -> 基準通貨のレート。
+    """
+
+    def __init__(
+        self,
+        base_currency: str,
+        prices: Dict[Tuple[str, str], Optional[float]],
+        rates: Dict[str, Optional[float]]
+    ):
+        self.base_currency = base_currency
+        self.prices = prices
+        self.rates = rates
+
+    def get_price(self, asset_type: str, symbol: str) -> Optional[float]:
+        """資産の通貨建ての現在価格"""
+        return self.prices.get((asset_type, symbol))
+
+    def to_base(self, amount: Optional[float], currency: str) -> Optional[float]:
+        """
+        金額を基準通貨に換算
+
+        Args:
+            amount: 金額
+            currency: 金額の通貨
+
+        Returns:
+            基準通貨建ての金額、レートがない場合はNone
+        """
+        rate = self.rates.get(currency)
+        if amount is None or rate is None:
+            return None
+        return amount * rate
+
+    def value_holding(self, asset_type: str, symbol: str, purchase_price: float, quantity: float) -> Dict[str, Any]:
+        """
+        保有銘柄の評価
+
+        購入額も現在のレートで基準通貨に換算する（購入時レートの履歴は持たないため、
+        損益には為替変動分を含まない）。
+
+        Args:
+            asset_type: 資産クラス
+            symbol: シンボル/銘柄コード
+            purchase_price: 購入価格（資産の通貨建て）
+            quantity: 数量
+
+        Returns:
+            通貨・現在価格と基準通貨建ての購入額・評価額・損益
+        """
+        currency = native_currency(asset_type, symbol)
+        current_price = self.get_price(asset_type, symbol)
+
+        purchase_value = self.to_base(purchase_price * quantity, currency)
+        current_value = (
+            self.to_base(current_price * quantity, currency)
+            if current_price is not None else None
+        )
+
+        profit_loss = None
+        profit_loss_percentage = None
+        if current_value is not None and purchase_value is not None:
+            profit_loss = current_value - purchase_value
+            profit_loss_percentage = (profit_loss / purchase_value) * 100 if purchase_value > 0 else 0
+
+        return {
+            "currency": currency,
+            "current_price": current_price,
+            "purchase_value": purchase_value,
+            "current_value": current_value,
+            "profit_loss": profit_loss,
+            "profit_loss_percentage": profit_loss_percentage
+        }
+
+    def missing_prices(self) -> List[str]:
+        """価格を取得できなかったシンボル"""
+        return sorted({symbol for (_, symbol), price in self.prices.items() if price is None})
+
+    def missing_rates(self) -> List[str]:
+        """基準通貨への換算レートを取得できなかった通貨"""
+        return sorted(currency for currency, rate in self.rates.items() if rate is None)
+
+
+class PricingService:
+    """
+    価格取得サービス
+
+    株式・為替は yfinance の一括ダウンロード、暗号資産は CoinGecko の一括価格APIで
+    資産クラスごとに1回ずつ取得し、換算レートと合わせて PriceSnapshot にまとめる。
+    """
+
+    def __init__(self, base_currency: str = PORTFOLIO_BASE_CURRENCY):
+        self.base_currency = base_currency
+
+    async def get_snapshot(
+        self,
+        holdings: Iterable[Tuple[str, str]],
+        base_currency: Optional[str] = None
+    ) -> PriceSnapshot:
+        """
+        保有資産の価格スナップショットを取得
+
+        同じ保有構成・基準通貨のスナップショットは PRICE_SNAPSHOT_TTL 秒キャッシュされ、
+        同時に呼ばれた場合も取得は1回にまとめられる（一覧とサマリーで共有）。
+
+        Args:
+            holdings: (資産クラス, シンボル) のリスト
+            base_currency: 基準通貨（デフォルト: PORTFOLIO_BASE_CURRENCY）
+
+        Returns:
+            PriceSnapshot
+        """
+        base_currency = (base_currency or self.base_currency).upper()
+        keys = sorted(set(holdings))
+
+        fingerprint = hashlib.sha1(repr(keys).encode("utf-8")).hexdigest()
+        return await cache_service.get_or_compute(
+            f"price_snapshot:{base_currency}:{fingerprint}",
+            partial(self._build_snapshot, keys, base_currency),
+            PRICE_SNAPSHOT_TTL
+        )
+
+    async def _build_snapshot(self, keys: List[Tuple[str, str]], base_currency: str) -> PriceSnapshot:
+        """価格と換算レートを同時に取得してスナップショットを作成"""
+        currencies = sorted({native_currency(asset_type, symbol) for asset_type, symbol in keys})
+
+        prices, rates = await asyncio.gather(
+            self.fetch_prices(keys),
+            self.fetch_rates(currencies, base_currency)
+        )
+
+        return PriceSnapshot(base_currency, prices, rates)
+
+    async def fetch_prices(
+        self,
+        keys: List[Tuple[str, str]],
+        timeout: float = QUOTE_FETCH_TIMEOUT,
+        concurrency: int = QUOTE_FETCH_CONCURRENCY
+    ) -> Dict[Tuple[str, str], Optional[float]]:
+        """
+        資産の現在価格（資産の通貨建て）を並列に取得
+
+        yfinance 対象は資産クラスごとに QUOTE_FETCH_CHUNK_SIZE 銘柄ずつ一括取得し、
+        各チャンクをスレッドプールで同時実行する（イベントループはブロックしない）。
+        暗号資産は CoinGecko の一括価格APIで全銘柄をまとめて取得する（USD建て）。
+        タイムアウトしたチャンクの銘柄は None となり、取得できた分だけ返す。
+
+        Args:
+            keys: (資産クラス, シンボル) のリスト
+            timeout: 1チャンクあたりのタイムアウト（秒）
+            concurrency: 同時実行チャンク数の上限
+
+        Returns:
+            (資産クラス, シンボル) -> 現在価格（取得できない場合はNone）
+        """
+        symbols_by_type: Dict[str, List[str]] = {}
+        for asset_type, symbol in keys:
+            symbols = symbols_by_type.setdefault(asset_type, [])
+            if symbol not in symbols:
+                symbols.append(symbol)
+
+        chunks: List[Tuple[str, List[str]]] = []
+        for asset_type in YFINANCE_ASSET_TYPES:
+            symbols = symbols_by_type.get(asset_type, [])
+            for i in range(0, len(symbols), QUOTE_FETCH_CHUNK_SIZE):
+                chunks.append((asset_type, symbols[i:i + QUOTE_FETCH_CHUNK_SIZE]))
+
+        semaphore = asyncio.Semaphore(concurrency)
+
+        async def fetch_chunk(asset_type: str, symbols: List[str]) -> Dict[str, Optional[float]]:
+            # 為替は "USD/JPY" を yfinance の "USDJPY" 形式に変換して取得
+            request_symbols = {
+                "".join(fx_pair(symbol)) if asset_type == "fx" else symbol: symbol
+                for symbol in symbols
+            }
+
+            async with semaphore:
+                try:
+                    quotes = await asyncio.wait_for(
+                        asyncio.to_thread(yfinance_client.get_current_prices, list(request_symbols), asset_type),
+                        timeout=timeout
+                    )
+                    return {request_symbols[symbol]: price for symbol, price in quotes.items()}
+                except asyncio.TimeoutError:
+                    logger.warning(f"Quote fetch timed out for {asset_type}: {symbols}")
+                except Exception as e:
+                    logger.error(f"Quote fetch failed for {asset_type}: {e}")
+                return {}
+
+        async def fetch_crypto(symbols: List[str]) -> Dict[str, Optional[float]]:
+            if not symbols:
+                return {}
+            try:
+                crypto_ids = {symbol: crypto_client.symbol_to_id(symbol) for symbol in symbols}
+                quotes = await asyncio.wait_for(
+                    crypto_client.get_crypto_prices(list(crypto_ids.values()), ["usd"]),
+                    timeout=timeout
+                )
+                return {symbol: quotes[crypto_id]["usd"] for symbol, crypto_id in crypto_ids.items()}
+            except asyncio.TimeoutError:
+                logger.warning(f"Quote fetch timed out for crypto: {symbols}")
+            except Exception as e:
+                logger.error(f"Quote fetch failed for crypto: {e}")
+            return {}
+
+        results = await asyncio.gather(
+            *(fetch_chunk(asset_type, symbols) for asset_type, symbols in chunks),
+            fetch_crypto(symbols_by_type.get("crypto", []))
+        )
+        crypto_quotes = results.pop()
+
+        prices: Dict[Tuple[str, str], Optional[float]] = {key: None for key in keys}
+        for (asset_type, _), quotes in zip(chunks, results):
+            for symbol, price in quotes.items():
+                prices[(asset_type, symbol)] = price
+        for symbol, price in crypto_quotes.items():
+            prices[("crypto", symbol)] = price
+
+        return prices
+
+    async def fetch_rates(self, currencies: List[str], base_currency: str) -> Dict[str, Optional[float]]:
+        """
+        各通貨から基準通貨への換算レートを取得
+
+        キャッシュ済みのレート行列1つから全通貨分を導出する（通貨ペアごとの取得なし）。
+
+        Args:
+            currencies: 通貨コードのリスト
+            base_currency: 基準通貨
+
+        Returns:
+            通貨 -> レート（1 通貨 = rate 基準通貨、取得できない場合はNone）
+        """
+        try:
+            matrix = await exchange_rate_client.get_rate_matrix(currencies + [base_currency])
+        except Exception as e:
+            logger.error(f"Exchange rate matrix fetch failed: {e}")
+            matrix = None
+
+        rates: Dict[str, Optional[float]] = {}
+        for currency in currencies:
+            if currency == base_currency:
+                rates[currency] = 1.0
+            elif matrix is not None:
+                rates[currency] = matrix.rate(currency, base_currency)
+            else:
+                rates[currency] = None
+
+        return rates
+
+
+# Singleton instance
+pricing_service = PricingService()
@@ -0,0 +1,452 @@
+"""
+Rate Limiter
+上流API向けトークンバケット（プロセス内メモリ / SQLite共有ファイル）
+"""
+
+from typing import Any, Callable, Dict, Optional, Tuple
+from datetime import datetime, timedelta, timezone
+import asyncio
+import logging
+import os
+import sqlite3
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+
+def _refill(tokens: float, updated_at: float, capacity: float, rate: float, now: float) -> float:
+    """経過時間分のトークンを補充（上限 capacity）"""
+    return min(capacity, tokens + max(0.0, now - updated_at) * rate)
+
+
+def _take(tokens: float, capacity: float, rate: float, count: float) -> Tuple[float, float]:
+    """
+    トークンを消費
+
+    Returns:
+        (消費後のトークン数, 待つべき秒数（0なら消費成功）)
+    """
+    if count > capacity:
+        # バケットの容量を超える要求は満たせない
+        return tokens, float("inf")
+    if tokens >= count:
+        return tokens - count, 0.0
+    if rate <= 0:
+        # 補充されないバケットは待っても空かない
+        return tokens, float("inf")
+    return tokens, (count - tokens) / rate
+
+
+class RateLimitBackend:
+    """トークンバケットの状態の保存先（基底クラス）"""
+
+    name = "base"
+
+    def take(self, key: str, capacity: float, rate: float, count: float) -> float:
+        """
+        トークンを消費
+
+        Args:
+            key: バケット名
+            capacity: バケット容量
+            rate: 1秒あたりの補充数
+            count: 消費するトークン数
+
+        Returns:
+            消費できた場合は0、できない場合は補充まで待つべき秒数
+        """
+        raise NotImplementedError
+
+    def peek(self, key: str, capacity: float, rate: float) -> float:
+        """
+        現在のトークン数を取得（消費しない）
+
+        Args:
+            key: バケット名
+            capacity: バケット容量
+            rate: 1秒あたりの補充数
+
+        Returns:
+            残りトークン数
+        """
+        raise NotImplementedError
+
+
+class MemoryRateLimitBackend(RateLimitBackend):
+    """プロセス内メモリ（ワーカーごとに独立）"""
+
+    name = "memory"
+
+    def __init__(self):
+        self._buckets: Dict[str, Tuple[float, float]] = {}
+        self._lock = threading.Lock()
+
+    def take(self, key: str, capacity: float, rate: float, count: float) -> float:
+        now = time.time()
+        with self._lock:
+            tokens, updated_at = self._buckets.get(key, (capacity, now))
+            tokens, wait = _take(_refill(tokens, updated_at, capacity, rate, now), capacity, rate, count)
+            self._buckets[key] = (tokens, now)
+            return wait
+
+    def peek(self, key: str, capacity: float, rate: float) -> float:
+        now = time.time()
+        with self._lock:
+            tokens, updated_at = self._buckets.get(key, (capacity, now))
+            return _refill(tokens, updated_at, capacity, rate, now)
+
+
+class SQLiteRateLimitBackend(RateLimitBackend):
+    """
+    SQLiteファイル（同一ホストの全ワーカー・スクリプトで共有）
+
+    トークンの補充と消費は BEGIN IMMEDIATE のトランザクション内で行い、
+    複数プロセスから同時に呼ばれても枠を二重に使わない。
+    """
+
+    name = "sqlite"
+
+    def __init__(self, path: str):
+        """
+        Args:
+            path: SQLiteファイルのパス
+        """
+        self.path = path
+        self._local = threading.local()
+
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+
+        self._connection().execute(
+            """
+            CREATE TABLE IF NOT EXISTS rate_limit_buckets (
+                key TEXT PRIMARY KEY,
+                tokens REAL NOT NULL,
+                updated_at REAL NOT NULL
+            )
+            """
+        )
+
+    def _connection(self) -> sqlite3.Connection:
+        """スレッドごとのコネクションを取得"""
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=5.0, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            self._local.conn = conn
+        return conn
+
+    def take(self, key: str, capacity: float, rate: float, count: float) -> float:
+        conn = self._connection()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            now = time.time()
+            row = conn.execute(
+                "SELECT tokens, updated_at FROM rate_limit_buckets WHERE key = ?",
+                (key,)
+            ).fetchone()
+            tokens, updated_at = row if row is not None else (capacity, now)
+
+            tokens, wait = _take(_refill(tokens, updated_at, capacity, rate, now), capacity, rate, count)
+            conn.execute(
+                "INSERT OR REPLACE INTO rate_limit_buckets (key, tokens, updated_at) VALUES (?, ?, ?)",
+                (key, tokens, now)
+            )
+            conn.execute("COMMIT")
+            return wait
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+
+    def peek(self, key: str, capacity: float, rate: float) -> float:
+        now = time.time()
+        row = self._connection().execute(
+            "SELECT tokens, updated_at FROM rate_limit_buckets WHERE key = ?",
+            (key,)
+        ).fetchone()
+        if row is None:
+            return capacity
+        return _refill(row[0], row[1], capacity, rate, now)
+
+
+def create_rate_limit_backend(backend: Optional[str] = None) -> RateLimitBackend:
+    """
+    保存先を作成
+
+    - memory: プロセス内メモリ（再起動で満タンに戻り、ワーカーごとに独立）
+    - sqlite: RATE_LIMIT_SQLITE_PATH のファイルを同一ホストの全ワーカー・スクリプトで共有
+
+    Args:
+        backend: 保存先の種類（デフォルト: 環境変数 RATE_LIMIT_BACKEND、未設定なら memory）
+
+    Returns:
+        レート制限の保存先
+    """
+    backend = (backend or os.getenv("RATE_LIMIT_BACKEND", "memory")).lower()
+
+    if backend == "sqlite":
+        try:
+            return SQLiteRateLimitBackend(os.getenv("RATE_LIMIT_SQLITE_PATH", "./data/rate_limits.sqlite3"))
+        except Exception as e:
+            logger.error(f"Failed to initialize sqlite rate limit backend, falling back to memory: {e}")
+
+    return MemoryRateLimitBackend()
+
+
+class RateLimiter:
+    """
+    トークンバケット方式のレート制限
+
+    capacity 個までまとめて使え、1秒あたり refill_per_second 個ずつ補充される。
+    非同期コードは acquire で枠が空くまでイベントループを止めずに待ち、
+    スレッドで動く同期コード（yfinance など）は acquire_sync を使う。
+    """
+
+    def __init__(
+        self,
+        name: str,
+        capacity: float,
+        refill_per_second: float,
+        backend: Optional[RateLimitBackend] = None,
+        enabled: bool = True,
+        backend_factory: Optional[Callable[[], RateLimitBackend]] = None
+    ):
+        """
+        Args:
+            name: バケット名（保存先で共有されるキー）
+            capacity: バケット容量（最大の連続リクエスト数）
+            refill_per_second: 1秒あたりの補充数
+            backend: 状態の保存先（デフォルト: 共有の保存先）
+            enabled: Falseの場合は常に即座に許可する
+            backend_factory: 最初に使われた時点で保存先を作る関数（backend の代わりに指定、
+                インポートしただけでファイルを作らないため）
+        """
+        self.name = name
+        self.capacity = float(capacity)
+        self.refill_per_second = float(refill_per_second)
+        self.enabled = enabled
+        self._backend = backend if backend is not None or backend_factory is not None else rate_limit_backend
+        self._backend_factory = backend_factory
+        self._backend_lock = threading.Lock()
+
+    @property
+    def backend(self) -> RateLimitBackend:
+        """状態の保存先（backend_factory を指定した場合は初回アクセス時に作成）"""
+        if self._backend is None:
+            with self._backend_lock:
+                if self._backend is None:
+                    self._backend = self._backend_factory()
+        return self._backend
+
+    def bucket_key(self) -> str:
+        """保存先でのバケットのキー"""
+        return self.name
+
+    def try_acquire(self, tokens: float = 1) -> float:
+        """
+        待たずにトークンの消費を試みる
+
+        Args:
+            tokens: 消費するトークン数
+
+        Returns:
+            消費できた場合は0、できない場合は待つべき秒数
+        """
+        if tokens > self.capacity:
+            raise ValueError(f"{self.name}: cannot acquire {tokens} tokens (capacity {self.capacity})")
+        if not self.enabled:
+            return 0.0
+        return self.backend.take(self.bucket_key(), self.capacity, self.refill_per_second, tokens)
+
+    async def atry_acquire(self, tokens: float = 1) -> float:
+        """
+        try_acquire の非同期版
+
+        SQLiteなどファイルを使う保存先（未作成の場合はその作成も）はロック待ちが発生するため、
+        スレッドで実行してイベントループを止めない。
+
+        Args:
+            tokens: 消費するトークン数
+
+        Returns:
+            消費できた場合は0、できない場合は待つべき秒数
+        """
+        if not self.enabled or isinstance(self._backend, MemoryRateLimitBackend):
+            return self.try_acquire(tokens)
+        return await asyncio.to_thread(self.try_acquire, tokens)
+
+    async def acquire(self, tokens: float = 1, timeout: Optional[float] = None) -> bool:
+        """
+        トークンを消費できるまで待つ（非同期）
+
+        Args:
+            tokens: 消費するトークン数
+            timeout: 最大待ち時間（秒）、Noneの場合は無制限、0の場合は待たない
+
+        Returns:
+            消費できた場合True、timeout内に枠が空かない場合（補充されないバケットを含む）False
+
+        Raises:
+            ValueError: tokens がバケット容量を超える場合
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+
+        while True:
+            wait = await self.atry_acquire(tokens)
+            if wait <= 0:
+                return True
+            if wait == float("inf") or (deadline is not None and time.monotonic() + wait > deadline):
+                return False
+            await asyncio.sleep(wait)
+
+    def acquire_sync(self, tokens: float = 1, timeout: Optional[float] = None) -> bool:
+        """
+        トークンを消費できるまで待つ（同期、スレッドプール内の処理用）
+
+        Args:
+            tokens: 消費するトークン数
+            timeout: 最大待ち時間（秒）、Noneの場合は無制限、0の場合は待たない
+
+        Returns:
+            消費できた場合True、timeout内に枠が空かない場合（補充されないバケットを含む）False
+
+        Raises:
+            ValueError: tokens がバケット容量を超える場合
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+
+        while True:
+            wait = self.try_acquire(tokens)
+            if wait <= 0:
+                return True
+            if wait == float("inf") or (deadline is not None and time.monotonic() + wait > deadline):
+                return False
+            time.sleep(wait)
+
+    def remaining(self) -> float:
+        """残りトークン数"""
+        if not self.enabled:
+            return self.capacity
+        return self.backend.peek(self.bucket_key(), self.capacity, self.refill_per_second)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        レート制限の状態を取得
+
+        Returns:
+            容量・残り・満タンまでの秒数など
+        """
+        remaining = self.remaining()
+        return {
+            "name": self.name,
+            "backend": self.backend.name,
+            "enabled": self.enabled,
+            "capacity": self.capacity,
+            "remaining": round(remaining, 3),
+            "refill_per_second": self.refill_per_second,
+            "seconds_until_full": (
+                round((self.capacity - remaining) / self.refill_per_second, 1)
+                if self.refill_per_second > 0 else None
+            )
+        }
+
+
+class MonthlyQuota(RateLimiter):
+    """
+    暦月ごとのリクエスト数の上限
+
+    月ごとに別のバケット（補充なし）を使い、月が変わると満タンから始まる。
+    連続補充のトークンバケットと違い、月初に前月の残りが持ち越されて上限を超えることがない。
+    """
+
+    def __init__(
+        self,
+        name: str,
+        quota: int,
+        tz: timezone = timezone.utc,
+        backend: Optional[RateLimitBackend] = None,
+        enabled: bool = True,
+        backend_factory: Optional[Callable[[], RateLimitBackend]] = None
+    ):
+        """
+        Args:
+            name: バケット名（月をつけて保存先のキーにする）
+            quota: 1か月のリクエスト数の上限
+            tz: 月の区切りのタイムゾーン
+            backend: 状態の保存先（デフォルト: 共有の保存先）
+            enabled: Falseの場合は常に即座に許可する
+            backend_factory: 最初に使われた時点で保存先を作る関数
+        """
+        super().__init__(name, quota, 0, backend=backend, enabled=enabled, backend_factory=backend_factory)
+        self.tz = tz
+
+    def _month_start(self) -> datetime:
+        """今月の初め"""
+        return datetime.now(self.tz).replace(day=1, hour=0, minute=0, second=0, microsecond=0)
+
+    def bucket_key(self) -> str:
+        return f"{self.name}:{self._month_start():%Y-%m}"
+
+    def get_stats(self) -> Dict[str, Any]:
+        stats = super().get_stats()
+        month_start = self._month_start()
+        next_month = (month_start + timedelta(days=32)).replace(day=1)
+        stats["period"] = f"{month_start:%Y-%m}"
+        stats["seconds_until_full"] = round((next_month - datetime.now(self.tz)).total_seconds(), 1)
+        return stats
+
+
+# 共有の保存先
+rate_limit_backend = create_rate_limit_backend()
+
+RATE_LIMIT_ENABLED = os.getenv("RATE_LIMIT_ENABLED", "true").lower() not in ("0", "false", "no")
+
+# CoinGecko: 無料枠 50リクエスト/分
+coingecko_limiter = RateLimiter(
+    "coingecko",
+    capacity=int(os.getenv("COINGECKO_RATE_LIMIT_PER_MINUTE", "50")),
+    refill_per_second=int(os.getenv("COINGECKO_RATE_LIMIT_PER_MINUTE", "50")) / 60,
+    enabled=RATE_LIMIT_ENABLED
+)
+
+# バフェット・コード: 暦月（日本時間）ごとのリクエスト数の予算
+# メモリに置くと再起動のたびに満タンに戻り、ワーカーごとに別の予算になって上限を守れないため、
+# RATE_LIMIT_BACKEND に関わらずデフォルトでSQLiteファイルに保存する（BUFFETT_CODE_QUOTA_BACKEND で変更可）。
+# ファイルは最初のリクエスト時に作る
+buffett_code_limiter = MonthlyQuota(
+    "buffett_code_monthly",
+    quota=int(os.getenv("BUFFETT_CODE_MONTHLY_QUOTA", "500")),
+    tz=timezone(timedelta(hours=9)),
+    backend_factory=lambda: create_rate_limit_backend(os.getenv("BUFFETT_CODE_QUOTA_BACKEND", "sqlite")),
+    enabled=RATE_LIMIT_ENABLED
+)
+
+# バフェット・コード: 短時間に集中させないための送信間隔
+buffett_code_pace_limiter = RateLimiter(
+    "buffett_code_pace",
+    capacity=1,
+    refill_per_second=float(os.getenv("BUFFETT_CODE_RATE_LIMIT_PER_SECOND", "1")),
+    enabled=RATE_LIMIT_ENABLED
+)
+
+# Yahoo Finance: 公式の上限はないため、ブロックされないための緩い上限
+yahoo_limiter = RateLimiter(
+    "yahoo_finance",
+    capacity=int(os.getenv("YAHOO_RATE_LIMIT_PER_MINUTE", "120")),
+    refill_per_second=int(os.getenv("YAHOO_RATE_LIMIT_PER_MINUTE", "120")) / 60,
+    enabled=RATE_LIMIT_ENABLED
+)
+
+
+def get_rate_limit_stats() -> Dict[str, Dict[str, Any]]:
+    """
+    全上流APIのレート制限の状態を取得
+
+    Returns:
+        バケット名 -> 状態
+    """
+    return {
+        limiter.name: limiter.get_stats()
+        for limiter in (coingecko_limiter, buffett_code_limiter, buffett_code_pace_limiter, yahoo_limiter)
+    }
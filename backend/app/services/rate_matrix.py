@@ -0,0 +1,119 @@
+"""
+Rate Matrix
+1つの基準通貨建てのレート表から任意の通貨ペアを導出する為替レート行列
+"""
+
+from typing import Dict, List, Optional, Sequence
+import time
+
+import numpy as np
+
+
+class RateMatrix:
+    """
+    為替レート行列
+
+    基準通貨（pivot）1単位あたりの各通貨の量を1本の配列で持ち、
+    クロスレート（例: EUR/JPY = USD/JPY ÷ USD/EUR）はその比で求める。
+    """
+
+    __slots__ = ("pivot", "currencies", "rates", "index", "fetched_at")
+
+    def __init__(self, pivot: str, rates: Dict[str, float], fetched_at: Optional[float] = None):
+        """
+        Args:
+            pivot: 基準通貨
+            rates: 通貨 -> 基準通貨1単位あたりのレート
+            fetched_at: 取得時刻（UNIX秒）
+        """
+        self.pivot = pivot.upper()
+
+        table = {currency.upper(): float(rate) for currency, rate in rates.items() if rate}
+        table[self.pivot] = 1.0
+
+        self.currencies: List[str] = sorted(table)
+        self.rates = np.array([table[currency] for currency in self.currencies], dtype=np.float64)
+        self.index: Dict[str, int] = {currency: i for i, currency in enumerate(self.currencies)}
+        self.fetched_at = fetched_at or time.time()
+
+    def __contains__(self, currency: str) -> bool:
+        return currency.upper() in self.index
+
+    def __len__(self) -> int:
+        return len(self.currencies)
+
+    def rate(self, base_currency: str, target_currency: str) -> Optional[float]:
+        """
+        通貨ペアのレート
+
+        Args:
+            base_currency: 基準通貨
+            target_currency: 対象通貨
+
+        Returns:
+            1 base = rate target、どちらかの通貨がない場合はNone
+        """
+        i = self.index.get(base_currency.upper())
+        j = self.index.get(target_currency.upper())
+        if i is None or j is None:
+            return None
+        return float(self.rates[j] / self.rates[i])
+
+    def rates_to(self, target_currency: str, currencies: Sequence[str]) -> Dict[str, Optional[float]]:
+        """
+        複数通貨から1つの通貨へのレート
+
+        Args:
+            target_currency: 換算先の通貨
+            currencies: 換算元の通貨リスト
+
+        Returns:
+            換算元通貨 -> レート（1 換算元 = rate 換算先、通貨がない場合はNone）
+        """
+        return {currency: self.rate(currency, target_currency) for currency in currencies}
+
+    def cross_table(self, currencies: Optional[Sequence[str]] = None) -> np.ndarray:
+        """
+        クロスレート表
+
+        Args:
+            currencies: 対象通貨（デフォルト: 全通貨）、行列の並び順になる
+
+        Returns:
+            M[i, j] = 1 currencies[i] あたりの currencies[j] の量（通貨がない行・列はNaN）
+        """
+        rates = self._lookup(currencies if currencies is not None else self.currencies)
+        return rates[np.newaxis, :] / rates[:, np.newaxis]
+
+    def convert(
+        self,
+        amounts: Sequence[float],
+        from_currencies: Sequence[str],
+        to_currency: str
+    ) -> np.ndarray:
+        """
+        金額の配列をまとめて換算
+
+        Args:
+            amounts: 金額の配列
+            from_currencies: 各金額の通貨（amounts と同じ長さ）
+            to_currency: 換算先の通貨
+
+        Returns:
+            換算後の金額の配列（通貨がない要素はNaN）
+        """
+        target = self._lookup([to_currency])[0]
+        return np.asarray(amounts, dtype=np.float64) * (target / self._lookup(from_currencies))
+
+    def _lookup(self, currencies: Sequence[str]) -> np.ndarray:
+        """通貨リストに対応する基準通貨建てレート（ない通貨はNaN）"""
+        positions = np.array(
+            [self.index.get(currency.upper(), -1) for currency in currencies],
+            dtype=np.int64
+        )
+        padded = np.append(self.rates, np.nan)
+        return padded[positions]
+
+    def to_dict(self) -> Dict[str, float]:
+        """通貨 -> 基準通貨1単位あたりのレート"""
+        return dict(zip(self.currencies, self.rates.tolist()))
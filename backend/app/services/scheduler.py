@@ -5,14 +5,18 @@ Scheduler Service
 
 from apscheduler.schedulers.asyncio import AsyncIOScheduler
 from apscheduler.triggers.cron import CronTrigger
+from apscheduler.triggers.interval import IntervalTrigger
 from datetime import datetime
+import asyncio
 import logging
-from typing import Optional
+from typing import Dict, Optional
 
 from app.db.database import get_db
 from app.models.favorite import Favorite
 from app.models.company import Company
 from app.services.buffett_code_client import buffett_code_client
+from app.services.cache_service import cache_service
+from app.services.price_store import price_store
 
 # ロガー設定
 logging.basicConfig(level=logging.INFO)
@@ -42,6 +46,24 @@ class SchedulerService:
             replace_existing=True
         )
 
+        # 平日16時半（大引け後）にお気に入り銘柄の日足をストアへ取り込み
+        self.scheduler.add_job(
+            self.update_stock_prices_job,
+            CronTrigger(day_of_week="mon-fri", hour=16, minute=30),
+            id="update_stock_prices",
+            name="日足データ取り込み",
+            replace_existing=True
+        )
+
+        # 1分ごとによく読まれるキャッシュを期限切れ前に更新
+        self.scheduler.add_job(
+            self.refresh_hot_cache_job,
+            IntervalTrigger(seconds=60),
+            id="refresh_hot_cache",
+            name="ホットキャッシュ先回り更新",
+            replace_existing=True
+        )
+
         self.scheduler.start()
         logger.info("Scheduler started successfully")
 
@@ -63,27 +85,27 @@ class SchedulerService:
             db = next(get_db())
 
             # お気に入り銘柄を取得
-            favorites = db.query(Favorite).all()
+            companies = db.query(Company).join(
+                Favorite, Favorite.company_id == Company.id
+            ).distinct().all()
 
-            if not favorites:
+            if not companies:
                 logger.info("No favorite companies found")
                 return
 
             updated_count = 0
             error_count = 0
 
-            for favorite in favorites:
-                try:
-                    company = db.query(Company).filter(
-                        Company.id == favorite.company_id
-                    ).first()
-
-                    if not company:
-                        continue
+            # バフェット・コードAPIから同時実行数を制限して一括取得
+            financial_data_map = await buffett_code_client.get_financial_data_many(
+                [company.stock_code for company in companies]
+            )
 
+            for company in companies:
+                try:
                     # 決算データ更新
-                    success = await self._update_company_financials(
-                        db, company.stock_code
+                    success = self._update_company_financials(
+                        db, company.stock_code, financial_data_map.get(company.stock_code)
                     )
 
                     if success:
@@ -99,7 +121,7 @@ class SchedulerService:
 
                 except Exception as e:
                     error_count += 1
-                    logger.error(f"Error updating company {favorite.company_id}: {e}")
+                    logger.error(f"Error updating company {company.stock_code}: {e}")
                     continue
 
             logger.info(
@@ -110,21 +132,65 @@ class SchedulerService:
         except Exception as e:
             logger.error(f"Financial data update job failed: {e}")
 
-    async def _update_company_financials(self, db, stock_code: str) -> bool:
+    async def update_stock_prices_job(self):
+        """
+        日足データ取り込みジョブ
+        お気に入り銘柄の日足を stock_prices に差分取り込み
+        （yfinance・DBアクセスはブロッキングのためスレッドプールで実行し、APIリクエストを止めない）
+        """
+        await asyncio.to_thread(self._sync_stock_prices)
+
+    def _sync_stock_prices(self):
+        """お気に入り銘柄の日足を差分取り込み（同期）"""
+        logger.info(f"Starting stock price sync job at {datetime.now()}")
+
+        db = next(get_db())
+        try:
+            companies = db.query(Company).join(
+                Favorite, Favorite.company_id == Company.id
+            ).all()
+
+            synced_rows = 0
+            for company in companies:
+                try:
+                    synced_rows += price_store.sync_company(db, company)
+                except Exception as e:
+                    db.rollback()
+                    logger.error(f"Failed to sync stock prices for {company.stock_code}: {e}")
+
+            logger.info(
+                f"Stock price sync job completed. Companies: {len(companies)}, Rows: {synced_rows}"
+            )
+        except Exception as e:
+            logger.error(f"Stock price sync job failed: {e}")
+        finally:
+            db.close()
+
+    async def refresh_hot_cache_job(self):
+        """
+        キャッシュ先回り更新ジョブ
+        直近1分間に3回以上読まれたキーを、期限切れの2分前から再取得する
+        """
+        try:
+            started = await cache_service.refresh_hot_keys(min_hits=3, ahead_seconds=120)
+            if started:
+                logger.info(f"Refreshing {started} hot cache keys")
+        except Exception as e:
+            logger.error(f"Hot cache refresh job failed: {e}")
+
+    def _update_company_financials(self, db, stock_code: str, financial_data: Optional[Dict]) -> bool:
         """
         企業の決算データを更新
 
         Args:
             db: データベースセッション
             stock_code: 銘柄コード
+            financial_data: バフェット・コードAPIから取得した決算データ
 
         Returns:
             成功時True
         """
         try:
-            # バフェット・コードAPIから決算データ取得
-            financial_data = buffett_code_client.get_financial_data(stock_code)
-
             if not financial_data:
                 return False
 
@@ -0,0 +1,167 @@
+"""
+Series Alignment
+取引カレンダーの異なる複数資産の価格系列を共通の日付軸に揃える
+"""
+
+from typing import Any, Dict, List, Optional, Sequence
+from datetime import date
+
+import numpy as np
+
+
+# 共通の日付軸の作り方
+ALIGNMENT_UNION = "union"
+ALIGNMENT_INTERSECTION = "intersection"
+
+
+class AlignedPrices:
+    """
+    日付軸を揃えた価格行列（資産 × 日付）
+
+    共通の日付軸は全資産の日付の和集合（または積集合）で1回だけ作り、
+    取引のない日（土日・各市場の祝日）は直前の価格で前方補完する。
+    最初の取引日より前はNaN。
+    """
+
+    __slots__ = ("dates", "prices", "observed")
+
+    def __init__(self, dates: np.ndarray, prices: np.ndarray, observed: np.ndarray):
+        """
+        Args:
+            dates: 共通の日付軸（1970-01-01からの日数、int32）
+            prices: 前方補完した価格行列（資産 × 日付、float64）
+            observed: 実際に価格がある（補完していない）セルのマスク
+        """
+        self.dates = dates
+        self.prices = prices
+        self.observed = observed
+
+    @classmethod
+    def from_points(
+        cls,
+        point_lists: Sequence[List[Dict[str, Any]]],
+        how: str = ALIGNMENT_UNION,
+        start_date: Optional[date] = None
+    ) -> "AlignedPrices":
+        """
+        資産ごとの [{"date": "YYYY-MM-DD", "price": ...}] から作成
+
+        Args:
+            point_lists: 資産ごとの価格データ（日付昇順）
+            how: "union"（全資産の日付の和集合）または "intersection"（全資産に共通の日付のみ）
+            start_date: 基準日（これより前の列は除く、基準日の価格は直前の価格で補完）
+
+        Returns:
+            AlignedPrices
+        """
+        day_arrays = [
+            np.array([point["date"] for point in points], dtype="datetime64[D]").astype(np.int32)
+            for points in point_lists
+        ]
+        price_arrays = [
+            np.array([point["price"] for point in points], dtype=np.float64)
+            for points in point_lists
+        ]
+
+        if not day_arrays:
+            return cls(np.empty(0, dtype=np.int32), np.empty((0, 0)), np.empty((0, 0), dtype=bool))
+
+        if how == ALIGNMENT_INTERSECTION:
+            calendar = day_arrays[0]
+            for days in day_arrays[1:]:
+                calendar = np.intersect1d(calendar, days)
+            calendar = np.unique(calendar)
+        else:
+            calendar = np.unique(np.concatenate(day_arrays))
+
+        n_assets, n_dates = len(day_arrays), len(calendar)
+        if n_dates == 0:
+            # 共通の日付がない（積集合が空）場合は、全資産とも価格のない空の行列
+            return cls(calendar.astype(np.int32), np.empty((n_assets, 0)), np.empty((n_assets, 0), dtype=bool))
+
+        values = np.full((n_assets, n_dates), np.nan)
+
+        for i, (days, prices) in enumerate(zip(day_arrays, price_arrays)):
+            positions = np.searchsorted(calendar, days)
+            on_calendar = (positions < n_dates) & (calendar[np.minimum(positions, n_dates - 1)] == days)
+            values[i, positions[on_calendar]] = prices[on_calendar]
+
+        observed = ~np.isnan(values)
+
+        # 前方補完（各セルに直前の観測値の列番号を伝播させる）
+        last_seen = np.where(observed, np.arange(n_dates), -1)
+        np.maximum.accumulate(last_seen, axis=1, out=last_seen)
+        filled = np.take_along_axis(values, np.maximum(last_seen, 0), axis=1)
+        filled[last_seen < 0] = np.nan
+
+        if start_date is not None:
+            first = int(np.searchsorted(calendar, np.datetime64(start_date, "D").astype(np.int32)))
+            calendar = calendar[first:]
+            filled = filled[:, first:]
+            observed = observed[:, first:]
+            if first < n_dates:
+                # 基準日の補完値は起点として観測値扱いにする（リターンを基準日から計算するため）
+                observed[:, 0] = ~np.isnan(filled[:, 0])
+
+        return cls(calendar, filled, observed)
+
+    def __len__(self) -> int:
+        return len(self.dates)
+
+    def date_strings(self) -> List[str]:
+        """日付軸を "YYYY-MM-DD" 文字列のリストで取得"""
+        return np.datetime_as_string(self.dates.astype("datetime64[D]"), unit="D").tolist()
+
+    def has_data(self) -> np.ndarray:
+        """資産ごとに日付軸の範囲内に価格があるか"""
+        return (~np.isnan(self.prices)).any(axis=1)
+
+    def first_valid(self) -> np.ndarray:
+        """資産ごとの最初の有効な列番号（価格がない資産は列数）"""
+        valid = ~np.isnan(self.prices)
+        if valid.shape[1] == 0:
+            return np.zeros(valid.shape[0], dtype=np.intp)
+        return np.where(valid.any(axis=1), valid.argmax(axis=1), self.prices.shape[1])
+
+    def normalized(self, base_value: float = 100.0) -> np.ndarray:
+        """
+        各資産の最初の有効な価格を base_value とした正規化行列
+
+        Args:
+            base_value: 基準値
+
+        Returns:
+            正規化された価格行列（基準価格が0の資産は全て base_value）
+        """
+        if self.prices.shape[1] == 0:
+            return self.prices.copy()
+
+        rows = np.arange(self.prices.shape[0])
+        base = self.prices[rows, np.minimum(self.first_valid(), self.prices.shape[1] - 1)]
+
+        with np.errstate(divide="ignore", invalid="ignore"):
+            normalized = self.prices / base[:, np.newaxis] * base_value
+
+        zero_base = base == 0
+        normalized[zero_base] = np.where(np.isnan(self.prices[zero_base]), np.nan, base_value)
+        return normalized
+
+    def observed_matrix(self) -> np.ndarray:
+        """
+        実際に価格がある日だけを左詰めにした行列（メトリクス計算用）
+
+        前方補完した日は含めないため、各資産のリターン・ボラティリティは
+        その資産自身の取引日で計算される（末尾はNaN）。
+
+        Returns:
+            価格行列（資産 × 最大観測数）
+        """
+        observed = self.observed & ~np.isnan(self.prices)
+        order = np.argsort(~observed, axis=1, kind="stable")
+        packed = np.take_along_axis(np.where(observed, self.prices, np.nan), order, axis=1)
+        width = int(observed.sum(axis=1).max()) if observed.size else 0
+        return packed[:, :max(width, 1)] if packed.shape[1] else packed
+
+    def observation_counts(self) -> np.ndarray:
+        """資産ごとの観測数"""
+        return (self.observed & ~np.isnan(self.prices)).sum(axis=1)
@@ -3,17 +3,27 @@ yfinance Client
 Yahoo Finance からの株価データ取得クライアント
 """
 
-import yfinance as yf
-from typing import Dict, List, Optional
-from datetime import datetime, timedelta
-import pandas as pd
+from typing import TYPE_CHECKING, Dict, List, Optional
+from datetime import date, datetime, timedelta
+
+from app.services.price_series import PriceSeries
+from app.services.cache_service import cache_service, CACHE_TTL_STOCK_PRICE
+from app.services.rate_limiter import yahoo_limiter
+
+if TYPE_CHECKING:
+    import pandas as pd
+
+
+# 1回の一括ダウンロードで扱う最大銘柄数
+BATCH_DOWNLOAD_SIZE = 50
 
 
 class YFinanceClient:
     """Yahoo Finance クライアント"""
 
     def __init__(self):
-        pass
+        # 全ワーカーで共有するリクエスト数の緩い上限
+        self.rate_limiter = yahoo_limiter
 
     def _format_symbol(self, symbol: str, asset_type: str = "jp_stock") -> str:
         """
@@ -49,7 +59,7 @@ class YFinanceClient:
         period: str = "1mo",
         interval: str = "1d",
         asset_type: str = "jp_stock"
-    ) -> Optional[pd.DataFrame]:
+    ) -> Optional["pd.DataFrame"]:
         """
         株価データ取得（複数資産対応）
 
@@ -59,14 +69,169 @@ class YFinanceClient:
             interval: 間隔 ("1m", "5m", "1h", "1d", "1wk", "1mo")
             asset_type: 資産クラス (jp_stock, us_stock, crypto, fx)
 
+        Returns:
+            株価データのDataFrame（Open/High/Low/Close/Volume、呼び出しごとに新しいDataFrame）
+        """
+        series = self.get_price_series(stock_code, period, interval, asset_type)
+        return series.to_dataframe() if series is not None else None
+
+    @staticmethod
+    def _history_cache_key(symbol: str, period: str, interval: str) -> str:
+        """フォーマット済みシンボル単位の履歴キャッシュキー"""
+        return f"yf_history:{symbol}:{period}:{interval}"
+
+    def get_stock_data_batch(
+        self,
+        symbols: List[str],
+        period: str = "1mo",
+        interval: str = "1d",
+        asset_type: str = "jp_stock"
+    ) -> Dict[str, PriceSeries]:
+        """
+        複数銘柄の株価データを一括取得
+
+        キャッシュにない銘柄だけを BATCH_DOWNLOAD_SIZE 件ずつ1リクエストでダウンロードし、
+        銘柄ごとに分割してキャッシュする。
+
+        Args:
+            symbols: 銘柄コード/シンボルのリスト
+            period: 期間
+            interval: 間隔
+            asset_type: 資産クラス
+
+        Returns:
+            銘柄コード（入力のまま）-> PriceSeries（読み取り専用）の辞書（取得できなかった銘柄は含まない）
+        """
+        result: Dict[str, PriceSeries] = {}
+        missing: Dict[str, str] = {}  # フォーマット済みシンボル -> 入力シンボル
+
+        for stock_code in dict.fromkeys(symbols):
+            symbol = self._format_symbol(stock_code, asset_type)
+            cached = cache_service.get(self._history_cache_key(symbol, period, interval))
+            if cached is not None:
+                result[stock_code] = cached
+            else:
+                missing[symbol] = stock_code
+
+        pending = list(missing)
+        for i in range(0, len(pending), BATCH_DOWNLOAD_SIZE):
+            chunk = pending[i:i + BATCH_DOWNLOAD_SIZE]
+
+            try:
+                import yfinance as yf
+
+                self.rate_limiter.acquire_sync()
+                data = yf.download(
+                    chunk,
+                    period=period,
+                    interval=interval,
+                    group_by="ticker",
+                    auto_adjust=True,
+                    actions=False,
+                    threads=True,
+                    progress=False
+                )
+            except Exception as e:
+                print(f"yfinance batch download error: {e}")
+                continue
+
+            if data is None or data.empty:
+                continue
+
+            for symbol in chunk:
+                df = self._split_batch_frame(data, symbol, len(chunk))
+                if df is None:
+                    continue
+
+                series = PriceSeries.from_dataframe(df).readonly()
+                cache_service.set(self._history_cache_key(symbol, period, interval), series, CACHE_TTL_STOCK_PRICE)
+                result[missing[symbol]] = series
+
+        return result
+
+    @staticmethod
+    def _split_batch_frame(data: "pd.DataFrame", symbol: str, chunk_size: int) -> Optional["pd.DataFrame"]:
+        """
+        一括ダウンロード結果から1銘柄分のDataFrameを取り出す
+
+        Args:
+            data: yf.download の結果（列は (シンボル, 項目) のMultiIndex）
+            symbol: フォーマット済みシンボル
+            chunk_size: ダウンロードした銘柄数
+
+        Returns:
+            1銘柄分のDataFrame、データがない場合はNone
+        """
+        import pandas as pd
+
+        if isinstance(data.columns, pd.MultiIndex):
+            if symbol not in data.columns.get_level_values(0):
+                return None
+            df = data[symbol]
+        elif chunk_size == 1:
+            df = data
+        else:
+            return None
+
+        # 他銘柄の取引日に合わせて入った空行を除く
+        df = df.dropna(how="all")
+        if df.empty or "Close" not in df.columns:
+            return None
+
+        return df
+
+    def get_current_prices(
+        self,
+        symbols: List[str],
+        asset_type: str = "jp_stock"
+    ) -> Dict[str, Optional[float]]:
+        """
+        複数銘柄の現在価格を一括取得
+
+        Args:
+            symbols: 銘柄コード/シンボルのリスト
+            asset_type: 資産クラス
+
+        Returns:
+            銘柄コード -> 現在価格（取得できない場合はNone）
+        """
+        # 休場日を挟んでも直近終値が取れるよう5日分を取得
+        series_map = self.get_stock_data_batch(symbols, period="5d", interval="1d", asset_type=asset_type)
+
+        prices: Dict[str, Optional[float]] = {}
+        for symbol in symbols:
+            series = series_map.get(symbol)
+            prices[symbol] = series.last_close() if series is not None else None
+
+        return prices
+
+    def get_stock_data_since(
+        self,
+        stock_code: str,
+        start: date,
+        interval: str = "1d",
+        asset_type: str = "jp_stock"
+    ) -> Optional["pd.DataFrame"]:
+        """
+        指定日以降の株価データ取得（差分取得用）
+
+        Args:
+            stock_code: 銘柄コード
+            start: 開始日（この日を含む）
+            interval: 間隔
+            asset_type: 資産クラス
+
         Returns:
             株価データのDataFrame
         """
         try:
+            import yfinance as yf
+
             symbol = self._format_symbol(stock_code, asset_type)
 
+            self.rate_limiter.acquire_sync()
             ticker = yf.Ticker(symbol)
-            data = ticker.history(period=period, interval=interval)
+            data = ticker.history(start=start.isoformat(), interval=interval)
 
             if data.empty:
                 return None
@@ -92,7 +257,10 @@ class YFinanceClient:
             現在価格
         """
         try:
+            import yfinance as yf
+
             formatted_symbol = self._format_symbol(symbol, asset_type)
+            self.rate_limiter.acquire_sync()
             ticker = yf.Ticker(formatted_symbol)
 
             # 最新データを取得
@@ -116,7 +284,10 @@ class YFinanceClient:
             企業情報のDict
         """
         try:
+            import yfinance as yf
+
             symbol = f"{stock_code}.T" if not stock_code.endswith(".T") else stock_code
+            self.rate_limiter.acquire_sync()
             ticker = yf.Ticker(symbol)
             info = ticker.info
             return info
@@ -124,6 +295,52 @@ class YFinanceClient:
             print(f"yfinance info error: {e}")
             return None
 
+    def get_price_series(
+        self,
+        stock_code: str,
+        period: str = "1mo",
+        interval: str = "1d",
+        asset_type: str = "jp_stock"
+    ) -> Optional[PriceSeries]:
+        """
+        株価データを列指向のPriceSeriesで取得
+
+        キャッシュには取得したDataFrameではなく、OHLCVだけを持つ読み取り専用の
+        PriceSeries を保存する（配当・分割列などを保持せず、呼び出し側と共有しても書き換えられない）。
+
+        Args:
+            stock_code: 銘柄コード
+            period: 期間
+            interval: 間隔
+            asset_type: 資産クラス
+
+        Returns:
+            PriceSeries（読み取り専用）、取得できない場合はNone
+        """
+        try:
+            import yfinance as yf
+
+            symbol = self._format_symbol(stock_code, asset_type)
+
+            cache_key = self._history_cache_key(symbol, period, interval)
+            cached = cache_service.get(cache_key)
+            if cached is not None:
+                return cached
+
+            self.rate_limiter.acquire_sync()
+            ticker = yf.Ticker(symbol)
+            data = ticker.history(period=period, interval=interval)
+
+            if data.empty:
+                return None
+
+            series = PriceSeries.from_dataframe(data).readonly()
+            cache_service.set(cache_key, series, CACHE_TTL_STOCK_PRICE)
+            return series
+        except Exception as e:
+            print(f"yfinance error: {e}")
+            return None
+
     def get_stock_data_dict(
         self,
         stock_code: str,
@@ -139,24 +356,12 @@ class YFinanceClient:
         Returns:
             株価データのリスト
         """
-        df = self.get_stock_data(stock_code, period)
+        series = self.get_price_series(stock_code, period)
 
-        if df is None or df.empty:
+        if series is None:
             return []
 
-        # DataFrameを辞書のリストに変換
-        result = []
-        for index, row in df.iterrows():
-            result.append({
-                "date": index.strftime("%Y-%m-%d"),
-                "open": float(row["Open"]),
-                "high": float(row["High"]),
-                "low": float(row["Low"]),
-                "close": float(row["Close"]),
-                "volume": int(row["Volume"])
-            })
-
-        return result
+        return series.to_records()
 
 
 # Singleton instance
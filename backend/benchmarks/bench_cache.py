@@ -0,0 +1,61 @@
+"""
+CacheService benchmarks
+"""
+
+import threading
+
+from benchmarks.harness import Benchmark
+from app.services.cache_service import CacheService
+
+
+def _get_hit():
+    cache = CacheService(max_entries=4096)
+    cache.set("stock_prices:7203:1y", {"data": list(range(100))}, 900)
+    return lambda: cache.get("stock_prices:7203:1y")
+
+
+def _set_rotating():
+    cache = CacheService(max_entries=1024)
+    keys = [f"stock_prices:{code}:1y" for code in range(2048)]
+    value = {"data": list(range(100))}
+    state = {"i": 0}
+
+    def run():
+        state["i"] = (state["i"] + 1) % len(keys)
+        cache.set(keys[state["i"]], value, 900)
+
+    return run
+
+
+def _contention(threads: int = 8, ops: int = 2000):
+    def setup():
+        cache = CacheService(max_entries=1024)
+        value = {"data": list(range(100))}
+        keys = [f"stock_prices:{code}:1y" for code in range(1800)]
+
+        def worker(offset: int, barrier: threading.Barrier):
+            barrier.wait()
+            for i in range(ops):
+                key = keys[(offset * 7919 + i) % len(keys)]
+                # 読み取り9割・書き込み1割
+                if i % 10 == 0 or cache.get(key) is None:
+                    cache.set(key, value, 900)
+
+        def run():
+            barrier = threading.Barrier(threads)
+            workers = [threading.Thread(target=worker, args=(n, barrier)) for n in range(threads)]
+            for t in workers:
+                t.start()
+            for t in workers:
+                t.join()
+
+        return run
+
+    return setup
+
+
+BENCHMARKS = [
+    Benchmark("cache.get_hit", _get_hit, number=10000),
+    Benchmark("cache.set_with_eviction", _set_rotating, number=10000),
+    Benchmark("cache.contention_8_threads_x2000_ops", _contention(8, 2000), number=1),
+]
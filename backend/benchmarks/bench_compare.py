@@ -0,0 +1,42 @@
+"""
+compare_assets end-to-end benchmarks
+"""
+
+import asyncio
+
+from benchmarks.harness import Benchmark
+from benchmarks.stubs import sqlite_session_factory
+from app.api import compare
+from app.schemas.compare import CompareRequest
+from app.services.cache_service import cache_service
+
+
+def _compare(period: str):
+    def setup():
+        compare.SessionLocal = sqlite_session_factory()
+        request = CompareRequest(
+            assets=[
+                {"symbol": "7203", "asset_type": "jp_stock"},
+                {"symbol": "6758", "asset_type": "jp_stock"},
+                {"symbol": "AAPL", "asset_type": "us_stock"},
+                {"symbol": "MSFT", "asset_type": "us_stock"},
+                {"symbol": "BTC", "asset_type": "crypto"},
+                {"symbol": "USD/JPY", "asset_type": "fx"},
+            ],
+            period=period
+        )
+
+        def run():
+            # 毎回キャッシュを空にしてパイプライン全体を計測する
+            cache_service.clear()
+            asyncio.run(compare.compare_assets(request))
+
+        return run
+
+    return setup
+
+
+BENCHMARKS = [
+    Benchmark("compare.compare_assets.6_assets_1y", _compare("1y"), number=5),
+    Benchmark("compare.compare_assets.6_assets_5y", _compare("5y"), number=5),
+]
@@ -0,0 +1,32 @@
+"""
+PerformanceCalculator benchmarks
+"""
+
+from benchmarks.harness import Benchmark
+from benchmarks.stubs import PERIOD_BARS, synthetic_prices
+from app.services.performance_calculator import performance_calculator
+
+
+def _metrics(period: str):
+    def setup():
+        prices = synthetic_prices(PERIOD_BARS[period], seed=1).tolist()
+        return lambda: performance_calculator.calculate_metrics(prices)
+
+    return setup
+
+
+def _metrics_matrix():
+    prices = [synthetic_prices(PERIOD_BARS["5y"], seed=i) for i in range(10)]
+
+    def run():
+        performance_calculator.calculate_metrics_batch(prices)
+
+    return run
+
+
+BENCHMARKS = [
+    Benchmark("performance.calculate_metrics.1y", _metrics("1y"), number=100),
+    Benchmark("performance.calculate_metrics.5y", _metrics("5y"), number=100),
+    Benchmark("performance.calculate_metrics.max", _metrics("max"), number=100),
+    Benchmark("performance.calculate_metrics_batch.10_assets_5y", _metrics_matrix, number=100),
+]
@@ -0,0 +1,120 @@
+"""
+RAG indexing benchmarks
+"""
+
+from benchmarks.harness import Benchmark
+from benchmarks.stubs import sqlite_session_factory
+from app.models.company import Company
+from app.models.financial_data import FinancialData
+
+
+def _seed_company():
+    db, companies = _seed_companies(1)
+    return db, companies[0]
+
+
+def _seed_companies(count: int):
+    SessionLocal = sqlite_session_factory()
+    db = SessionLocal()
+
+    companies = []
+    for n in range(count):
+        company = Company(
+            stock_code=str(7203 + n),
+            name=f"テスト企業{n}",
+            industry="輸送用機器",
+            description="自動車メーカー"
+        )
+        db.add(company)
+        db.flush()
+        companies.append(company)
+        _seed_financials(db, company)
+
+    db.commit()
+    return db, companies
+
+
+def _seed_financials(db, company):
+    for year in range(2015, 2025):
+        db.add(FinancialData(
+            company_id=company.id,
+            fiscal_year=year,
+            revenue=30_000_000_000_000 + year,
+            operating_profit=3_000_000_000_000,
+            ordinary_profit=3_500_000_000_000,
+            net_profit=2_500_000_000_000,
+            total_assets=70_000_000_000_000,
+            equity=30_000_000_000_000,
+            total_liabilities=40_000_000_000_000,
+            current_assets=25_000_000_000_000,
+            current_liabilities=20_000_000_000_000
+        ))
+
+
+def _create_document_chunks():
+    from app.rag.data_processor import data_processor
+
+    db, company = _seed_company()
+    return lambda: data_processor.create_document_chunks(db, company)
+
+
+def _add_documents():
+    from app.rag.data_processor import data_processor
+    from app.rag.embedding import embedding_service
+
+    db, company = _seed_company()
+    chunks = data_processor.create_document_chunks(db, company)
+
+    def run():
+        embedding_service.delete_company_data(company.stock_code)
+        embedding_service.add_documents(chunks, company.stock_code)
+
+    return run
+
+
+def _add_documents_bulk():
+    from app.rag.data_processor import data_processor
+    from app.rag.embedding import embedding_service
+
+    db, companies = _seed_companies(50)
+    chunks_by_company = {
+        company.stock_code: data_processor.create_document_chunks(db, company)
+        for company in companies
+    }
+
+    def run():
+        embedding_service.delete_companies_data(list(chunks_by_company))
+        embedding_service.add_documents_bulk(chunks_by_company)
+
+    return run
+
+
+def _search_similar(repeated: bool):
+    def setup():
+        from app.rag.embedding import embedding_service
+        from app.rag.query_cache import query_embedding_cache
+
+        questions = ["トヨタのROEは?", "自己資本比率の推移", "営業利益率は?"]
+        counter = iter(range(10 ** 9))
+
+        def run():
+            if repeated:
+                question = questions[next(counter) % len(questions)]
+            else:
+                # 毎回異なる質問（キャッシュに当たらない）
+                question = f"{questions[0]} {next(counter)}"
+            embedding_service.search_similar(question, n_results=5)
+
+        query_embedding_cache.clear()
+        return run
+
+    return setup
+
+
+BENCHMARKS = [
+    Benchmark("rag.create_document_chunks", _create_document_chunks, number=20),
+    Benchmark("rag.add_documents.1_company", _add_documents, number=20),
+    Benchmark("rag.add_documents_bulk.50_companies", _add_documents_bulk, number=5),
+    Benchmark("rag.search_similar.unique_query", _search_similar(repeated=False), number=200),
+    Benchmark("rag.search_similar.repeated_query", _search_similar(repeated=True), number=200),
+]
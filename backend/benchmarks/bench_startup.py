@@ -0,0 +1,76 @@
+"""
+API cold-start benchmarks
+"""
+
+from typing import Dict, List
+import os
+import subprocess
+import sys
+
+from benchmarks.harness import Benchmark
+
+
+BACKEND_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+
+# 起動時（app.main のインポート時）に読み込まれてはいけない重いモジュール
+HEAVY_MODULES = (
+    "yfinance",
+    "pandas",
+    "chromadb",
+    "sentence_transformers",
+    "torch",
+    "langchain_community",
+)
+
+
+def import_times(module: str) -> Dict[str, int]:
+    """
+    新しいプロセスで module をインポートし、-X importtime の結果を返す
+
+    スタブを入れていない素のプロセスで計測するため、実際の起動時と同じモジュールが読み込まれる。
+
+    Args:
+        module: インポートするモジュール
+
+    Returns:
+        モジュール名 -> 累積インポート時間（マイクロ秒）
+    """
+    env = dict(os.environ, PYTHONPATH=BACKEND_DIR)
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=BACKEND_DIR,
+        env=env,
+        capture_output=True,
+        text=True
+    )
+    if result.returncode != 0:
+        raise RuntimeError(f"import {module} failed:\n{result.stderr[-2000:]}")
+
+    times: Dict[str, int] = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:"):
+            continue
+        _, cumulative, name = line[len("import time:"):].split("|")
+        if cumulative.strip().isdigit():
+            times[name.strip()] = int(cumulative)
+    return times
+
+
+def heavy_imports(times: Dict[str, int]) -> List[str]:
+    """起動時に読み込まれた重いモジュール"""
+    return [name for name in HEAVY_MODULES if name in times]
+
+
+def _import_app_main():
+    def run():
+        # 重いモジュールが起動時に読み込まれるようになったら退行として失敗させる
+        loaded = heavy_imports(import_times("app.main"))
+        if loaded:
+            raise RuntimeError(f"app.main imports heavy modules at startup: {', '.join(loaded)}")
+
+    return run
+
+
+BENCHMARKS = [
+    Benchmark("startup.import_app_main", _import_app_main, number=1, repeat=3),
+]
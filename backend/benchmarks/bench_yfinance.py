@@ -0,0 +1,22 @@
+"""
+YFinanceClient benchmarks
+"""
+
+from benchmarks.harness import Benchmark
+from app.services.yfinance_client import yfinance_client
+
+
+def _stock_data_dict(period: str):
+    def setup():
+        # 1回目で合成DataFrameがキャッシュされ、以降は変換処理のみを計測する
+        yfinance_client.get_stock_data_dict("7203", period)
+        return lambda: yfinance_client.get_stock_data_dict("7203", period)
+
+    return setup
+
+
+BENCHMARKS = [
+    Benchmark("yfinance.get_stock_data_dict.1y", _stock_data_dict("1y"), number=20),
+    Benchmark("yfinance.get_stock_data_dict.5y", _stock_data_dict("5y"), number=20),
+    Benchmark("yfinance.get_stock_data_dict.max", _stock_data_dict("max"), number=10),
+]
@@ -0,0 +1,125 @@
+"""
+Benchmark Harness
+計測ループとJSON出力
+"""
+
+from typing import Callable, Dict, List, Optional
+import json
+import platform
+import statistics
+import subprocess
+import sys
+import time
+from datetime import datetime, timezone
+
+
+class Benchmark:
+    """ベンチマーク定義"""
+
+    def __init__(
+        self,
+        name: str,
+        setup: Callable[[], Callable[[], object]],
+        number: int = 1,
+        repeat: int = 5
+    ):
+        """
+        Args:
+            name: ベンチマーク名（"group.case" 形式）
+            setup: 計測対象の関数を返すセットアップ関数（セットアップ時間は計測しない）
+            number: 1回の計測で対象を呼ぶ回数
+            repeat: 計測の繰り返し回数
+        """
+        self.name = name
+        self.setup = setup
+        self.number = number
+        self.repeat = repeat
+
+    def run(self) -> Dict:
+        """
+        計測を実行
+
+        Returns:
+            1呼び出しあたりの秒数の統計
+        """
+        func = self.setup()
+
+        # ウォームアップ（初回のみのインポート・キャッシュ生成を除外）
+        func()
+
+        timings: List[float] = []
+        for _ in range(self.repeat):
+            start = time.perf_counter()
+            for _ in range(self.number):
+                func()
+            timings.append((time.perf_counter() - start) / self.number)
+
+        return {
+            "number": self.number,
+            "repeat": self.repeat,
+            "min": min(timings),
+            "median": statistics.median(timings),
+            "mean": statistics.fmean(timings),
+            "stdev": statistics.stdev(timings) if len(timings) > 1 else 0.0
+        }
+
+
+def _git_revision() -> Optional[str]:
+    """現在のコミットハッシュ"""
+    try:
+        return subprocess.check_output(
+            ["git", "rev-parse", "HEAD"],
+            stderr=subprocess.DEVNULL,
+            text=True
+        ).strip()
+    except Exception:
+        return None
+
+
+def run_benchmarks(benchmarks: List[Benchmark], pattern: Optional[str] = None) -> Dict:
+    """
+    ベンチマークを実行して結果をまとめる
+
+    Args:
+        benchmarks: ベンチマークリスト
+        pattern: 名前の部分一致フィルタ
+
+    Returns:
+        メタ情報と結果の辞書
+    """
+    results = {}
+    for benchmark in benchmarks:
+        if pattern and pattern not in benchmark.name:
+            continue
+
+        print(f"running {benchmark.name} ...", file=sys.stderr)
+        results[benchmark.name] = benchmark.run()
+        print(f"  median {results[benchmark.name]['median'] * 1000:.3f} ms", file=sys.stderr)
+
+    return {
+        "meta": {
+            "timestamp": datetime.now(timezone.utc).isoformat(),
+            "git_revision": _git_revision(),
+            "python": sys.version.split()[0],
+            "platform": platform.platform(),
+            "unit": "seconds per call"
+        },
+        "results": results
+    }
+
+
+def write_results(results: Dict, output: Optional[str]) -> None:
+    """
+    結果をJSONで出力
+
+    Args:
+        results: run_benchmarks の結果
+        output: 出力ファイルパス（Noneの場合は標準出力）
+    """
+    text = json.dumps(results, indent=2, ensure_ascii=False)
+
+    if output:
+        with open(output, "w", encoding="utf-8") as f:
+            f.write(text + "\n")
+    else:
+        print(text)
@@ -0,0 +1,49 @@
+"""
+Benchmark runner
+
+Usage (from backend/):
+    python -m benchmarks.run [--filter NAME] [--output results.json]
+"""
+
+import argparse
+import os
+import sys
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from benchmarks.stubs import install_module_stubs, install_upstream_stubs  # noqa: E402
+from benchmarks.harness import run_benchmarks, write_results  # noqa: E402
+
+
+def collect_benchmarks():
+    """全ベンチマークを収集（スタブ適用後にインポートする）"""
+    from benchmarks import bench_cache, bench_performance, bench_yfinance, bench_compare, bench_rag, bench_startup
+
+    return (
+        bench_cache.BENCHMARKS
+        + bench_performance.BENCHMARKS
+        + bench_yfinance.BENCHMARKS
+        + bench_compare.BENCHMARKS
+        + bench_rag.BENCHMARKS
+        + bench_startup.BENCHMARKS
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description="A1-PRO backend benchmarks")
+    parser.add_argument("--filter", help="ベンチマーク名の部分一致フィルタ")
+    parser.add_argument("--output", help="結果JSONの出力先（省略時は標準出力）")
+    args = parser.parse_args()
+
+    # 外部サービス・モデルを使わずオフラインで実行する
+    os.environ.setdefault("CACHE_BACKEND", "memory")
+    os.environ.setdefault("RATE_LIMIT_ENABLED", "false")
+    install_module_stubs()
+    install_upstream_stubs()
+
+    results = run_benchmarks(collect_benchmarks(), args.filter)
+    write_results(results, args.output)
+
+
+if __name__ == "__main__":
+    main()
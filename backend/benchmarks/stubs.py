@@ -0,0 +1,315 @@
+"""
+Benchmark Stubs
+オフライン実行用の合成データと外部サービスの代替実装
+
+Yahoo Finance / CoinGecko / 為替 / バフェット・コード / Ollama と
+埋め込みモデル・ChromaDBを、決定的な合成データを返すローカル実装に置き換える。
+"""
+
+from typing import Dict, List, Optional
+import sys
+import types
+import zlib
+
+import numpy as np
+import pandas as pd
+
+
+# 期間 -> 営業日数
+PERIOD_BARS: Dict[str, int] = {
+    "1d": 1,
+    "5d": 5,
+    "1mo": 21,
+    "3mo": 63,
+    "6mo": 126,
+    "1y": 252,
+    "2y": 504,
+    "5y": 1260,
+    "10y": 2520,
+    "max": 5000,
+}
+
+EMBEDDING_DIM = 384
+
+
+def _seed(*parts: object) -> int:
+    return zlib.crc32("|".join(str(p) for p in parts).encode("utf-8"))
+
+
+def synthetic_prices(n: int, seed: int = 0, start: float = 1000.0) -> np.ndarray:
+    """幾何ランダムウォークの終値系列"""
+    rng = np.random.default_rng(seed)
+    return start * np.cumprod(1 + rng.normal(0.0003, 0.015, n))
+
+
+def synthetic_ohlcv(n: int, seed: int = 0, tz: Optional[str] = "Asia/Tokyo") -> pd.DataFrame:
+    """
+    yfinanceの history() と同じ形のOHLCV DataFrame
+
+    Args:
+        n: 営業日数
+        seed: 乱数シード
+        tz: インデックスのタイムゾーン
+
+    Returns:
+        DataFrame（Open/High/Low/Close/Volume）
+    """
+    close = synthetic_prices(n, seed)
+    rng = np.random.default_rng(seed + 1)
+    index = pd.bdate_range(end=pd.Timestamp("2026-10-16"), periods=n, tz=tz)
+
+    return pd.DataFrame(
+        {
+            "Open": close * (1 + rng.normal(0, 0.003, n)),
+            "High": close * (1 + np.abs(rng.normal(0, 0.01, n))),
+            "Low": close * (1 - np.abs(rng.normal(0, 0.01, n))),
+            "Close": close,
+            "Volume": rng.integers(100_000, 10_000_000, n),
+        },
+        index=index,
+    )
+
+
+class FakeTicker:
+    """yf.Ticker の代替"""
+
+    def __init__(self, symbol: str):
+        self.symbol = symbol
+
+    def history(self, period: str = "1mo", interval: str = "1d", start=None, end=None, **kwargs) -> pd.DataFrame:
+        n = PERIOD_BARS.get(period, 252) if start is None else 5
+        return synthetic_ohlcv(n, _seed(self.symbol))
+
+    @property
+    def info(self) -> Dict:
+        return {"symbol": self.symbol}
+
+
+def fake_download(tickers, period: str = "1mo", interval: str = "1d", **kwargs) -> pd.DataFrame:
+    """yf.download(group_by="ticker") の代替"""
+    symbols = [tickers] if isinstance(tickers, str) else list(tickers)
+    n = PERIOD_BARS.get(period, 252)
+    frames = {symbol: synthetic_ohlcv(n, _seed(symbol)) for symbol in symbols}
+    return pd.concat(frames, axis=1)
+
+
+async def fake_crypto_history(crypto_id: str, vs_currency: str = "usd", days: int = 30) -> List[Dict]:
+    """CoinGecko market_chart の代替（暦日ベース）"""
+    prices = synthetic_prices(days + 1, _seed(crypto_id), start=30000.0)
+    dates = pd.date_range(end=pd.Timestamp("2026-10-16"), periods=days + 1, freq="D")
+    return [
+        {"date": date, "price": price}
+        for date, price in zip(dates.strftime("%Y-%m-%d").tolist(), prices.tolist())
+    ]
+
+
+async def fake_fx_history(base_currency: str, target_currency: str, days: int = 30) -> List[Dict]:
+    """為替履歴の代替（平日ベース）"""
+    n = max(days * 5 // 7, 1)
+    rates = synthetic_prices(n, _seed(base_currency, target_currency), start=150.0)
+    dates = pd.bdate_range(end=pd.Timestamp("2026-10-16"), periods=n)
+    return [
+        {"date": date, "rate": rate}
+        for date, rate in zip(dates.strftime("%Y-%m-%d").tolist(), rates.tolist())
+    ]
+
+
+async def fake_buffett_financial_data(stock_code: str, fiscal_year: Optional[int] = None) -> Dict:
+    """バフェット・コード /quarter の代替"""
+    rng = np.random.default_rng(_seed(stock_code))
+    return {
+        "data": [
+            {
+                "fiscal_year": 2016 + i,
+                "fiscal_quarter": 0,
+                "net_sales": int(rng.integers(10**11, 10**13)),
+                "operating_income": int(rng.integers(10**10, 10**12)),
+            }
+            for i in range(10)
+        ]
+    }
+
+
+class FakeSentenceTransformer:
+    """
+    SentenceTransformer の代替
+
+    呼び出しごとの固定コスト（モデル起動相当）と1文ごとのコストを持ち、
+    バッチ化の効果が計測に現れるようにしている。
+    """
+
+    def __init__(self, model_name: str = "", *args, **kwargs):
+        self.model_name = model_name
+        rng = np.random.default_rng(0)
+        self._weights = rng.standard_normal((EMBEDDING_DIM, EMBEDDING_DIM)).astype(np.float32)
+
+    def encode(self, sentences, batch_size: int = 32, normalize_embeddings: bool = False, **kwargs):
+        single = isinstance(sentences, str)
+        texts = [sentences] if single else list(sentences)
+
+        # 呼び出しごとの固定コスト
+        self._weights @ self._weights
+
+        vectors = np.stack([
+            np.random.default_rng(_seed(text)).standard_normal(EMBEDDING_DIM).astype(np.float32)
+            for text in texts
+        ]) if texts else np.empty((0, EMBEDDING_DIM), dtype=np.float32)
+        vectors = vectors @ self._weights
+
+        if normalize_embeddings:
+            vectors /= np.linalg.norm(vectors, axis=1, keepdims=True)
+
+        return vectors[0] if single else vectors
+
+
+def _matches(metadata: Dict, where: Dict) -> bool:
+    """ChromaDB の where 条件（等価・$in）を評価"""
+    return all(
+        metadata.get(k) in v["$in"] if isinstance(v, dict) else metadata.get(k) == v
+        for k, v in where.items()
+    )
+
+
+class FakeCollection:
+    """ChromaDB Collection の代替"""
+
+    def __init__(self, name: str, metadata: Optional[Dict] = None):
+        self.name = name
+        self.metadata = metadata
+        self._items: Dict[str, Dict] = {}
+
+    def add(self, ids, embeddings=None, documents=None, metadatas=None):
+        for i, item_id in enumerate(ids):
+            self._items[item_id] = {
+                "embedding": embeddings[i] if embeddings is not None else None,
+                "document": documents[i] if documents is not None else None,
+                "metadata": metadatas[i] if metadatas is not None else None,
+            }
+
+    def query(self, query_embeddings, n_results: int = 5, where: Optional[Dict] = None):
+        items = [
+            item for item in self._items.values()
+            if not where or _matches(item["metadata"] or {}, where)
+        ][:n_results]
+        return {
+            "ids": [[str(i) for i in range(len(items))]],
+            "documents": [[item["document"] for item in items]],
+            "metadatas": [[item["metadata"] for item in items]],
+            "distances": [[0.0 for _ in items]],
+        }
+
+    def delete(self, where: Optional[Dict] = None, ids=None):
+        for key in list(self._items):
+            metadata = self._items[key]["metadata"] or {}
+            if (ids and key in ids) or (where and _matches(metadata, where)):
+                del self._items[key]
+
+    def count(self) -> int:
+        return len(self._items)
+
+
+class FakeChromaClient:
+    """chromadb.Client / PersistentClient の代替"""
+
+    def __init__(self, *args, **kwargs):
+        self._collections: Dict[str, FakeCollection] = {}
+
+    def get_collection(self, name: str) -> FakeCollection:
+        if name not in self._collections:
+            raise ValueError(f"Collection {name} does not exist")
+        return self._collections[name]
+
+    def create_collection(self, name: str, metadata: Optional[Dict] = None) -> FakeCollection:
+        self._collections[name] = FakeCollection(name, metadata)
+        return self._collections[name]
+
+    def get_or_create_collection(self, name: str, metadata: Optional[Dict] = None) -> FakeCollection:
+        return self._collections.get(name) or self.create_collection(name, metadata)
+
+    def delete_collection(self, name: str) -> None:
+        self._collections.pop(name, None)
+
+
+class FakeOllama:
+    """langchain_community.llms.Ollama の代替"""
+
+    def __init__(self, *args, **kwargs):
+        pass
+
+    def invoke(self, prompt: str) -> str:
+        return f"回答（{len(prompt)}文字のプロンプト）"
+
+    async def ainvoke(self, prompt: str) -> str:
+        return self.invoke(prompt)
+
+
+def install_module_stubs() -> None:
+    """
+    埋め込みモデル・ChromaDB・Ollamaのモジュールを代替実装に差し替える
+
+    app.rag 以下をインポートする前に呼ぶこと。
+    """
+    sentence_transformers = types.ModuleType("sentence_transformers")
+    sentence_transformers.SentenceTransformer = FakeSentenceTransformer
+
+    chromadb = types.ModuleType("chromadb")
+    chromadb.Client = FakeChromaClient
+    chromadb.PersistentClient = FakeChromaClient
+    chromadb_config = types.ModuleType("chromadb.config")
+    chromadb_config.Settings = lambda **kwargs: kwargs
+    chromadb.config = chromadb_config
+
+    langchain_community = types.ModuleType("langchain_community")
+    langchain_llms = types.ModuleType("langchain_community.llms")
+    langchain_llms.Ollama = FakeOllama
+    langchain_community.llms = langchain_llms
+
+    sys.modules.update({
+        "sentence_transformers": sentence_transformers,
+        "chromadb": chromadb,
+        "chromadb.config": chromadb_config,
+        "langchain_community": langchain_community,
+        "langchain_community.llms": langchain_llms,
+    })
+
+
+def sqlite_session_factory():
+    """
+    全テーブルを作成したインメモリSQLiteのセッションファクトリ
+
+    Returns:
+        sessionmaker
+    """
+    from sqlalchemy import create_engine
+    from sqlalchemy.orm import sessionmaker
+    from sqlalchemy.pool import StaticPool
+
+    from app.db.database import Base
+    import app.models.company  # noqa: F401
+    import app.models.favorite  # noqa: F401
+    import app.models.financial_data  # noqa: F401
+    import app.models.portfolio  # noqa: F401
+    import app.models.stock_price  # noqa: F401
+
+    engine = create_engine(
+        "sqlite://",
+        connect_args={"check_same_thread": False},
+        poolclass=StaticPool
+    )
+    Base.metadata.create_all(engine)
+    return sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+
+def install_upstream_stubs() -> None:
+    """Yahoo Finance・CoinGecko・為替・バフェット・コードのクライアントを代替実装に差し替える"""
+    import yfinance as yf
+
+    from app.services.crypto_client import crypto_client
+    from app.services.exchange_rate_client import exchange_rate_client
+    from app.services.buffett_code_client import buffett_code_client
+
+    yf.Ticker = FakeTicker
+    yf.download = fake_download
+    crypto_client.get_historical_data = fake_crypto_history
+    exchange_rate_client.get_historical_rates = fake_fx_history
+    buffett_code_client.get_financial_data = fake_buffett_financial_data
@@ -6,46 +6,18 @@ import sys
 import os
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 
-import requests
-import time
 from sqlalchemy.orm import Session
 from app.db.database import SessionLocal
 from app.models.company import Company
 from app.models.financial_data import FinancialData
+from app.services.buffett_code_client import buffett_code_client, BUFFETT_CODE_CONCURRENCY
 from datetime import datetime
 
 # 環境変数からAPIキーを取得
 BUFFETT_CODE_API_KEY = os.getenv('BUFFETT_CODE_API_KEY', '')
-BASE_URL = "https://api.buffett-code.com/api/v3"
 
-def fetch_company_financials(stock_code: str, api_key: str):
-    """
-    バフェット・コードAPIから決算データを取得
-    """
-    if not api_key:
-        print("警告: BUFFETT_CODE_API_KEY が設定されていません")
-        return None
-
-    url = f"{BASE_URL}/quarter"
-    headers = {"x-api-key": api_key}
-    params = {"ticker": stock_code}
-
-    try:
-        response = requests.get(url, headers=headers, params=params, timeout=10)
-
-        if response.status_code == 200:
-            data = response.json()
-            return data
-        elif response.status_code == 404:
-            print(f"  銘柄 {stock_code}: データなし")
-            return None
-        else:
-            print(f"  エラー {response.status_code}: {stock_code}")
-            return None
-
-    except Exception as e:
-        print(f"  例外発生 {stock_code}: {e}")
-        return None
+# 一度に同時取得する企業数（取得したまとまりごとに登録・コミットする）
+FETCH_CHUNK_SIZE = int(os.getenv('BUFFETT_CODE_FETCH_CHUNK_SIZE', str(BUFFETT_CODE_CONCURRENCY * 2)))
 
 def insert_financial_data(db: Session, company: Company, financial_json: dict):
     """
@@ -123,28 +95,31 @@ def main():
         success_count = 0
         fail_count = 0
 
-        for index, company in enumerate(companies, 1):
-            print(f"[{index}/{len(companies)}] {company.stock_code} {company.name}")
-
-            # APIリクエスト
-            financial_json = fetch_company_financials(company.stock_code, BUFFETT_CODE_API_KEY)
-
-            if financial_json:
-                # データ登録
-                inserted = insert_financial_data(db, company, financial_json)
-                if inserted > 0:
-                    db.commit()
-                    total_inserted += inserted
-                    success_count += 1
-                    print(f"  ✓ {inserted}年分のデータを登録")
+        # APIリクエスト（共有の接続プールで同時実行数を制限して取得し、
+        # まとまりごとに登録・コミットする。途中で失敗してもそれまでの結果は残る）
+        for start in range(0, len(companies), FETCH_CHUNK_SIZE):
+            chunk = companies[start:start + FETCH_CHUNK_SIZE]
+            financial_map = buffett_code_client.get_financial_data_many_sync(
+                [company.stock_code for company in chunk]
+            )
+
+            for index, company in enumerate(chunk, start + 1):
+                print(f"[{index}/{len(companies)}] {company.stock_code} {company.name}")
+
+                financial_json = financial_map.get(company.stock_code)
+
+                if financial_json:
+                    # データ登録
+                    inserted = insert_financial_data(db, company, financial_json)
+                    if inserted > 0:
+                        db.commit()
+                        total_inserted += inserted
+                        success_count += 1
+                        print(f"  ✓ {inserted}年分のデータを登録")
+                    else:
+                        print(f"  - データなし")
                 else:
-                    print(f"  - データなし")
-            else:
-                fail_count += 1
-
-            # API制限対策: 1秒待機
-            if index < len(companies):
-                time.sleep(1)
+                    fail_count += 1
 
         print(f"\n完了:")
         print(f"  成功: {success_count}社")
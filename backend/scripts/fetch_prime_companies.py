@@ -51,37 +51,19 @@ def insert_companies_to_db(df: pd.DataFrame):
         inserted_count = 0
         skipped_count = 0
 
-        # DataFrameを処理
-        for index, row in df.iterrows():
-            # カラム名を柔軟に処理
-            stock_code = None
-            name = None
-            industry = None
-
-            # 銘柄コード取得
-            if 'コード' in row:
-                stock_code = str(row['コード']).strip()
-            elif 'code' in row:
-                stock_code = str(row['code']).strip()
-            elif 'Code' in row:
-                stock_code = str(row['Code']).strip()
-
-            # 企業名取得
-            if '銘柄名' in row:
-                name = str(row['銘柄名']).strip()
-            elif 'name' in row:
-                name = str(row['name']).strip()
-            elif 'Name' in row:
-                name = str(row['Name']).strip()
-
-            # 業種取得
-            if '33業種区分' in row:
-                industry = str(row['33業種区分']).strip()
-            elif 'sector' in row:
-                industry = str(row['sector']).strip()
-            elif 'Sector' in row:
-                industry = str(row['Sector']).strip()
+        # カラム名を柔軟に処理（列の解決はループの外で1回だけ行う）
+        def resolve_column(candidates):
+            for column in candidates:
+                if column in df.columns:
+                    return df[column].astype(str).str.strip().tolist()
+            return [None] * len(df)
+
+        stock_codes = resolve_column(['コード', 'code', 'Code'])
+        names = resolve_column(['銘柄名', 'name', 'Name'])
+        industries = resolve_column(['33業種区分', 'sector', 'Sector'])
 
+        # DataFrameを処理
+        for stock_code, name, industry in zip(stock_codes, names, industries):
             # 必須項目のチェック
             if not stock_code or not name:
                 continue
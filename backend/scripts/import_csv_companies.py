@@ -27,11 +27,13 @@ def import_companies_from_csv(csv_path: str):
         inserted_count = 0
         skipped_count = 0
 
-        # DataFrameを処理
-        for index, row in df.iterrows():
-            stock_code = str(row['stock_code']).strip()
-            name = str(row['name']).strip()
-            industry = str(row['industry']).strip() if pd.notna(row['industry']) else None
+        # DataFrameを処理（列単位で取り出してから行を組み立てる）
+        industries = df['industry'].astype(object).where(df['industry'].notna(), None).tolist()
+
+        for stock_code, name, industry in zip(df['stock_code'].tolist(), df['name'].tolist(), industries):
+            stock_code = str(stock_code).strip()
+            name = str(name).strip()
+            industry = str(industry).strip() if industry is not None else None
 
             # 4桁の銘柄コードに正規化
             try:
@@ -0,0 +1,54 @@
+"""
+SemanticAnswerCache の無効化のテスト
+"""
+
+import numpy as np
+import pytest
+
+from app.rag.answer_cache import SemanticAnswerCache, _index_version_key
+from app.services.cache_service import cache_service
+
+
+QUESTION = np.array([1.0, 0.0], dtype=np.float32)
+SIMILAR_QUESTION = np.array([0.96, 0.28], dtype=np.float32)
+
+
+@pytest.fixture
+def answer_cache():
+    cache_service.clear()
+    yield SemanticAnswerCache(threshold=0.9)
+    cache_service.clear()
+
+
+def test_answer_generated_across_reindex_is_not_stored(answer_cache):
+    cached, version = answer_cache.lookup("7203", 5, QUESTION)
+    assert cached is None
+
+    # 回答の生成中に再インデックスされた
+    answer_cache.invalidate("7203")
+    answer_cache.store("7203", 5, QUESTION, {"answer": "old"}, version)
+
+    assert answer_cache.lookup("7203", 5, QUESTION)[0] is None
+
+
+def test_evicted_generation_does_not_revive_invalidated_answers(answer_cache):
+    _, version = answer_cache.lookup("7203", 5, QUESTION)
+    answer_cache.store("7203", 5, QUESTION, {"answer": "cached"}, version)
+    assert answer_cache.lookup("7203", 5, QUESTION)[0] == {"answer": "cached"}
+
+    cache_service.delete(_index_version_key("7203"))
+
+    assert answer_cache.lookup("7203", 5, QUESTION)[0] is None
+
+
+def test_expired_best_match_does_not_hide_valid_answer(answer_cache):
+    _, version = answer_cache.lookup(None, 5, QUESTION)
+    answer_cache.store(None, 5, SIMILAR_QUESTION, {"answer": "similar"}, version)
+    answer_cache.store(None, 5, QUESTION, {"answer": "exact"}, version)
+
+    # 完全一致の回答だけ期限切れにする
+    scope = answer_cache._scopes[("*", 5)]
+    result, _, entry_version = scope.entries[1]
+    scope.entries[1] = (result, 0.0, entry_version)
+
+    assert answer_cache.lookup(None, 5, QUESTION)[0] == {"answer": "similar"}
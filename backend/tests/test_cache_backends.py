@@ -0,0 +1,164 @@
+"""
+キャッシュ保存先のテスト
+"""
+
+import sqlite3
+import time
+
+import pytest
+
+from app.services.cache_backends import CacheEntry, MemoryCacheBackend, SQLiteCacheBackend, estimate_size
+
+
+def test_memory_evicts_least_recently_used_entry():
+    backend = MemoryCacheBackend(max_entries=3, max_bytes=1 << 20)
+    for key in ("a", "b", "c"):
+        backend.set(key, CacheEntry.create(key, 60))
+
+    # a を参照すると最近使用になり、次に追い出されるのは b
+    assert backend.get("a").value == "a"
+    backend.set("d", CacheEntry.create("d", 60))
+
+    assert backend.contains("a")
+    assert not backend.contains("b")
+    assert backend.get_stats()["evictions"] == 1
+
+
+def test_memory_evicts_by_estimated_bytes():
+    value = b"x" * 1000
+    backend = MemoryCacheBackend(max_entries=100, max_bytes=int(estimate_size(value) * 2.5))
+
+    for key in ("a", "b", "c"):
+        backend.set(key, CacheEntry.create(value, 60))
+
+    stats = backend.get_stats()
+    assert stats["total_entries"] == 2
+    assert stats["current_bytes"] == 2 * estimate_size(value)
+    assert not backend.contains("a")
+
+
+def test_memory_skips_values_larger_than_the_budget():
+    backend = MemoryCacheBackend(max_entries=100, max_bytes=100)
+    backend.set("small", CacheEntry.create(1, 60))
+    backend.set("big", CacheEntry.create(b"x" * 1000, 60))
+
+    assert backend.get("big") is None
+    assert backend.contains("small")
+
+
+def test_memory_expiry_heap_purges_without_reads():
+    backend = MemoryCacheBackend(max_entries=100, max_bytes=1 << 20)
+    backend.set("short", CacheEntry.create(1, 0.01))
+    time.sleep(0.02)
+
+    # 期限切れは読み込まれなくても次の書き込み時に回収される
+    backend.set("long", CacheEntry.create(2, 60))
+
+    stats = backend.get_stats()
+    assert stats["total_entries"] == 1
+    assert stats["expirations"] == 1
+    assert stats["current_bytes"] == estimate_size(2)
+
+
+def test_memory_expiry_heap_ignores_overwritten_entries():
+    backend = MemoryCacheBackend(max_entries=100, max_bytes=1 << 20)
+    backend.set("key", CacheEntry.create("old", 0.01))
+    backend.set("key", CacheEntry.create("new", 60))
+    time.sleep(0.02)
+
+    backend.cleanup_expired()
+
+    # 古い期限のヒープ要素で上書き後のエントリを消さない
+    assert backend.get("key").value == "new"
+    assert backend.get_stats()["expirations"] == 0
+
+
+def test_memory_expiry_heap_is_rebuilt_after_many_overwrites():
+    backend = MemoryCacheBackend(max_entries=100, max_bytes=1 << 20)
+    for i in range(1000):
+        backend.set("key", CacheEntry.create(i, 60))
+
+    assert len(backend._expiry_heap) <= 2 * len(backend._cache) + 64
+    assert backend.get("key").value == 999
+
+
+@pytest.fixture
+def sqlite_backend(tmp_path):
+    return SQLiteCacheBackend(
+        str(tmp_path / "cache.sqlite3"),
+        max_entries=3,
+        touch_batch_size=2,
+        touch_interval=3600,
+        maintenance_writes=4,
+        maintenance_interval=3600
+    )
+
+
+def _accessed_at(backend, key):
+    return backend._connection().execute(
+        "SELECT accessed_at FROM cache_entries WHERE key = ?", (key,)
+    ).fetchone()[0]
+
+
+def test_sqlite_get_batches_access_time_updates(sqlite_backend):
+    sqlite_backend.set("a", CacheEntry.create(1, 60))
+    sqlite_backend.set("b", CacheEntry.create(2, 60))
+    written = _accessed_at(sqlite_backend, "a")
+
+    assert sqlite_backend.get("a").value == 1
+    # 1件目の参照はまだ書き込まない
+    assert _accessed_at(sqlite_backend, "a") == written
+
+    assert sqlite_backend.get("b").value == 2
+    assert _accessed_at(sqlite_backend, "a") > written
+
+
+def test_sqlite_evicts_least_recently_used_on_maintenance(sqlite_backend):
+    for key in ("a", "b", "c"):
+        sqlite_backend.set(key, CacheEntry.create(key, 60))
+        time.sleep(0.01)
+
+    # a を参照（まだ反映されていない）してから、4回目の書き込みで上限を確認する
+    sqlite_backend.get("a")
+    sqlite_backend.set("d", CacheEntry.create("d", 60))
+
+    assert sqlite_backend.contains("a")
+    assert not sqlite_backend.contains("b")
+    assert sqlite_backend.get_stats()["total_entries"] == 3
+
+
+def test_sqlite_purges_expired_entries_only_on_maintenance(sqlite_backend):
+    sqlite_backend.set("old", CacheEntry.create("old", -1))
+    for key in ("a", "b"):
+        sqlite_backend.set(key, CacheEntry.create(key, 60))
+
+    (count,) = sqlite_backend._connection().execute("SELECT COUNT(*) FROM cache_entries").fetchone()
+    assert count == 3
+
+    sqlite_backend.set("c", CacheEntry.create("c", 60))
+
+    (count,) = sqlite_backend._connection().execute("SELECT COUNT(*) FROM cache_entries").fetchone()
+    assert count == 3
+    assert sqlite_backend.get("old") is None
+
+
+class _LockedConnection:
+    """全ての操作が "database is locked" で失敗するコネクション"""
+
+    def execute(self, *args, **kwargs):
+        raise sqlite3.OperationalError("database is locked")
+
+    executemany = execute
+
+
+def test_sqlite_errors_degrade_to_cache_miss(sqlite_backend, monkeypatch):
+    sqlite_backend.set("a", CacheEntry.create(1, 60))
+    monkeypatch.setattr(sqlite_backend, "_connection", lambda: _LockedConnection())
+
+    assert sqlite_backend.get("a") is None
+    sqlite_backend.set("b", CacheEntry.create(2, 60))
+    sqlite_backend.delete("a")
+    sqlite_backend.clear()
+    sqlite_backend.clear_pattern("a")
+    assert not sqlite_backend.contains("a")
+    assert sqlite_backend.get_stats()["total_entries"] is None
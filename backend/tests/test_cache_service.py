@@ -0,0 +1,182 @@
+"""
+CacheService の get_or_compute（single-flight・stale-while-revalidate）のテスト
+"""
+
+import asyncio
+import threading
+
+import pytest
+
+from app.services.cache_service import CacheService
+
+
+@pytest.fixture
+def cache():
+    return CacheService(max_entries=100, max_bytes=1 << 20)
+
+
+class CountingLoader:
+    """呼ばれた回数を数え、release されるまで待つ非同期ローダー"""
+
+    def __init__(self, value="value"):
+        self.value = value
+        self.calls = 0
+        self.release = asyncio.Event()
+
+    async def __call__(self):
+        self.calls += 1
+        await self.release.wait()
+        return f"{self.value}-{self.calls}"
+
+
+def test_concurrent_misses_share_one_load(cache):
+    async def main():
+        loader = CountingLoader()
+        callers = [asyncio.ensure_future(cache.get_or_compute("key", loader.__call__)) for _ in range(10)]
+        await asyncio.sleep(0)
+        loader.release.set()
+        return loader, await asyncio.gather(*callers)
+
+    loader, results = asyncio.run(main())
+
+    assert loader.calls == 1
+    assert results == ["value-1"] * 10
+    assert cache.get_stats()["coalesced"] == 9
+    assert cache.get("key") == "value-1"
+
+
+def test_sync_loader_runs_in_a_worker_thread_once(cache):
+    calls = []
+    started = threading.Event()
+    release = threading.Event()
+
+    def loader():
+        calls.append(threading.get_ident())
+        started.set()
+        release.wait(5)
+        return "value"
+
+    async def main():
+        callers = [asyncio.ensure_future(cache.get_or_compute("key", loader)) for _ in range(5)]
+        await asyncio.to_thread(started.wait, 5)
+        release.set()
+        return await asyncio.gather(*callers)
+
+    assert asyncio.run(main()) == ["value"] * 5
+    assert len(calls) == 1
+    assert calls[0] != threading.get_ident()
+
+
+def test_cancelled_caller_does_not_cancel_shared_load(cache):
+    async def main():
+        loader = CountingLoader()
+        first = asyncio.ensure_future(cache.get_or_compute("key", loader.__call__))
+        second = asyncio.ensure_future(cache.get_or_compute("key", loader.__call__))
+        await asyncio.sleep(0)
+
+        first.cancel()
+        await asyncio.sleep(0)
+        loader.release.set()
+
+        with pytest.raises(asyncio.CancelledError):
+            await first
+        return loader, await second
+
+    loader, value = asyncio.run(main())
+
+    assert value == "value-1"
+    assert loader.calls == 1
+    assert cache.get("key") == "value-1"
+
+
+def test_loader_error_is_shared_and_not_cached(cache):
+    calls = []
+
+    async def failing():
+        calls.append(1)
+        await asyncio.sleep(0.01)
+        raise RuntimeError("upstream down")
+
+    async def main():
+        results = await asyncio.gather(
+            *(cache.get_or_compute("key", failing) for _ in range(3)),
+            return_exceptions=True
+        )
+        # 失敗後は実行中から外れ、次の呼び出しで再試行する
+        retry = await cache.get_or_compute("key", lambda: "recovered")
+        return results, retry
+
+    results, retry = asyncio.run(main())
+
+    assert len(calls) == 1
+    assert all(isinstance(result, RuntimeError) for result in results)
+    assert retry == "recovered"
+
+
+def test_none_is_not_cached(cache):
+    async def main():
+        first = await cache.get_or_compute("key", lambda: None)
+        second = await cache.get_or_compute("key", lambda: "value")
+        return first, second
+
+    assert asyncio.run(main()) == (None, "value")
+
+
+def test_stale_value_is_served_while_revalidating(cache):
+    async def main():
+        cache.set("key", "old", ttl_seconds=-1, stale_ttl_seconds=60)
+        loader = CountingLoader("new")
+
+        # 鮮度切れでも古い値を即座に返し、裏で再取得する
+        value = await cache.get_or_compute("key", loader.__call__, 60, 60)
+        assert cache.get_stats()["inflight"] == 1
+
+        loader.release.set()
+        await asyncio.sleep(0.01)
+        return value, loader
+
+    value, loader = asyncio.run(main())
+
+    assert value == "old"
+    assert loader.calls == 1
+    assert cache.get("key") == "new-1"
+    stats = cache.get_stats()
+    assert stats["stale_hits"] == 1
+    assert stats["refreshes"] == 1
+
+
+def test_refresh_hot_keys_reloads_frequently_read_keys_before_they_go_stale(cache):
+    async def main():
+        loader = CountingLoader("fresh")
+        loader.release.set()
+
+        await cache.get_or_compute("hot", loader.__call__, 60, 600)
+        await cache.get_or_compute("cold", loader.__call__, 60, 600)
+        for _ in range(3):
+            await cache.get_or_compute("hot", loader.__call__, 60, 600)
+        await cache.get_or_compute("cold", loader.__call__, 60, 600)
+
+        # 鮮度切れまで60秒なので、120秒先読みの対象になるのは参照回数の多い hot だけ
+        started = await cache.refresh_hot_keys(min_hits=3, ahead_seconds=120)
+        await asyncio.sleep(0.01)
+
+        # 参照回数は呼び出しごとにリセットされる
+        again = await cache.refresh_hot_keys(min_hits=3, ahead_seconds=120)
+        return started, again, loader
+
+    started, again, loader = asyncio.run(main())
+
+    assert started == 1
+    assert again == 0
+    assert loader.calls == 3
+    assert cache.get("hot") == "fresh-3"
+    assert cache.get("cold") == "fresh-2"
+
+
+def test_refresh_hot_keys_skips_keys_not_close_to_going_stale(cache):
+    async def main():
+        for _ in range(4):
+            await cache.get_or_compute("hot", lambda: "value", 3600, 600)
+        return await cache.refresh_hot_keys(min_hits=3, ahead_seconds=120)
+
+    assert asyncio.run(main()) == 0
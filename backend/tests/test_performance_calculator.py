@@ -0,0 +1,49 @@
+"""
+PerformanceCalculator の年率換算のテスト
+"""
+
+import numpy as np
+import pytest
+
+from app.services.performance_calculator import (
+    PerformanceCalculator,
+    periods_per_year,
+    CRYPTO_TRADING_DAYS,
+    TRADING_DAYS
+)
+
+
+def _one_year_with_drawdown(days: int) -> list:
+    # 1年で +40%、途中に -10% の下落
+    prices = list(np.linspace(100.0, 140.0, days + 1))
+    prices[days // 2] = prices[days // 2 - 1] * 0.9
+    return prices
+
+
+def test_periods_per_year_uses_calendar_days_for_crypto():
+    assert periods_per_year("crypto") == CRYPTO_TRADING_DAYS
+    assert periods_per_year("us_stock") == TRADING_DAYS
+
+
+def test_calmar_annualizes_each_asset_over_one_year():
+    stock = _one_year_with_drawdown(TRADING_DAYS)
+    crypto = _one_year_with_drawdown(CRYPTO_TRADING_DAYS)
+
+    stock_metrics, crypto_metrics = PerformanceCalculator.calculate_metrics_batch(
+        [stock, crypto],
+        periods=[TRADING_DAYS, CRYPTO_TRADING_DAYS]
+    )
+
+    # ちょうど1年分の系列なので、CAGR = 総リターン
+    for metrics in (stock_metrics, crypto_metrics):
+        assert metrics["calmar_ratio"] == pytest.approx(40.0 / abs(metrics["max_drawdown"]))
+
+
+def test_calmar_horizon_spans_gaps_in_the_series():
+    prices = [100.0] + [np.nan] * (TRADING_DAYS - 1) + [140.0, 133.0]
+
+    (metrics,) = PerformanceCalculator.calculate_metrics_batch([prices])
+
+    # 欠損を含めて1年と1日 → CAGRはほぼ総リターン（欠損で期間を短く数えると発散する）
+    expected_cagr = (133.0 / 100.0) ** (TRADING_DAYS / (TRADING_DAYS + 1)) - 1
+    assert metrics["calmar_ratio"] == pytest.approx(expected_cagr * 100 / 5.0)
@@ -0,0 +1,47 @@
+"""
+PriceSeries のJSON出力のテスト
+"""
+
+import json
+
+import numpy as np
+
+from app.services.price_series import PriceSeries
+
+
+def _series_with_nan_bar() -> PriceSeries:
+    return PriceSeries.from_rows([
+        ("2024-01-04", 100.0, 101.0, 99.0, 100.5, 1000),
+        ("2024-01-05", float("nan"), float("nan"), float("nan"), 101.0, 0),
+        ("2024-01-09", 101.5, 102.0, 100.0, 101.2, 1200),
+    ])
+
+
+def test_to_json_bytes_records_maps_nan_to_null():
+    payload = _series_with_nan_bar().to_json_bytes(stock_code="7203", period="1mo")
+
+    # 厳密なJSONパーサーでも読める（NaNリテラルを含まない）
+    data = json.loads(payload, parse_constant=lambda name: (_ for _ in ()).throw(ValueError(name)))["data"]
+
+    assert data[1] == {"date": "2024-01-05", "open": None, "high": None, "low": None, "close": 101.0, "volume": 0}
+    assert data[0]["open"] == 100.0
+
+
+def test_to_json_bytes_columns_maps_nan_to_null():
+    payload = _series_with_nan_bar().to_json_bytes(orient="columns")
+
+    data = json.loads(payload, parse_constant=lambda name: (_ for _ in ()).throw(ValueError(name)))["data"]
+
+    assert data["open"] == [100.0, None, 101.5]
+    assert data["close"] == [100.5, 101.0, 101.2]
+    assert data["volume"] == [1000, 0, 1200]
+
+
+def test_to_columns_without_missing_values_keeps_floats():
+    series = PriceSeries.from_rows([("2024-01-04", 1.0, 2.0, 0.5, 1.5, 10)])
+
+    columns = series.to_columns()
+
+    assert columns["high"] == [2.0]
+    assert all(isinstance(value, float) for value in columns["high"])
+    assert np.isfinite(series.close).all()
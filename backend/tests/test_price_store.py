@@ -0,0 +1,106 @@
+"""
+PriceStore の保存・差分取得のテスト
+"""
+
+from datetime import date, timedelta
+
+import pandas as pd
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from app.db.database import Base
+from app.models.company import Company
+from app.models.stock_price import StockPrice
+from app.services import price_store as price_store_module
+from app.services.price_series import PriceSeries
+from app.services.price_store import PriceStore, _has_corporate_action
+
+
+@pytest.fixture
+def db():
+    engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    Base.metadata.create_all(engine, tables=[Company.__table__, StockPrice.__table__])
+    session = sessionmaker(autocommit=False, autoflush=False, bind=engine)()
+    try:
+        yield session
+    finally:
+        session.close()
+
+
+@pytest.fixture
+def company(db):
+    company = Company(stock_code="7203", name="トヨタ自動車")
+    db.add(company)
+    db.commit()
+    return company
+
+
+def _series(*rows):
+    return PriceSeries.from_rows([(day, close, close, close, close, 100) for day, close in rows])
+
+
+def _frame(rows, dividends=None):
+    index = pd.DatetimeIndex([day for day, _ in rows], tz="Asia/Tokyo")
+    closes = [close for _, close in rows]
+    return pd.DataFrame(
+        {
+            "Open": closes,
+            "High": closes,
+            "Low": closes,
+            "Close": closes,
+            "Volume": [100] * len(rows),
+            "Dividends": dividends or [0.0] * len(rows),
+            "Stock Splits": [0.0] * len(rows)
+        },
+        index=index
+    )
+
+
+def _stored(db, company):
+    return [
+        (row.date.isoformat(), row.close)
+        for row in db.query(StockPrice).filter(StockPrice.company_id == company.id).order_by(StockPrice.date)
+    ]
+
+
+def test_generic_upsert_updates_existing_and_inserts_new_dates(db, company):
+    PriceStore.upsert_series(db, company.id, _series(("2024-01-04", 100.0), ("2024-01-05", 101.0)))
+
+    rows = [
+        {"company_id": company.id, "date": date(2024, 1, 5), "open": 102.0, "high": 102.0,
+         "low": 102.0, "close": 102.0, "volume": 100},
+        {"company_id": company.id, "date": date(2024, 1, 9), "open": 103.0, "high": 103.0,
+         "low": 103.0, "close": 103.0, "volume": 100},
+    ]
+    assert PriceStore._upsert_rows_generic(db, company.id, rows) == 2
+
+    assert _stored(db, company) == [("2024-01-04", 100.0), ("2024-01-05", 102.0), ("2024-01-09", 103.0)]
+
+
+def test_corporate_action_on_latest_stored_day_is_ignored():
+    df = _frame([("2024-01-04", 100.0), ("2024-01-05", 101.0)], dividends=[5.0, 0.0])
+
+    assert _has_corporate_action(df)
+    assert not _has_corporate_action(df, after=date(2024, 1, 4))
+    assert _has_corporate_action(df, after=date(2024, 1, 3))
+
+
+def test_sync_does_not_rebackfill_for_already_stored_action(db, company, monkeypatch):
+    latest = date.today() - timedelta(days=1)
+    PriceStore.upsert_series(db, company.id, _series((latest.isoformat(), 100.0)))
+
+    # 最新日（権利落ち日）の足しか返らない週末など
+    monkeypatch.setattr(
+        price_store_module.yfinance_client,
+        "get_stock_data_since",
+        lambda stock_code, start: _frame([(latest.isoformat(), 100.0)], dividends=[5.0])
+    )
+    monkeypatch.setattr(
+        price_store_module.yfinance_client,
+        "get_price_series",
+        lambda *args, **kwargs: pytest.fail("re-backfilled for an action already applied")
+    )
+
+    assert PriceStore.sync_company(db, company) == 1
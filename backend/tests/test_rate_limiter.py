@@ -0,0 +1,137 @@
+"""
+RateLimiter（トークンバケット）のテスト
+"""
+
+import asyncio
+import time
+from datetime import datetime, timezone
+
+import pytest
+
+from app.services.rate_limiter import (
+    MemoryRateLimitBackend,
+    MonthlyQuota,
+    RateLimiter,
+    SQLiteRateLimitBackend
+)
+
+
+def _limiter(capacity=2, refill_per_second=50.0, backend=None):
+    return RateLimiter("test", capacity, refill_per_second, backend=backend or MemoryRateLimitBackend())
+
+
+def test_bucket_allows_burst_up_to_capacity_then_refills():
+    limiter = _limiter(capacity=2, refill_per_second=50.0)
+
+    assert limiter.try_acquire() == 0
+    assert limiter.try_acquire() == 0
+
+    wait = limiter.try_acquire()
+    assert 0 < wait <= 1 / 50
+
+    time.sleep(wait + 0.01)
+    assert limiter.try_acquire() == 0
+
+
+def test_refill_is_capped_at_capacity():
+    limiter = _limiter(capacity=2, refill_per_second=1000.0)
+    time.sleep(0.02)
+
+    assert limiter.remaining() == pytest.approx(2.0)
+
+
+def test_acquire_sync_blocks_until_refilled():
+    limiter = _limiter(capacity=1, refill_per_second=20.0)
+    assert limiter.acquire_sync()
+
+    started = time.monotonic()
+    assert limiter.acquire_sync()
+    assert time.monotonic() - started >= 0.04
+
+
+def test_acquire_waits_without_blocking_the_event_loop():
+    limiter = _limiter(capacity=1, refill_per_second=20.0)
+    ticks = []
+
+    async def ticker():
+        for _ in range(3):
+            ticks.append(time.monotonic())
+            await asyncio.sleep(0.005)
+
+    async def main():
+        assert await limiter.acquire()
+        started = time.monotonic()
+        acquired, _ = await asyncio.gather(limiter.acquire(), ticker())
+        return acquired, time.monotonic() - started
+
+    acquired, elapsed = asyncio.run(main())
+
+    assert acquired
+    assert elapsed >= 0.04
+    # 待っている間も他のタスクが進む
+    assert len(ticks) == 3 and ticks[-1] - ticks[0] < 0.04
+
+
+def test_acquire_gives_up_at_timeout():
+    limiter = _limiter(capacity=1, refill_per_second=1.0)
+    assert limiter.acquire_sync()
+
+    assert not limiter.acquire_sync(timeout=0)
+    assert not asyncio.run(limiter.acquire(timeout=0.01))
+
+
+def test_more_tokens_than_capacity_raise():
+    limiter = _limiter(capacity=2)
+
+    with pytest.raises(ValueError):
+        limiter.try_acquire(3)
+    with pytest.raises(ValueError):
+        asyncio.run(limiter.acquire(3))
+
+
+def test_zero_refill_rate_never_waits_forever():
+    limiter = _limiter(capacity=1, refill_per_second=0)
+    assert limiter.acquire_sync()
+
+    assert limiter.try_acquire() == float("inf")
+    assert not limiter.acquire_sync()
+    assert not asyncio.run(limiter.acquire())
+    assert limiter.get_stats()["seconds_until_full"] is None
+
+
+def test_sqlite_backend_is_shared_between_limiters(tmp_path):
+    path = str(tmp_path / "rate_limits.sqlite3")
+    first = _limiter(capacity=2, refill_per_second=0.001, backend=SQLiteRateLimitBackend(path))
+    second = _limiter(capacity=2, refill_per_second=0.001, backend=SQLiteRateLimitBackend(path))
+
+    assert asyncio.run(first.acquire())
+    assert second.try_acquire() == 0
+    assert first.try_acquire() > 0
+
+
+def test_backend_factory_is_called_on_first_use():
+    created = []
+
+    def factory():
+        created.append(MemoryRateLimitBackend())
+        return created[-1]
+
+    limiter = RateLimiter("lazy", 1, 1.0, backend_factory=factory)
+    assert not created
+
+    assert asyncio.run(limiter.atry_acquire()) == 0
+    assert len(created) == 1 and limiter.backend is created[0]
+
+
+def test_monthly_quota_resets_on_calendar_month(monkeypatch):
+    quota = MonthlyQuota("quota", 2, backend=MemoryRateLimitBackend())
+    monkeypatch.setattr(quota, "_month_start", lambda: datetime(2026, 10, 1, tzinfo=timezone.utc))
+
+    assert quota.acquire_sync()
+    assert quota.acquire_sync()
+    # 月内は補充されない
+    assert not quota.acquire_sync()
+
+    monkeypatch.setattr(quota, "_month_start", lambda: datetime(2026, 11, 1, tzinfo=timezone.utc))
+    assert quota.acquire_sync()
+    assert quota.get_stats()["period"] == "2026-11"
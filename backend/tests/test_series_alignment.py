@@ -0,0 +1,63 @@
+"""
+AlignedPrices の日付軸の揃え方のテスト
+"""
+
+from datetime import date
+
+import numpy as np
+
+from app.services.series_alignment import AlignedPrices, ALIGNMENT_INTERSECTION
+
+
+def _points(*rows):
+    return [{"date": day, "price": price} for day, price in rows]
+
+
+def test_intersection_without_common_dates_is_empty():
+    aligned = AlignedPrices.from_points(
+        [
+            _points(("2024-01-04", 100.0), ("2024-01-05", 101.0)),
+            _points(("2024-01-06", 50.0), ("2024-01-07", 51.0)),
+        ],
+        how=ALIGNMENT_INTERSECTION
+    )
+
+    assert len(aligned) == 0
+    assert aligned.prices.shape == (2, 0)
+    assert aligned.has_data().tolist() == [False, False]
+    assert aligned.observation_counts().tolist() == [0, 0]
+    assert aligned.first_valid().tolist() == [0, 0]
+    assert aligned.normalized().shape == (2, 0)
+
+
+def test_intersection_with_empty_asset_is_empty():
+    aligned = AlignedPrices.from_points(
+        [_points(("2024-01-04", 100.0)), []],
+        how=ALIGNMENT_INTERSECTION
+    )
+
+    assert aligned.date_strings() == []
+    assert aligned.has_data().tolist() == [False, False]
+
+
+def test_intersection_keeps_common_dates_only():
+    aligned = AlignedPrices.from_points(
+        [
+            _points(("2024-01-04", 100.0), ("2024-01-05", 101.0), ("2024-01-06", 102.0)),
+            _points(("2024-01-05", 50.0), ("2024-01-06", 51.0), ("2024-01-07", 52.0)),
+        ],
+        how=ALIGNMENT_INTERSECTION
+    )
+
+    assert aligned.date_strings() == ["2024-01-05", "2024-01-06"]
+    np.testing.assert_array_equal(aligned.prices, [[101.0, 102.0], [50.0, 51.0]])
+
+
+def test_union_start_date_after_last_date_is_empty():
+    aligned = AlignedPrices.from_points(
+        [_points(("2024-01-04", 100.0), ("2024-01-05", 101.0))],
+        start_date=date(2024, 2, 1)
+    )
+
+    assert len(aligned) == 0
+    assert aligned.has_data().tolist() == [False]
@@ -64,6 +64,13 @@ export const chatApi = {
     return response.data;
   },
 
+  createIndexBulk: async (
+    stockCodes: string[]
+  ): Promise<{ message: string; companies_count: number; chunks_count: number; not_found: string[] }> => {
+    const response = await apiClient.post("/api/chat/index/bulk", { stock_codes: stockCodes });
+    return response.data;
+  },
+
   getStats: async (): Promise<{ total_documents: number; collection_name: string }> => {
     const response = await apiClient.get("/api/chat/stats");
     return response.data;
@@ -29,6 +29,9 @@ export interface AssetPerformance {
   total_return: number;
   volatility: number | null;
   max_drawdown: number | null;
+  sharpe_ratio?: number | null;
+  sortino_ratio?: number | null;
+  calmar_ratio?: number | null;
 }
 
 export interface RankingItem {
@@ -41,9 +44,17 @@ export interface RankingItem {
   max_drawdown: number | null;
 }
 
+export interface FailedAsset {
+  symbol: string;
+  asset_type: string;
+  reason: "timeout" | "no_data" | "error";
+}
+
 export interface CompareResponse {
   assets: AssetPerformance[];
   start_date: string;
   end_date: string;
   ranking: RankingItem[];
+  partial?: boolean;
+  failed_assets?: FailedAsset[];
 }
@@ -18,6 +18,8 @@ export interface PortfolioWithPerformance extends Portfolio {
   current_value: number | null;
   profit_loss: number | null;
   profit_loss_percentage: number | null;
+  currency?: string | null;
+  base_currency?: string | null;
   company_name: string | null;
 }
 
@@ -36,6 +38,7 @@ export interface PortfolioUpdate {
 }
 
 export interface PortfolioPerformance {
+  base_currency?: string;
   total_purchase_value: number;
   total_current_value: number;
   total_profit_loss: number;
@@ -49,6 +52,8 @@ export interface PortfolioPerformance {
     };
   };
   total_items: number;
+  missing_prices?: string[];
+  missing_rates?: string[];
 }
 
 export interface Favorite {